@@ -0,0 +1,78 @@
+"""
+benchmarks.bench_bulk_submission
+~~~~~~~~~~~~
+
+Measures the throughput of building, serializing and posting many submissions
+against the local stub server, with a single process and with a process pool
+of bulk_submission.BulkSubmissionBuilder.
+
+Usage:
+
+    python -m benchmarks.bench_bulk_submission --studies 200 --files 2000 --processes 1 4
+
+:copyright: (c) 2021 by Karoly Erdos.
+:license: Apache2, see LICENSE for more details.
+"""
+
+import argparse
+import json
+import os
+import time
+
+from benchmarks.stub_server import StubServer
+from biostudiesclient.api import Api
+from biostudiesclient.auth import Auth
+from biostudiesclient.bulk_submission import BulkSubmissionBuilder
+from biostudiesclient.models import BioStudy, BioStudySection, BioStudyFile, BioStudiesAttribute, \
+    EnhancedJSONEncoder
+
+
+def build_bio_study(row):
+    index, number_of_files = row
+    section = BioStudySection(section_type='Study', accno='Project')
+    section.files = {BioStudyFile(f'study_{index}/image_{number}.tiff', 'file',
+                                  {BioStudiesAttribute('Description', f'Image number {number}')})
+                     for number in range(number_of_files)}
+
+    return BioStudy(accno=f'S-BENCH{index}', attributes={BioStudiesAttribute('Title', f'Study {index}')},
+                    section=section)
+
+
+def submit_serially(api, rows):
+    for row in rows:
+        api.create_submission(json.loads(json.dumps(build_bio_study(row), cls=EnhancedJSONEncoder)))
+
+
+def report(name, number_of_studies, elapsed):
+    print(f'{name:<34} {elapsed:8.2f}s {number_of_studies / elapsed:8.1f} studies/s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--studies', type=int, default=200)
+    parser.add_argument('--files', type=int, default=2000)
+    parser.add_argument('--processes', type=int, nargs='+', default=[1, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    rows = [(index, args.files) for index in range(args.studies)]
+    print(f'{args.studies} studies with {args.files} files each, {os.cpu_count()} CPUs')
+
+    with StubServer() as server:
+        auth = Auth(server.base_url)
+        auth.session_id = 'benchmark'
+        api = Api(auth)
+
+        start = time.perf_counter()
+        submit_serially(api, rows)
+        report('EnhancedJSONEncoder, serial', args.studies, time.perf_counter() - start)
+
+        for processes in args.processes:
+            builder = BulkSubmissionBuilder(api, build_bio_study, processes=processes)
+            start = time.perf_counter()
+            results = builder.submit_all(rows)
+            assert all(result.succeeded for result in results)
+            report(f'BulkSubmissionBuilder, {processes} processes', args.studies, time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    main()
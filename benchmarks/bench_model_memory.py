@@ -0,0 +1,71 @@
+"""
+benchmarks.bench_model_memory
+~~~~~~~~~~~~
+
+Compares the memory footprint of a file list built from the data classes of
+biostudiesclient.models, from their slotted variants in biostudiesclient.compact_models
+and as a columnar biostudiesclient.file_table.FileTable.
+
+Usage:
+
+    python -m benchmarks.bench_model_memory --files 100000 1000000
+
+:copyright: (c) 2021 by Karoly Erdos.
+:license: Apache2, see LICENSE for more details.
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+
+from biostudiesclient import models, compact_models
+from biostudiesclient.file_table import FileTable
+
+
+def create_files(model_module, number_of_files):
+    files = set()
+    for index in range(number_of_files):
+        files.add(model_module.BioStudyFile(
+            path=f'plate_{index // 1000}/well_{index % 1000}/image_{index}.tiff',
+            file_type='file',
+            attributes={model_module.BioStudiesAttribute('Description', 'Raw image'),
+                        model_module.BioStudiesAttribute('Channel', str(index % 4))}))
+
+    return files
+
+
+def create_file_table(number_of_files):
+    return FileTable.from_rows(
+        (f'plate_{index // 1000}/well_{index % 1000}/image_{index}.tiff', 'file',
+         {'Description': 'Raw image', 'Channel': str(index % 4)})
+        for index in range(number_of_files))
+
+
+def measure(name, create, number_of_files):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    files = create(number_of_files)
+    elapsed = time.perf_counter() - start
+    current_memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del files
+
+    print(f'{name:<16} files={number_of_files:<9} build={elapsed:7.2f}s '
+          f'total={current_memory / 2 ** 20:9.1f}MiB per_file={current_memory / number_of_files:7.1f}B')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--files', type=int, nargs='+', default=[100000, 1000000])
+    args = parser.parse_args()
+
+    for number_of_files in args.files:
+        measure('models', lambda count: create_files(models, count), number_of_files)
+        measure('compact_models', lambda count: create_files(compact_models, count), number_of_files)
+        measure('FileTable', create_file_table, number_of_files)
+
+
+if __name__ == '__main__':
+    main()
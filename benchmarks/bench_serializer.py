@@ -0,0 +1,97 @@
+"""
+benchmarks.bench_serializer
+~~~~~~~~~~~~
+
+Compares the time and the peak memory of serializing a large BioStudy
+with models.EnhancedJSONEncoder and with serializer.BioStudySerializer.
+
+Usage:
+
+    python -m benchmarks.bench_serializer --files 100000
+
+:copyright: (c) 2021 by Karoly Erdos.
+:license: Apache2, see LICENSE for more details.
+"""
+
+import argparse
+import io
+import json
+import time
+import tracemalloc
+
+from biostudiesclient.models import BioStudy, BioStudySection, BioStudyFile, BioStudiesAttribute, \
+    EnhancedJSONEncoder
+from biostudiesclient.serializer import BioStudySerializer, orjson
+
+
+def create_bio_study(number_of_files):
+    section = BioStudySection(section_type='Study', accno='Project')
+    section.attributes.add(BioStudiesAttribute('Title', 'A large imaging study'))
+    for index in range(number_of_files):
+        section.files.add(BioStudyFile(
+            path=f'plate_{index // 1000}/well_{index % 1000}/image_{index}.tiff',
+            file_type='file',
+            attributes={BioStudiesAttribute('Description', f'Image number {index}'),
+                        BioStudiesAttribute('Channel', str(index % 4))}))
+
+    bio_study = BioStudy(accno='S-BENCH1', attach_to='Benchmarks')
+    bio_study.attributes.add(BioStudiesAttribute('Title', 'Serialization benchmark'))
+    bio_study.section = section
+
+    return bio_study
+
+
+def normalise(document):
+    # the items of the sets might be listed in a different order by the two encoders
+    if isinstance(document, dict):
+        return {key: normalise(value) for key, value in document.items()}
+    if isinstance(document, list):
+        return sorted((normalise(item) for item in document), key=lambda item: json.dumps(item, sort_keys=True))
+
+    return document
+
+
+def measure(name, serialize, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = serialize()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    serialize()
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f'{name:<34} best={min(timings) * 1000:9.1f}ms peak_memory={peak_memory / 2 ** 20:8.1f}MiB')
+    return output
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--files', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    bio_study = create_bio_study(args.files)
+    print(f'{args.files} files, orjson installed: {orjson is not None}')
+
+    expected = measure('EnhancedJSONEncoder',
+                       lambda: json.dumps(bio_study, cls=EnhancedJSONEncoder), args.repeat)
+    pure_python = measure('BioStudySerializer (json)',
+                          lambda: BioStudySerializer(use_orjson=False).dumps(bio_study), args.repeat)
+    measure('BioStudySerializer (json, dump)',
+            lambda: BioStudySerializer(use_orjson=False).dump(bio_study, io.StringIO()), args.repeat)
+    expected = normalise(json.loads(expected))
+    assert normalise(json.loads(pure_python)) == expected
+
+    if orjson is not None:
+        fast = measure('BioStudySerializer (orjson)',
+                       lambda: BioStudySerializer().dumps(bio_study), args.repeat)
+        measure('BioStudySerializer (orjson, dump)',
+                lambda: BioStudySerializer().dump(bio_study, io.StringIO()), args.repeat)
+        assert normalise(json.loads(fast)) == expected
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+benchmarks.bench_session_pooling
+~~~~~~~~~~~~
+
+Measures the per-call overhead of Api requests against the local stub server,
+with a pooled keep-alive session and with a new connection for every request.
+
+Usage:
+
+    python -m benchmarks.bench_session_pooling --calls 2000
+
+:copyright: (c) 2021 by Karoly Erdos.
+:license: Apache2, see LICENSE for more details.
+"""
+
+import argparse
+import statistics
+import time
+
+from benchmarks.stub_server import StubServer
+from biostudiesclient.api import Api
+from biostudiesclient.auth import Auth
+from biostudiesclient.session import SessionConfig
+
+ACCESSION_ID = 'S-BENCH1'
+
+
+def measure_calls(base_url, session_config, calls, warmup):
+    auth = Auth(base_url, session_config=session_config)
+    auth.login('bench', 'bench')
+    api = Api(auth)
+
+    for _ in range(warmup):
+        api.get_submission(ACCESSION_ID)
+
+    latencies = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        api.get_submission(ACCESSION_ID)
+        latencies.append(time.perf_counter() - start)
+
+    auth.session.close()
+    return latencies
+
+
+def report(name, latencies):
+    latencies = sorted(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f'{name:<12} calls={len(latencies):<6} '
+          f'mean={statistics.mean(latencies) * 1e6:9.1f}us '
+          f'median={statistics.median(latencies) * 1e6:9.1f}us '
+          f'p99={p99 * 1e6:9.1f}us')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=1000)
+    parser.add_argument('--warmup', type=int, default=50)
+    args = parser.parse_args()
+
+    with StubServer() as server:
+        server.state.store_submission({'accno': ACCESSION_ID, 'attributes': []})
+
+        pooled = measure_calls(server.base_url, SessionConfig(), args.calls, args.warmup)
+        not_pooled = measure_calls(server.base_url, SessionConfig(keep_alive=False), args.calls, args.warmup)
+
+    report('pooled', pooled)
+    report('not pooled', not_pooled)
+    print(f'per-call overhead saved by pooling: '
+          f'{(statistics.mean(not_pooled) - statistics.mean(pooled)) * 1e6:.1f}us')
+
+
+if __name__ == '__main__':
+    main()
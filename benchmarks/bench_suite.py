@@ -0,0 +1,281 @@
+"""
+benchmarks.bench_suite
+~~~~~~~~~~~~
+
+Measures the throughput and the latencies of the main operations of the client
+against the local stub server: uploading small and large files, listing a folder,
+creating and getting a submission, and serializing a large BioStudy.
+Every scenario is run with every given concurrency.
+
+The results can be saved to a JSON file, together with the environment they have been measured in,
+and compared with the results of an earlier run. The suite exits with status 1
+if a scenario got slower than the baseline by more than the tolerance, so it can guard an upgrade in CI.
+
+Usage:
+
+    python -m benchmarks.bench_suite --concurrency 1 8 --output results.json
+    python -m benchmarks.bench_suite --concurrency 1 8 --baseline results.json --tolerance 0.15
+
+:copyright: (c) 2021 by Karoly Erdos.
+:license: Apache2, see LICENSE for more details.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+
+from benchmarks.bench_serializer import create_bio_study
+from benchmarks.stub_server import StubServer
+from biostudiesclient import serializer, submission_parser
+from biostudiesclient.api import Api
+from biostudiesclient.auth import Auth
+from biostudiesclient.serializer import BioStudySerializer
+from biostudiesclient.session import SessionConfig
+
+SCENARIOS = ('upload_small', 'upload_large', 'list_files', 'create_submission', 'get_submission', 'serialize')
+SMALL_FILE_SIZE = 4 * 1024
+MIB = 2 ** 20
+LISTED_FOLDER = 'bench/listing'
+UPLOAD_FOLDER = 'bench/uploads'
+
+
+@dataclass
+class BenchmarkResult:
+    """ The throughput and the latencies (in seconds) of the operations of a scenario. """
+
+    scenario: str
+    concurrency: int
+    operations: int
+    elapsed: float
+    throughput: float
+    bytes_per_second: float
+    mean: float
+    p50: float
+    p90: float
+    p99: float
+    max: float
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def summarise(scenario, concurrency, latencies, elapsed, bytes_per_operation=0):
+    latencies = sorted(latencies)
+    return BenchmarkResult(scenario=scenario, concurrency=concurrency, operations=len(latencies), elapsed=elapsed,
+                           throughput=len(latencies) / elapsed,
+                           bytes_per_second=len(latencies) * bytes_per_operation / elapsed,
+                           mean=statistics.mean(latencies), p50=percentile(latencies, 0.5),
+                           p90=percentile(latencies, 0.9), p99=percentile(latencies, 0.99), max=latencies[-1])
+
+
+def run_operations(operation, operations, concurrency):
+    """
+    Runs the operation the given number of times with the given number of threads.
+    :return: the latencies of the operations and the elapsed wall clock time
+    """
+
+    counter = itertools.count()
+    lock = threading.Lock()
+    latencies = []
+
+    def worker():
+        worker_latencies = []
+        while True:
+            with lock:
+                if next(counter) >= operations:
+                    break
+            start = time.perf_counter()
+            operation()
+            worker_latencies.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(worker_latencies)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        for future in [executor.submit(worker) for _ in range(concurrency)]:
+            future.result()
+
+    return latencies, time.perf_counter() - start
+
+
+class Scenarios:
+    """ Prepares the stub server, the local files and the documents used by the scenarios. """
+
+    def __init__(self, server, directory, args):
+        self.server = server
+        self.args = args
+        self.small_file = self.__create_file(directory, 'small.bin', SMALL_FILE_SIZE)
+        self.large_file = self.__create_file(directory, 'large.bin', args.large_file_mib * MIB)
+
+        for index in range(args.listing_size):
+            server.state.add_file(LISTED_FOLDER, f'file_{index}.tiff', 1024 * index)
+        server.state.add_folder(UPLOAD_FOLDER)
+
+        bio_study = create_bio_study(args.submission_files)
+        self.submission = json.loads(BioStudySerializer().dumps(bio_study))
+        self.submission.pop('accno')
+        self.submission_size = len(json.dumps(self.submission))
+        server.state.store_submission(dict(self.submission, accno='S-BENCH1'))
+
+        self.large_bio_study = create_bio_study(args.serialize_files)
+
+    def api(self, concurrency):
+        auth = Auth(self.server.base_url, session_config=SessionConfig(pool_maxsize=max(concurrency, 1)))
+        auth.login('bench', 'bench')
+
+        return Api(auth)
+
+    def operation(self, scenario, api):
+        """ :return: the operation of the scenario and the number of bytes it transfers """
+        if scenario == 'upload_small':
+            return lambda: api.upload_file(self.small_file, UPLOAD_FOLDER), SMALL_FILE_SIZE
+        if scenario == 'upload_large':
+            return lambda: api.upload_file(self.large_file, UPLOAD_FOLDER), self.args.large_file_mib * MIB
+        if scenario == 'list_files':
+            return lambda: api.get_user_files(LISTED_FOLDER), 0
+        if scenario == 'create_submission':
+            return lambda: api.create_submission(self.submission), self.submission_size
+        if scenario == 'get_submission':
+            return lambda: api.get_submission('S-BENCH1'), self.submission_size
+
+        bio_study_serializer = BioStudySerializer()
+        return lambda: bio_study_serializer.dumps(self.large_bio_study), 0
+
+    def operations(self, scenario):
+        if scenario == 'upload_large':
+            return self.args.large_operations
+        if scenario == 'serialize':
+            return self.args.serialize_operations
+
+        return self.args.operations
+
+    @staticmethod
+    def __create_file(directory, name, size):
+        path = os.path.join(directory, name)
+        with open(path, 'wb') as a_file:
+            a_file.truncate(size)
+
+        return path
+
+
+def run_suite(args):
+    results = []
+    with StubServer() as server, tempfile.TemporaryDirectory() as directory:
+        scenarios = Scenarios(server, directory, args)
+        for scenario, concurrency in itertools.product(args.scenarios, args.concurrency):
+            # serializing is CPU bound, it does not make sense to run it concurrently with threads
+            if scenario == 'serialize' and concurrency > 1:
+                continue
+
+            api = scenarios.api(concurrency)
+            operation, bytes_per_operation = scenarios.operation(scenario, api)
+            for _ in range(args.warmup):
+                operation()
+
+            runs = []
+            for _ in range(args.repeat):
+                latencies, elapsed = run_operations(operation, scenarios.operations(scenario), concurrency)
+                runs.append(summarise(scenario, concurrency, latencies, elapsed, bytes_per_operation))
+            api.session.close()
+
+            # the run with the median throughput is reported, so a single noisy run does not skew the result
+            result = sorted(runs, key=lambda run: run.throughput)[len(runs) // 2]
+            report(result)
+            results.append(result)
+
+    return results
+
+
+def report(result):
+    print(f'{result.scenario:<18} concurrency={result.concurrency:<4} ops={result.operations:<6} '
+          f'throughput={result.throughput:9.1f}/s {result.bytes_per_second / MIB:8.1f}MiB/s '
+          f'p50={result.p50 * 1000:8.2f}ms p90={result.p90 * 1000:8.2f}ms p99={result.p99 * 1000:8.2f}ms')
+
+
+def environment(args):
+    return {
+        'python': sys.version.split()[0],
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'orjson': serializer.orjson is not None,
+        'ijson': submission_parser.ijson is not None,
+        'arguments': {name: value for name, value in vars(args).items()
+                      if name not in ('output', 'baseline', 'tolerance')},
+    }
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compares the results with the results of an earlier run.
+    :return: the descriptions of the scenarios whose throughput or median latency got worse than the tolerance
+    :rtype list
+    """
+
+    baseline_results = {(result['scenario'], result['concurrency']): result for result in baseline['results']}
+    regressions = []
+    for result in results:
+        baseline_result = baseline_results.get((result.scenario, result.concurrency))
+        if baseline_result is None:
+            continue
+
+        throughput_ratio = result.throughput / baseline_result['throughput']
+        p50_ratio = result.p50 / baseline_result['p50']
+        print(f'{result.scenario:<18} concurrency={result.concurrency:<4} '
+              f'throughput {throughput_ratio:6.2f}x  p50 {p50_ratio:6.2f}x of the baseline')
+        if throughput_ratio < 1 - tolerance or p50_ratio > 1 + tolerance:
+            regressions.append(f'{result.scenario} with concurrency {result.concurrency}: '
+                               f'throughput {throughput_ratio:.2f}x, p50 {p50_ratio:.2f}x')
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8])
+    parser.add_argument('--operations', type=int, default=500)
+    parser.add_argument('--large-operations', type=int, default=10)
+    parser.add_argument('--serialize-operations', type=int, default=5)
+    parser.add_argument('--large-file-mib', type=int, default=64)
+    parser.add_argument('--listing-size', type=int, default=1000)
+    parser.add_argument('--submission-files', type=int, default=100)
+    parser.add_argument('--serialize-files', type=int, default=100000)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', help='the JSON file to save the results to')
+    parser.add_argument('--baseline', help='the JSON file of an earlier run to compare the results with')
+    parser.add_argument('--tolerance', type=float, default=0.1)
+    args = parser.parse_args()
+
+    results = run_suite(args)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            json.dump({'environment': environment(args), 'results': [asdict(result) for result in results]},
+                      output_file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline['environment'] != environment(args):
+            print('The baseline has been measured in a different environment or with different arguments.')
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,212 @@
+"""
+benchmarks.fault_injection
+~~~~~~~~~~~~
+
+Configurable faults of the stub server: latency distributions, server errors,
+dropped connections and throttling, per endpoint.
+
+The faults are configured with a dict (or a JSON file) by the name of the endpoint,
+that is the name of the Api method sending the request ('login' for the login request),
+and '*' for the endpoints not listed. The '*' faults apply to every endpoint not listed separately,
+so its max_rate limits the rate of each of those endpoints, not their combined rate:
+
+    {
+        "*": {"latency": {"distribution": "lognormal", "median": 0.05, "sigma": 0.6}, "error_rate": 0.01},
+        "upload_file": {"drop_rate": 0.02},
+        "get_submission": {"max_rate": 200, "retry_after": 1}
+    }
+
+:copyright: (c) 2021 by Karoly Erdos.
+:license: Apache2, see LICENSE for more details.
+"""
+
+import json
+import math
+import random
+import threading
+from dataclasses import dataclass, field, fields
+
+from biostudiesclient.rate_limit import TokenBucket
+
+DEFAULT_ENDPOINT = '*'
+ERROR = 'error'
+DROP = 'drop'
+THROTTLE = 'throttle'
+
+
+@dataclass
+class LatencyDistribution:
+    """
+    The distribution of the latency added to the responses, in seconds:
+    - constant: always mean
+    - uniform: between low and high
+    - exponential: with the given mean
+    - lognormal: with the given median and sigma (the standard deviation of the logarithm), it has a long tail
+    The latencies are capped at maximum, if it is given.
+    """
+
+    DISTRIBUTIONS = ('constant', 'uniform', 'exponential', 'lognormal')
+
+    distribution: str = 'constant'
+    mean: float = 0.0
+    low: float = 0.0
+    high: float = 0.0
+    median: float = 0.0
+    sigma: float = 0.0
+    maximum: float = None
+
+    def validate(self):
+        """ :raises ValueError: if the distribution is unknown or its parameters are not valid for it """
+        if self.distribution not in self.DISTRIBUTIONS:
+            raise ValueError(f'unknown latency distribution {self.distribution!r}, '
+                             f'it should be one of {", ".join(self.DISTRIBUTIONS)}')
+        if self.distribution == 'constant' and self.mean < 0:
+            raise ValueError('the mean of a constant latency should not be negative')
+        if self.distribution == 'uniform' and not 0 <= self.low <= self.high:
+            raise ValueError('the low and high of a uniform latency should satisfy 0 <= low <= high')
+        if self.distribution == 'exponential' and self.mean <= 0:
+            raise ValueError('the mean of an exponential latency should be positive')
+        if self.distribution == 'lognormal' and (self.median <= 0 or self.sigma < 0):
+            raise ValueError('the median of a lognormal latency should be positive and its sigma not negative')
+        if self.maximum is not None and self.maximum < 0:
+            raise ValueError('the maximum latency should not be negative')
+
+    def sample(self, random_generator):
+        if self.distribution == 'constant':
+            latency = self.mean
+        elif self.distribution == 'uniform':
+            latency = random_generator.uniform(self.low, self.high)
+        elif self.distribution == 'exponential':
+            latency = random_generator.expovariate(1 / self.mean)
+        else:
+            latency = random_generator.lognormvariate(math.log(self.median), self.sigma)
+
+        return latency if self.maximum is None else min(latency, self.maximum)
+
+
+@dataclass
+class EndpointFaults:
+    """
+    The faults of an endpoint:
+    - latency: the distribution of the latency added before the response
+    - error_rate: the ratio of the requests answered with 500 Internal Server Error
+    - drop_rate: the ratio of the requests whose connection is closed without a response
+    - throttle_rate: the ratio of the requests answered with 429 Too Many Requests
+    - max_rate: the requests above this rate (per second) are answered with 429 Too Many Requests
+    - retry_after: the value of the Retry-After header of the 429 responses, in seconds
+    """
+
+    latency: LatencyDistribution = field(default_factory=LatencyDistribution)
+    error_rate: float = 0.0
+    drop_rate: float = 0.0
+    throttle_rate: float = 0.0
+    max_rate: float = None
+    retry_after: float = 1.0
+
+    @classmethod
+    def from_dict(cls, faults, endpoint=DEFAULT_ENDPOINT):
+        """
+        :param faults: the faults of the endpoint, by the names of the fields of this class
+        :param endpoint: the name of the endpoint, that is given in the error messages
+        :rtype benchmarks.fault_injection.EndpointFaults
+        :raises ValueError: if a key is unknown or a value is not valid
+        """
+
+        faults = dict(faults)
+        latency = faults.get('latency', {})
+        if not isinstance(latency, dict):
+            raise ValueError(f'Invalid faults of the endpoint {endpoint!r}: latency should be an object')
+        _check_keys(endpoint, faults, cls, '')
+        _check_keys(endpoint, latency, LatencyDistribution, 'latency.')
+
+        try:
+            faults['latency'] = LatencyDistribution(**latency)
+            faults['latency'].validate()
+            endpoint_faults = cls(**faults)
+            endpoint_faults.validate()
+        except (TypeError, ValueError) as error:
+            raise ValueError(f'Invalid faults of the endpoint {endpoint!r}: {error}') from error
+
+        return endpoint_faults
+
+    def validate(self):
+        """ :raises ValueError: if a rate or the retry after is not valid """
+        for name in ('error_rate', 'drop_rate', 'throttle_rate'):
+            if not 0 <= getattr(self, name) <= 1:
+                raise ValueError(f'{name} should be between 0 and 1')
+        if self.error_rate + self.drop_rate + self.throttle_rate > 1:
+            raise ValueError('the sum of error_rate, drop_rate and throttle_rate should not be more than 1')
+        if self.max_rate is not None and self.max_rate <= 0:
+            raise ValueError('max_rate should be positive')
+        if self.retry_after < 0:
+            raise ValueError('retry_after should not be negative')
+
+
+@dataclass
+class Fault:
+    """ The fault injected into a response: the latency added and the failure, if there is any. """
+
+    latency: float = 0.0
+    failure: str = None
+    retry_after: float = None
+
+
+class FaultInjector:
+    """
+    Decides the faults of the requests of the stub server.
+    The random decisions are made with a seeded random generator, so a load test can be repeated.
+    """
+
+    def __init__(self, endpoint_faults, seed=None):
+        self.endpoint_faults = endpoint_faults
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        # created on the first request of every endpoint, so the endpoints sharing the '*' faults are limited one by one
+        self.rate_limiters = {}
+
+    @classmethod
+    def from_dict(cls, faults_by_endpoint, seed=None):
+        return cls({endpoint: EndpointFaults.from_dict(faults, endpoint)
+                    for endpoint, faults in faults_by_endpoint.items()}, seed)
+
+    @classmethod
+    def from_json_file(cls, file_path, seed=None):
+        with open(file_path, encoding='utf-8') as faults_file:
+            return cls.from_dict(json.load(faults_file), seed)
+
+    def fault(self, endpoint):
+        """
+        :param endpoint: the name of the endpoint of the request
+        :return: the fault to inject into the response of the request
+        :rtype benchmarks.fault_injection.Fault
+        """
+
+        faults = self.endpoint_faults.get(endpoint, self.endpoint_faults.get(DEFAULT_ENDPOINT))
+        if faults is None:
+            return Fault()
+
+        with self.lock:
+            latency = faults.latency.sample(self.random)
+            dice = self.random.random()
+            rate_limiter = None
+            if faults.max_rate:
+                rate_limiter = self.rate_limiters.get(endpoint)
+                if rate_limiter is None:
+                    rate_limiter = self.rate_limiters[endpoint] = TokenBucket(faults.max_rate)
+
+        if rate_limiter is not None and not rate_limiter.try_acquire():
+            return Fault(latency, THROTTLE, faults.retry_after)
+
+        for failure, rate in ((DROP, faults.drop_rate), (ERROR, faults.error_rate), (THROTTLE, faults.throttle_rate)):
+            if dice < rate:
+                return Fault(latency, failure, faults.retry_after if failure == THROTTLE else None)
+            dice -= rate
+
+        return Fault(latency)
+
+
+def _check_keys(endpoint, faults, data_class, prefix):
+    unknown_keys = set(faults) - {data_class_field.name for data_class_field in fields(data_class)}
+    if unknown_keys:
+        raise ValueError(f'Invalid faults of the endpoint {endpoint!r}: unknown keys '
+                         f'{", ".join(prefix + key for key in sorted(unknown_keys))}')
@@ -0,0 +1,269 @@
+"""
+benchmarks.load_test
+~~~~~~~~~~~~
+
+Runs a mix of Api operations at a target request rate against the local stub server,
+with latency and faults injected by the server, and reports the achieved throughput,
+the tail latencies and the breakdown of the errors.
+It helps to tune the number of workers and the retry policy for a given behaviour of the server.
+
+The requests are started on schedule (open loop), whether the earlier requests have completed or not,
+and their latency is measured from their scheduled start.
+So the time the requests wait for a free worker is included, like it is for a real ingestion job.
+
+The faults are given with a JSON file (see benchmarks.fault_injection), or with the options
+applying to every endpoint. The login is not disturbed, unless the JSON file has faults for 'login'.
+
+Usage:
+
+    python -m benchmarks.load_test --rate 200 --duration 30 --workers 32 \\
+        --mix get_submission=5 list_files=3 create_submission=1 upload_small=1 \\
+        --latency-median 0.05 --latency-sigma 0.6 --error-rate 0.01 --drop-rate 0.005 --max-rate 150
+    python -m benchmarks.load_test --rate 200 --faults faults.json --max-attempts 5 --output load.json
+
+:copyright: (c) 2021 by Karoly Erdos.
+:license: Apache2, see LICENSE for more details.
+"""
+
+import argparse
+import json
+import random
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from benchmarks.bench_suite import Scenarios, percentile
+from benchmarks.fault_injection import FaultInjector
+from benchmarks.stub_server import StubServer
+from biostudiesclient.api import Api
+from biostudiesclient.auth import Auth
+from biostudiesclient.exceptions import RestErrorException
+from biostudiesclient.instrumentation import Instrumentation
+from biostudiesclient.retry import RetryPolicy
+from biostudiesclient.session import SessionConfig
+
+OPERATIONS = ('upload_small', 'upload_large', 'list_files', 'create_submission', 'get_submission')
+DEFAULT_MIX = ('get_submission=5', 'list_files=3', 'create_submission=1', 'upload_small=1')
+PERCENTILES = (0.5, 0.9, 0.99, 0.999)
+
+
+@dataclass
+class Outcome:
+    """
+    The outcome of an operation: its latency from the scheduled start, its service time,
+    the number of retried requests and its error.
+    """
+
+    operation: str
+    latency: float
+    service_time: float
+    retries: int = 0
+    error_class: str = None
+
+
+class RetryCounter:
+    """ An after request hook counting the retries of the requests sent by the current thread. """
+
+    def __init__(self):
+        self.local = threading.local()
+
+    def __call__(self, event):
+        self.local.retries = getattr(self.local, 'retries', 0) + event.retries
+
+    def take(self):
+        retries = getattr(self.local, 'retries', 0)
+        self.local.retries = 0
+
+        return retries
+
+
+def parse_mix(mix):
+    weights = {}
+    for item in mix:
+        operation, _, weight = item.partition('=')
+        if operation not in OPERATIONS:
+            raise ValueError(f'Unknown operation: {operation}')
+        weights[operation] = float(weight or 1)
+        if weights[operation] < 0:
+            raise ValueError(f'The weight of {operation} should not be negative')
+
+    return weights
+
+
+def create_faults(args):
+    if args.faults:
+        with open(args.faults, encoding='utf-8') as faults_file:
+            faults_by_endpoint = json.load(faults_file)
+        # the login is not disturbed by the '*' faults, unless the file has faults for it, so the load test can start
+        faults_by_endpoint.setdefault('login', {})
+        return FaultInjector.from_dict(faults_by_endpoint, args.seed)
+
+    faults = {
+        'error_rate': args.error_rate,
+        'drop_rate': args.drop_rate,
+        'throttle_rate': args.throttle_rate,
+        'max_rate': args.max_rate,
+    }
+    if args.latency_median:
+        faults['latency'] = {'distribution': 'lognormal', 'median': args.latency_median,
+                             'sigma': args.latency_sigma}
+
+    # the login is not disturbed, so the load test can start
+    return FaultInjector.from_dict({'*': faults, 'login': {}}, args.seed)
+
+
+def error_class(error):
+    if isinstance(error, RestErrorException):
+        return f'http_{int(error.status_code)}'
+
+    return type(error).__name__
+
+
+def call(name, operation, scheduled_start, retry_counter):
+    start = time.perf_counter()
+    error = None
+    retry_counter.take()
+    try:
+        operation()
+    except Exception as exception:  # pylint: disable=broad-except
+        error = error_class(exception)
+    end = time.perf_counter()
+
+    return Outcome(name, end - scheduled_start, end - start, retry_counter.take(), error)
+
+
+def run_load(operations, weights, rate, duration, workers, retry_counter, seed=None):
+    """
+    Starts the operations at the given rate, choosing them randomly by their weights.
+    :return: the outcomes of the operations and the elapsed time
+    """
+
+    random_generator = random.Random(seed)
+    names = list(weights)
+    name_weights = [weights[name] for name in names]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(workers) as executor:
+        futures = []
+        for index in range(int(rate * duration)):
+            scheduled_start = start + index / rate
+            delay = scheduled_start - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            name = random_generator.choices(names, name_weights)[0]
+            futures.append(executor.submit(call, name, operations[name], scheduled_start, retry_counter))
+        outcomes = [future.result() for future in futures]
+
+    return outcomes, time.perf_counter() - start
+
+
+def latency_summary(outcomes):
+    latencies = sorted(outcome.latency for outcome in outcomes)
+    summary = {'count': len(latencies), 'errors': sum(1 for outcome in outcomes if outcome.error_class),
+               'retries': sum(outcome.retries for outcome in outcomes)}
+    for fraction in PERCENTILES:
+        summary[f'p{fraction * 100:g}'] = percentile(latencies, fraction)
+    summary['max'] = latencies[-1]
+
+    return summary
+
+
+def summarise(outcomes, elapsed, args):
+    by_operation = defaultdict(list)
+    for outcome in outcomes:
+        by_operation[outcome.operation].append(outcome)
+    errors = Counter(f'{outcome.operation} {outcome.error_class}' for outcome in outcomes if outcome.error_class)
+
+    return {
+        'offered_rate': args.rate,
+        'elapsed': elapsed,
+        'throughput': len(outcomes) / elapsed,
+        'successful_throughput': sum(1 for outcome in outcomes if not outcome.error_class) / elapsed,
+        'mean_service_time': sum(outcome.service_time for outcome in outcomes) / len(outcomes),
+        'latency': latency_summary(outcomes),
+        'operations': {name: latency_summary(operation_outcomes)
+                       for name, operation_outcomes in sorted(by_operation.items())},
+        'errors': dict(errors.most_common()),
+    }
+
+
+def report(summary):
+    print(f'offered {summary["offered_rate"]:.1f} req/s, achieved {summary["throughput"]:.1f} req/s, '
+          f'successful {summary["successful_throughput"]:.1f} req/s in {summary["elapsed"]:.1f}s, '
+          f'mean service time {summary["mean_service_time"] * 1000:.1f}ms')
+    print(f'{"operation":<18} {"count":>6} {"errors":>6} {"retries":>7} '
+          + ' '.join(f'{name:>9}' for name in ('p50', 'p90', 'p99', 'p99.9', 'max')))
+    rows = list(summary['operations'].items()) + [('all', summary['latency'])]
+    for name, latency in rows:
+        print(f'{name:<18} {latency["count"]:>6} {latency["errors"]:>6} {latency["retries"]:>7} '
+              + ' '.join(f'{latency[key] * 1000:7.1f}ms' for key in ('p50', 'p90', 'p99', 'p99.9', 'max')))
+    if summary['errors']:
+        print('errors:')
+        for error, count in summary['errors'].items():
+            print(f'  {error:<40} {count:>6}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rate', type=float, default=100, help='the target number of requests per second')
+    parser.add_argument('--duration', type=float, default=10, help='seconds')
+    parser.add_argument('--workers', type=int, default=32, help='the number of threads sending the requests')
+    parser.add_argument('--mix', nargs='+', default=list(DEFAULT_MIX), help='operation=weight items')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--faults', help='JSON file of the faults by endpoint')
+    parser.add_argument('--latency-median', type=float, default=0.0, help='seconds, lognormal latency')
+    parser.add_argument('--latency-sigma', type=float, default=0.5)
+    parser.add_argument('--error-rate', type=float, default=0.0, help='ratio of 500 responses')
+    parser.add_argument('--drop-rate', type=float, default=0.0, help='ratio of dropped connections')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='ratio of 429 responses')
+    parser.add_argument('--max-rate', type=float, default=None,
+                        help='requests per second of an endpoint above which 429 is sent')
+    parser.add_argument('--max-attempts', type=int, default=3)
+    parser.add_argument('--backoff-factor', type=float, default=0.5)
+    parser.add_argument('--retry-non-idempotent', action='store_true')
+    parser.add_argument('--large-file-mib', type=int, default=16)
+    parser.add_argument('--listing-size', type=int, default=1000)
+    parser.add_argument('--submission-files', type=int, default=100)
+    parser.add_argument('--output', help='the JSON file to save the summary to')
+    args = parser.parse_args()
+    try:
+        weights = parse_mix(args.mix)
+    except ValueError as error:
+        parser.error(str(error))
+    if args.rate <= 0 or args.duration <= 0 or args.rate * args.duration < 1:
+        parser.error('--rate and --duration should be positive and start at least one request')
+    if args.workers < 1:
+        parser.error('--workers should be at least 1')
+    if not any(weight > 0 for weight in weights.values()):
+        parser.error('--mix should have at least one operation with a positive weight')
+    try:
+        faults = create_faults(args)
+    except ValueError as error:
+        parser.error(str(error))
+
+    with StubServer(faults=faults) as server, tempfile.TemporaryDirectory() as directory:
+        scenarios = Scenarios(server, directory, argparse.Namespace(serialize_files=0, **vars(args)))
+        auth = Auth(server.base_url, session_config=SessionConfig(pool_maxsize=args.workers))
+        auth.login('load', 'load')
+        retry_counter = RetryCounter()
+        instrumentation = Instrumentation(record_metrics=False, after_request=[retry_counter])
+        api = Api(auth, retry_policy=RetryPolicy(max_attempts=args.max_attempts, backoff_factor=args.backoff_factor,
+                                                 retry_non_idempotent=args.retry_non_idempotent),
+                  instrumentation=instrumentation)
+        operations = {name: scenarios.operation(name, api)[0] for name in weights}
+
+        outcomes, elapsed = run_load(operations, weights, args.rate, args.duration, args.workers, retry_counter,
+                                     args.seed)
+
+    summary = summarise(outcomes, elapsed, args)
+    report(summary)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            json.dump(summary, output_file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,291 @@
+"""
+benchmarks.stub_server
+~~~~~~~~~~~~
+
+A local, in-process stub of the BioStudies REST API endpoints used by the client.
+It keeps the user's folder in memory, so uploads show up in the file listings,
+and it speaks HTTP/1.1 so clients can keep their connections alive.
+Optionally it injects latency and faults into the responses, see benchmarks.fault_injection.
+
+:copyright: (c) 2021 by Karoly Erdos.
+:license: Apache2, see LICENSE for more details.
+"""
+
+import itertools
+import json
+import re
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, unquote
+
+from benchmarks.fault_injection import DROP, ERROR
+
+STUB_SESSION_ID = 'stub.session.id'
+READ_CHUNK_SIZE = 64 * 1024
+
+SUBMISSION_PATH = re.compile(r'^/submissions/(?P<accession_id>[^/]+?)(?P<json>\.json)?$')
+
+
+def endpoint_name(method, path):
+    """ :return: the name of the Api method sending a request to the given path, 'login' for the login """
+    if path == '/auth/login':
+        return 'login'
+    if path == '/folder/user':
+        return 'create_user_sub_folder'
+    if path == '/files/user' or path.startswith('/files/user/'):
+        return {'POST': 'upload_file', 'GET': 'get_user_files', 'DELETE': 'delete_file'}.get(method)
+    if path == '/submissions':
+        return 'create_submission'
+    if SUBMISSION_PATH.match(path):
+        return 'get_submission' if method == 'GET' else 'delete_submission'
+
+    return None
+
+
+class StubState:
+    """ The in-memory content of the stub: the user's folders, files and the stored submissions. """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.folders = {'': {}}
+        self.submissions = {}
+        self.accession_counter = itertools.count(1)
+
+    def add_folder(self, folder_path):
+        with self.lock:
+            parent = ''
+            for folder_name in filter(None, folder_path.split('/')):
+                self.folders[parent][folder_name] = {'type': 'DIR', 'size': 4096}
+                parent = '/'.join(filter(None, [parent, folder_name]))
+                self.folders.setdefault(parent, {})
+
+    def add_file(self, folder_path, file_name, size):
+        self.add_folder(folder_path)
+        with self.lock:
+            self.folders[folder_path][file_name] = {'type': 'FILE', 'size': size}
+
+    def delete(self, path):
+        folder_path, _, name = path.strip('/').rpartition('/')
+        with self.lock:
+            self.folders.get(folder_path, {}).pop(name, None)
+            for folder in [folder for folder in self.folders if folder == path or folder.startswith(path + '/')]:
+                del self.folders[folder]
+
+    def list_folder(self, folder_path):
+        with self.lock:
+            entries = self.folders.get(folder_path)
+            if entries is None:
+                return None
+            path = '/'.join(filter(None, ['user', folder_path]))
+            return [{'name': name, 'path': path, 'size': entry['size'], 'type': entry['type']}
+                    for name, entry in entries.items()]
+
+    def store_submission(self, submission):
+        with self.lock:
+            accession_id = submission.get('accno') or f'S-STUB{next(self.accession_counter)}'
+            submission['accno'] = accession_id
+            self.submissions[accession_id] = submission
+            return submission
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    """ Handles the requests of the BioStudies client against the stub state of the server. """
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        path, query = self.__split_path()
+        if self.__inject_fault(endpoint_name('POST', path)):
+            return
+        if path == '/auth/login':
+            self.__read_body()
+            self.send_json(HTTPStatus.OK, {'sessid': STUB_SESSION_ID})
+        elif path == '/folder/user':
+            self.__read_body()
+            self.server.state.add_folder(query.get('folder', [''])[0])
+            self.send_json(HTTPStatus.OK, None)
+        elif path == '/files/user' or path.startswith('/files/user/'):
+            file_name, size = self.__read_multipart_file()
+            self.server.state.add_file(path[len('/files/user/'):], file_name, size)
+            self.send_json(HTTPStatus.OK, None)
+        elif path == '/submissions':
+            submission = json.loads(self.__read_body() or b'{}')
+            self.send_json(HTTPStatus.OK, self.server.state.store_submission(submission))
+        else:
+            self.__read_body()
+            self.send_not_found()
+
+    def do_GET(self):
+        path, _ = self.__split_path()
+        if self.__inject_fault(endpoint_name('GET', path)):
+            return
+        submission_match = SUBMISSION_PATH.match(path)
+        if path == '/files/user' or path.startswith('/files/user/'):
+            listing = self.server.state.list_folder(path[len('/files/user/'):])
+            if listing is None:
+                self.send_not_found()
+            else:
+                self.send_json(HTTPStatus.OK, listing)
+        elif submission_match and submission_match.group('json'):
+            submission = self.server.state.submissions.get(submission_match.group('accession_id'))
+            if submission is None:
+                self.send_not_found()
+            else:
+                self.send_json(HTTPStatus.OK, submission)
+        else:
+            self.send_not_found()
+
+    def do_DELETE(self):
+        path, query = self.__split_path()
+        if self.__inject_fault(endpoint_name('DELETE', path)):
+            return
+        submission_match = SUBMISSION_PATH.match(path)
+        if path == '/files/user':
+            self.server.state.delete(query.get('fileName', [''])[0])
+            self.send_json(HTTPStatus.OK, None)
+        elif submission_match:
+            self.server.state.submissions.pop(submission_match.group('accession_id'), None)
+            self.send_json(HTTPStatus.OK, None)
+        else:
+            self.send_not_found()
+
+    def send_json(self, status, payload, headers=None):
+        body = b'' if payload is None else json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_not_found(self):
+        self.send_json(HTTPStatus.NOT_FOUND, {'status': 404, 'error': 'Not Found', 'path': self.path})
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+    def __inject_fault(self, endpoint):
+        """ :return: True if the request has been answered (or dropped) by the injected fault """
+        if self.server.faults is None:
+            return False
+
+        fault = self.server.faults.fault(endpoint)
+        if fault.latency:
+            time.sleep(fault.latency)
+        if fault.failure is None:
+            return False
+
+        if fault.failure == DROP:
+            # the connection is closed without reading the request or sending a response, like a crashed backend
+            self.close_connection = True
+            return True
+
+        self.__read_body()
+        if fault.failure == ERROR:
+            self.send_json(HTTPStatus.INTERNAL_SERVER_ERROR, None)
+        else:
+            self.send_json(HTTPStatus.TOO_MANY_REQUESTS,
+                           {'status': 429, 'error': 'Too Many Requests', 'message': 'Rate limit exceeded.'},
+                           headers={'Retry-After': f'{fault.retry_after:g}'})
+
+        return True
+
+    def __split_path(self):
+        parsed_url = urlparse(self.path)
+        path = unquote(parsed_url.path)
+        base_path = self.server.base_path
+        if base_path and path.startswith(base_path):
+            path = path[len(base_path):]
+
+        return path.rstrip('/') or '/', parse_qs(parsed_url.query)
+
+    def __iter_body(self):
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            while True:
+                chunk_size = int(self.rfile.readline().split(b';')[0], 16)
+                if chunk_size == 0:
+                    self.rfile.readline()
+                    return
+                yield self.rfile.read(chunk_size)
+                self.rfile.readline()
+        else:
+            remaining = int(self.headers.get('Content-Length', 0))
+            while remaining > 0:
+                chunk = self.rfile.read(min(READ_CHUNK_SIZE, remaining))
+                if not chunk:
+                    return
+                remaining -= len(chunk)
+                yield chunk
+
+    def __read_body(self):
+        return b''.join(self.__iter_body())
+
+    def __read_multipart_file(self):
+        boundary = self.headers.get('Content-Type', '').partition('boundary=')[2].strip('"')
+        trailer_length = len(f'\r\n--{boundary}--\r\n')
+        head = b''
+        size = 0
+        for chunk in self.__iter_body():
+            if len(head) < READ_CHUNK_SIZE:
+                head += chunk[:READ_CHUNK_SIZE]
+            size += len(chunk)
+
+        part_headers, _, _ = head.partition(b'\r\n\r\n')
+        file_name = re.search(rb'filename="([^"]*)"', part_headers)
+        file_name = file_name.group(1).decode('utf-8') if file_name else 'unknown'
+        content_size = size - len(part_headers) - len(b'\r\n\r\n') - trailer_length
+
+        return file_name, max(content_size, 0)
+
+
+class StubServer:
+    """
+    Runs the stub BioStudies REST API in a background thread.
+    Use it as a context manager and pass its base_url to the Auth object:
+
+        with StubServer() as server:
+            auth = Auth(server.base_url)
+
+    If a benchmarks.fault_injection.FaultInjector is given, then it decides the faults of every response.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, base_path='/biostudies/submissions/api',
+                 handler_class=StubRequestHandler, faults=None):
+        self.httpd = ThreadingHTTPServer((host, port), handler_class)
+        self.httpd.daemon_threads = True
+        self.httpd.state = StubState()
+        self.httpd.base_path = base_path
+        self.httpd.faults = faults
+        self.thread = None
+
+    @property
+    def state(self):
+        return self.httpd.state
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f'http://{host}:{port}{self.httpd.base_path}'
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self.thread:
+            self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
@@ -10,9 +10,14 @@ This module implements an API that interact with the BioStudies REST API.
 
 
 import os
-import requests
+import time
+from http import HTTPStatus
 
-from biostudiesclient.response_utils import ResponseUtils
+from biostudiesclient.multipart import MultipartFileEncoder, DEFAULT_CHUNK_SIZE
+from biostudiesclient.response_utils import ResponseUtils, ResponseObject, StreamedResponse, SUCCESSFUL_STATUS_CODES
+from biostudiesclient.retry import RetryPolicy
+from biostudiesclient.submission_parser import parse_submission, parse_submission_stream, iter_submission_items, \
+    iter_user_files
 
 LOGIN_TO_BST = '/auth/login'
 CREATE_FOLDER = '/folder/user?folder={folder_name}'
@@ -22,6 +27,7 @@ DELETE_FILE = '/files/user?fileName={file_name}'
 CREATE_SUBMISSION = '/submissions'
 GET_SUBMISSION_BY_ACCESSION_ID = '/submissions/{accession_id}.json'
 DELETE_SUBMISSION = '/submissions/{accession_id}'
+SESSION_TOKEN_HEADER = 'X-SESSION-TOKEN'
 
 
 class Api:
@@ -35,13 +41,51 @@ class Api:
     - get the list of user's files from the given folder
     - delete a user's file
     - send a submission to BioStudies archive
-    - query an existing submission in the BioStudies archive
+    - query an existing submission in the BioStudies archive,
+    as a JSON document or converted to the data classes of biostudiesclient.models
     - delete an existing submission from the BioStudies archive
+
+    All the requests are sent through the connection-pooled session of the given Auth object,
+    unless a different session has been given by the user.
+    Requests failing with a transient error are retried according to the retry policy.
+    By default only the idempotent requests (queries and deletions) are retried,
+    the retry of POST requests has to be enabled in the retry policy.
+
+    Optionally every request (including the retries) can take a token from a rate limiter,
+    like biostudiesclient.rate_limit.TokenBucket, and run in a slot of a concurrency limiter,
+    like biostudiesclient.rate_limit.AdaptiveConcurrencyLimiter.
+    Both can be shared by several Api objects and threads.
+
+    If a biostudiesclient.cache.ResponseCache is given, then the responses of get_submission and get_user_files
+    are cached and revalidated with conditional requests.
+    The cached entries are invalidated by the requests of this object that modify the same submission or folder.
+
+    If a biostudiesclient.remote_index.RemoteIndex is given, then the files uploaded, the files deleted
+    and the folders created by this object are recorded in it.
+
+    If a biostudiesclient.validation.SubmissionValidator is given, then the metadata of create_submission
+    is validated locally, and an invalid submission is rejected without sending it.
+
+    If a request is rejected because the session has expired (401 Unauthorized)
+    and the Auth object can refresh its session, then the request is replayed once with the new session id.
+    Otherwise the rejected session id is only removed from the session cache of the Auth object.
+
+    If a biostudiesclient.instrumentation.Instrumentation is given, then its hooks are called around every request,
+    and the latencies, transferred bytes, retries and errors of the requests are recorded in its metrics.
     """
 
-    def __init__(self, auth):
+    def __init__(self, auth, session=None, retry_policy=None, rate_limiter=None, concurrency_limiter=None,
+                 cache=None, remote_index=None, validator=None, instrumentation=None):
         self.auth = auth
         self.base_url = auth.base_url
+        self.session = session if session else auth.session
+        self.retry_policy = retry_policy if retry_policy else RetryPolicy()
+        self.rate_limiter = rate_limiter
+        self.concurrency_limiter = concurrency_limiter
+        self.cache = cache
+        self.remote_index = remote_index
+        self.validator = validator
+        self.instrumentation = instrumentation
 
     def create_user_sub_folder(self, folder_name):
         """
@@ -56,17 +100,33 @@ class Api:
         url = self.base_url + CREATE_FOLDER.format(folder_name=folder_name)
 
         headers = self.get_basic_headers()
-        response = ResponseUtils.handle_response(requests.post(url, headers=headers))
+        response = self.__handle_response(
+            'create_user_sub_folder', self.__send('create_user_sub_folder', 'post', url, idempotent=False,
+                                                  headers=headers))
+
+        folder_names = folder_name.strip('/').split('/')
+        for index in range(len(folder_names)):
+            self.__invalidate(self.__user_files_url('/'.join(folder_names[:index])))
+        if self.remote_index is not None:
+            self.remote_index.add_folder(folder_name)
 
         return response
 
-    def upload_file(self, file_path, folder_path=None):
+    def upload_file(self, file_path, folder_path=None, progress_callback=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                    compute_checksum=False):
         """
-        Upload a file from the given file path into the user's folder or sub-folder
+        Upload a file from the given file path into the user's folder or sub-folder.
+        The file is streamed from the disk while the request is being sent,
+        so the memory used does not depend on the size of the file.
         :param file_path: the path of the file locally where it can be accessed for upload
         :param folder_path: the path of the sub folders in the user's folder on the server
                             where the file will be uploaded.
                             It should be in the format of 'folder1/folder2/folder3'.
+        :param progress_callback: optional callable receiving a biostudiesclient.multipart.UploadProgress object
+                                  every time chunk_size bytes have been sent and when the upload finished
+        :param chunk_size: the number of bytes read from the file at once and between 2 progress reports
+        :param compute_checksum: if True, the MD5 checksum of the file is calculated while it is sent
+                                 and it is set in the last progress report
         :return: Response from BioStudies API
         :rtype biostudiesclient.response_utils.ResponseObject
         """
@@ -78,18 +138,20 @@ class Api:
 
         headers = self.get_basic_headers()
 
-        with open(file_path, "rb") as a_file:
-            file_dict = [(
-                'files',
-                (os.path.basename(file_path), a_file)
-            )]
+        with MultipartFileEncoder(file_path, chunk_size=chunk_size, progress_callback=progress_callback,
+                                  compute_checksum=compute_checksum) as body:
+            headers.update({'Content-Type': body.content_type})
+
+            response = self.__handle_response(
+                'upload_file', self.__send('upload_file', 'post', url, idempotent=False, headers=headers, data=body))
 
-            response = ResponseUtils.handle_response(
-                requests.post(url, headers=headers, files=file_dict))
+        self.__invalidate(self.__user_files_url(folder_path))
+        if self.remote_index is not None:
+            self.remote_index.add_file(folder_path, os.path.basename(file_path), os.path.getsize(file_path))
 
         return response
 
-    def get_user_files(self, folder_path=None):
+    def get_user_files(self, folder_path=None, stream=False):
         """
         Get the list of files and folders from the user's root directory
         if the folder_path parameter is empty,
@@ -98,21 +160,21 @@ class Api:
 
         :param folder_path: the path of the sub folders in the user's folder on the server.
                             It should be in the format of 'folder1/folder2/folder3'.
-        :return: Response from BioStudies API
+        :param stream: if True, then the json of the response is a generator of the files and folders,
+                       parsed one by one while the response is read from the connection.
+                       The response should be closed if the generator is not exhausted.
+                       It requires ijson and bypasses the cache.
+        :return: Response from BioStudies API, a biostudiesclient.response_utils.StreamedResponse if stream is True
         :rtype biostudiesclient.response_utils.ResponseObject
         """
 
-        url = self.base_url + GET_USER_FILES
-
-        if folder_path:
-            url = '/'.join([url, folder_path])
+        url = self.__user_files_url(folder_path)
+        if stream:
+            return self.__streamed_response('get_user_files', url, iter_user_files)
 
         headers = self.get_basic_headers()
 
-        response = ResponseUtils.handle_response(
-            requests.get(url, headers=headers))
-
-        return response
+        return self.__get('get_user_files', url, headers)
 
     def delete_file(self, file_name):
         """
@@ -127,8 +189,15 @@ class Api:
         url = self.base_url + DELETE_FILE.format(file_name=file_name)
         headers = self.get_basic_headers()
 
-        response = ResponseUtils.handle_response(
-            requests.delete(url, headers=headers))
+        response = self.__handle_response('delete_file', self.__send('delete_file', 'delete', url, headers=headers))
+
+        self.__invalidate(self.__user_files_url(file_name.strip('/').rpartition('/')[0]))
+        self.__invalidate(self.__user_files_url(file_name))
+        if self.cache is not None:
+            # a deleted folder takes its sub folders with it
+            self.cache.invalidate_prefix(self.__user_files_url(file_name.rstrip('/')) + '/')
+        if self.remote_index is not None:
+            self.remote_index.remove(file_name)
 
         return response
 
@@ -138,34 +207,81 @@ class Api:
         In the metadata the user can include a list of files, too.
         :param metadata: Contains all the metadata belongs to a submission.
         The metadata optionally can contain information of files that belongs to this submission.
+        It can be given as an already serialized JSON document (str or UTF-8 encoded bytes), too,
+        then it is sent as it is.
         :return: Response from BioStudies API
         :rtype biostudiesclient.response_utils.ResponseObject
+        :raise biostudiesclient.exceptions.SubmissionValidationException if the validator rejected the metadata
         """
 
+        if self.validator is not None and not isinstance(metadata, (str, bytes)):
+            self.validator.check(metadata)
+
         url = self.base_url + CREATE_SUBMISSION
         headers = self.get_basic_headers()
         headers.update({'Submission_Type': 'application/json'})
 
-        response = ResponseUtils.handle_response(
-            requests.post(url, headers=headers, json=metadata))
+        if isinstance(metadata, (str, bytes)):
+            headers.update({'Content-Type': 'application/json'})
+            body = {'data': metadata.encode('utf-8') if isinstance(metadata, str) else metadata}
+            metadata_accession_id = None
+        else:
+            body = {'json': metadata}
+            metadata_accession_id = metadata.get('accno')
+
+        response = self.__handle_response(
+            'create_submission', self.__send('create_submission', 'post', url, idempotent=False, headers=headers,
+                                             **body))
+
+        for accession_id in {metadata_accession_id, (response.json or {}).get('accno')}:
+            if accession_id:
+                self.__invalidate(self.__submission_url(accession_id))
 
         return response
 
-    def get_submission(self, accession_id):
+    def get_submission(self, accession_id, stream=False):
         """
         Get all the metadata information of a specific submission given by the accession id parameter.
         :param accession_id: accession id of the queried submission.
-        :return: Response from BioStudies API
+        :param stream: if True, then the json of the response is a generator of (item type, JSON) tuples
+                       of the files, links and sub sections of the submission's section,
+                       parsed one by one while the response is read from the connection,
+                       followed by the rest of the submission.
+                       See biostudiesclient.submission_parser.iter_submission_items.
+                       The response should be closed if the generator is not exhausted.
+                       It requires ijson and bypasses the cache.
+        :return: Response from BioStudies API, a biostudiesclient.response_utils.StreamedResponse if stream is True
         :rtype biostudiesclient.response_utils.ResponseObject
         """
 
-        url = self.base_url + GET_SUBMISSION_BY_ACCESSION_ID.format(accession_id=accession_id)
+        url = self.__submission_url(accession_id)
+        if stream:
+            return self.__streamed_response('get_submission', url, iter_submission_items)
+
         headers = self.get_basic_headers()
 
-        response = ResponseUtils.handle_response(
-            requests.get(url, headers=headers))
+        return self.__get('get_submission', url, headers)
 
-        return response
+    def get_bio_study(self, accession_id, lazy=True, stream=False):
+        """
+        Get a specific submission given by the accession id parameter converted to the data classes of the models.
+        :param accession_id: accession id of the queried submission.
+        :param lazy: if True, then the section of the submission, and its files, links and sub sections
+                     are converted only when they are first accessed.
+        :param stream: if True, then the response is parsed while it is read from the connection,
+                       without keeping the whole JSON document in memory. It requires ijson and bypasses the cache.
+        :return: the submission
+        :rtype biostudiesclient.models.BioStudy
+        """
+
+        if not stream:
+            return parse_submission(self.get_submission(accession_id).json, lazy)
+
+        input_response = self.__open_stream('get_submission', self.__submission_url(accession_id))
+        try:
+            return parse_submission_stream(input_response.raw)
+        finally:
+            input_response.close()
 
     def delete_submission(self, accession_id):
         """
@@ -178,8 +294,10 @@ class Api:
         url = self.base_url + DELETE_SUBMISSION.format(accession_id=accession_id)
         headers = self.get_basic_headers()
 
-        response = ResponseUtils.handle_response(
-            requests.delete(url, headers=headers))
+        response = self.__handle_response(
+            'delete_submission', self.__send('delete_submission', 'delete', url, headers=headers))
+
+        self.__invalidate(self.__submission_url(accession_id))
 
         return response
 
@@ -200,5 +318,147 @@ class Api:
         """
 
         return {
-            'X-SESSION-TOKEN': self.session_id()
+            SESSION_TOKEN_HEADER: self.session_id()
         }
+
+    def __send(self, operation, method, url, idempotent=True, **kwargs):
+        if self.instrumentation is None:
+            return self.__send_with_retries(operation, method, url, idempotent, None, **kwargs)
+
+        event = self.instrumentation.request_started(operation, method, url, kwargs.get('headers'))
+        try:
+            response = self.__send_with_retries(operation, method, url, idempotent, event, **kwargs)
+        except Exception as error:
+            self.instrumentation.request_finished(event, error=error)
+            raise
+        self.instrumentation.request_finished(event, response, streamed=kwargs.get('stream', False))
+
+        return response
+
+    def __send_with_retries(self, operation, method, url, idempotent, event, **kwargs):
+        # the latency of uploads and streamed downloads depends on their size, not only on the load of the server
+        latency_sensitive = not kwargs.get('stream', False) \
+            and not isinstance(kwargs.get('data'), MultipartFileEncoder)
+
+        def send():
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            if not self.concurrency_limiter:
+                return getattr(self.session, method)(url, **kwargs)
+
+            start_time = self.concurrency_limiter.acquire()
+            status_code = None
+            try:
+                response = getattr(self.session, method)(url, **kwargs)
+                status_code = response.status_code
+                return response
+            finally:
+                self.concurrency_limiter.release(start_time, status_code, operation, latency_sensitive)
+
+        def rewind_body(_attempt):
+            if event is not None:
+                event.retries += 1
+            body = kwargs.get('data')
+            if hasattr(body, 'reset'):
+                body.reset()
+
+        response = self.retry_policy.call(send, idempotent, before_retry=rewind_body)
+        if not self.__session_rejected(response, kwargs.get('headers')):
+            return response
+        if not self.auth.can_refresh_session:
+            self.auth.invalidate_session(kwargs['headers'][SESSION_TOKEN_HEADER])
+            return response
+
+        # the request has been rejected by the server, so it can be replayed even if it is not idempotent
+        response.close()
+        headers = kwargs['headers']
+        headers[SESSION_TOKEN_HEADER] = self.auth.refresh_session(headers[SESSION_TOKEN_HEADER])
+        rewind_body(0)
+
+        return self.retry_policy.call(send, idempotent, before_retry=rewind_body)
+
+    def __handle_response(self, operation, input_response):
+        if self.instrumentation is None:
+            return ResponseUtils.handle_response(input_response)
+
+        start_time = time.perf_counter()
+        error = None
+        try:
+            return ResponseUtils.handle_response(input_response)
+        except Exception as exception:
+            error = exception
+            raise
+        finally:
+            self.instrumentation.response_handled(operation, time.perf_counter() - start_time, error)
+
+    @staticmethod
+    def __session_rejected(response, headers):
+        return response.status_code == HTTPStatus.UNAUTHORIZED and SESSION_TOKEN_HEADER in (headers or {})
+
+    def __get(self, operation, url, headers):
+        if self.cache is None:
+            return self.__handle_response(operation, self.__send(operation, 'get', url, headers=headers))
+
+        entry = self.cache.get(url)
+        if entry and entry.is_fresh(self.cache.ttl):
+            return self.__cached_response(entry)
+        if entry and entry.can_revalidate:
+            headers.update(entry.conditional_headers())
+
+        input_response = self.__send(operation, 'get', url, headers=headers)
+        if entry and input_response.status_code == HTTPStatus.NOT_MODIFIED:
+            self.cache.touch(url)
+            return self.__cached_response(entry)
+
+        response = self.__handle_response(operation, input_response)
+        self.cache.put(url, response.status, response.json,
+                       etag=input_response.headers.get('ETag'),
+                       last_modified=input_response.headers.get('Last-Modified'),
+                       size=len(input_response.content or b''))
+
+        return response
+
+    def __open_stream(self, operation, url):
+        input_response = self.__send(operation, 'get', url, headers=self.get_basic_headers(), stream=True)
+        if input_response.status_code not in SUCCESSFUL_STATUS_CODES:
+            try:
+                self.__handle_response(operation, input_response)
+            finally:
+                input_response.close()
+        input_response.raw.decode_content = True
+
+        return input_response
+
+    def __streamed_response(self, operation, url, parse):
+        input_response = self.__open_stream(operation, url)
+
+        def items():
+            try:
+                yield from parse(input_response.raw)
+            finally:
+                input_response.close()
+
+        return StreamedResponse(input_response, items())
+
+    def __invalidate(self, url):
+        if self.cache is not None:
+            self.cache.invalidate(url)
+
+    def __user_files_url(self, folder_path):
+        url = self.base_url + GET_USER_FILES
+
+        if folder_path:
+            url = '/'.join([url, folder_path])
+
+        return url
+
+    def __submission_url(self, accession_id):
+        return self.base_url + GET_SUBMISSION_BY_ACCESSION_ID.format(accession_id=accession_id)
+
+    @staticmethod
+    def __cached_response(entry):
+        response = ResponseObject()
+        response.status = entry.status
+        response.json = entry.json
+
+        return response
@@ -0,0 +1,207 @@
+"""
+biostudiesclient.async_api
+~~~~~~~~~~~~
+
+This module implements an asyncio based API that interact with the BioStudies REST API.
+
+:copyright: (c) 2021 by Karoly Erdos.
+:license: Apache2, see LICENSE for more details.
+"""
+
+import asyncio
+import os
+from http import HTTPStatus
+
+try:
+    import aiohttp
+except ImportError as import_error:
+    raise ImportError('The asyncio client requires aiohttp. '
+                      'Please, install it with: pip install biostudies-client[async]') from import_error
+
+from biostudiesclient.api import CREATE_FOLDER, UPLOAD_FILE, GET_USER_FILES, DELETE_FILE, CREATE_SUBMISSION, \
+    GET_SUBMISSION_BY_ACCESSION_ID, DELETE_SUBMISSION, SESSION_TOKEN_HEADER
+from biostudiesclient.response_utils import ResponseUtils, BufferedResponse
+
+DEFAULT_MAX_CONCURRENCY = 100
+
+
+class AsyncApi:
+    """
+    This class responsibility to interact with the BioStudies API from asyncio code.
+    It provides the same methods as biostudiesclient.api.Api, as coroutines.
+
+    All the requests are sent through the aiohttp client session of the given AsyncAuth object,
+    and at most max_concurrency requests of this object are in flight at the same time.
+    A request rejected because the session has expired is replayed once after the session has been refreshed.
+    """
+
+    def __init__(self, auth, max_concurrency=DEFAULT_MAX_CONCURRENCY):
+        self.auth = auth
+        self.base_url = auth.base_url
+        self.max_concurrency = max_concurrency
+        self.__semaphore = None
+
+    async def create_user_sub_folder(self, folder_name):
+        """
+        Create a folder in the user's directory.
+        The name of the folder could be a single folder
+        or a deeper folder structure like: 'folder1/folder2/folder3'.
+        :param folder_name: the name of the folder or folder structure to be create for the user
+        :return: Response from BioStudies API
+        :rtype biostudiesclient.response_utils.ResponseObject
+        """
+
+        url = self.base_url + CREATE_FOLDER.format(folder_name=folder_name)
+
+        return await self.__request('POST', url)
+
+    async def upload_file(self, file_path, folder_path=None):
+        """
+        Upload a file from the given file path into the user's folder or sub-folder.
+        The file is not read into the memory, aiohttp streams it from the disk in chunks,
+        reading them in the default executor of the event loop, so the event loop is not blocked.
+        :param file_path: the path of the file locally where it can be accessed for upload
+        :param folder_path: the path of the sub folders in the user's folder on the server
+                            where the file will be uploaded.
+                            It should be in the format of 'folder1/folder2/folder3'.
+        :return: Response from BioStudies API
+        :rtype biostudiesclient.response_utils.ResponseObject
+        """
+
+        url = self.base_url + UPLOAD_FILE
+
+        if folder_path:
+            url = '/'.join([url, folder_path])
+
+        with open(file_path, "rb") as a_file:
+            def form_data():
+                # a form can be sent only once, a replayed upload needs a new one
+                a_file.seek(0)
+                data = aiohttp.FormData()
+                data.add_field('files', a_file, filename=os.path.basename(file_path))
+                return data
+
+            response = await self.__request('POST', url, data_factory=form_data)
+
+        return response
+
+    async def get_user_files(self, folder_path=None):
+        """
+        Get the list of files and folders from the user's root directory
+        if the folder_path parameter is empty,
+        otherwise return the contents of the user's sub folder structure defined by
+        the value of the given parameter.
+
+        :param folder_path: the path of the sub folders in the user's folder on the server.
+                            It should be in the format of 'folder1/folder2/folder3'.
+        :return: Response from BioStudies API
+        :rtype biostudiesclient.response_utils.ResponseObject
+        """
+
+        url = self.base_url + GET_USER_FILES
+
+        if folder_path:
+            url = '/'.join([url, folder_path])
+
+        return await self.__request('GET', url)
+
+    async def delete_file(self, file_name):
+        """
+        Delete a file/folder with the given file/folder name from the user's root folder or sub-folder path.
+        :param file_name:   the name of the file or folder to be deleted.
+                            If it is a folder that needs to be deleted,
+                            then the parameter's value should be in the format of 'folder1/folder2/folder3'.
+        :return: Response from BioStudies API
+        :rtype biostudiesclient.response_utils.ResponseObject
+        """
+
+        url = self.base_url + DELETE_FILE.format(file_name=file_name)
+
+        return await self.__request('DELETE', url)
+
+    async def create_submission(self, metadata):
+        """
+        Create and submit a submission with the given metadata.
+        In the metadata the user can include a list of files, too.
+        :param metadata: Contains all the metadata belongs to a submission.
+        The metadata optionally can contain information of files that belongs to this submission.
+        :return: Response from BioStudies API
+        :rtype biostudiesclient.response_utils.ResponseObject
+        """
+
+        url = self.base_url + CREATE_SUBMISSION
+
+        return await self.__request('POST', url, json=metadata, headers={'Submission_Type': 'application/json'})
+
+    async def get_submission(self, accession_id):
+        """
+        Get all the metadata information of a specific submission given by the accession id parameter.
+        :param accession_id: accession id of the queried submission.
+        :return: Response from BioStudies API
+        :rtype biostudiesclient.response_utils.ResponseObject
+        """
+
+        url = self.base_url + GET_SUBMISSION_BY_ACCESSION_ID.format(accession_id=accession_id)
+
+        return await self.__request('GET', url)
+
+    async def delete_submission(self, accession_id):
+        """
+        Delete a specific submission from the BioStudies archive given by the accession id parameter.
+        :param accession_id: accession id of the queried submission.
+        :return: Response from BioStudies API
+        :rtype biostudiesclient.response_utils.ResponseObject
+        """
+
+        url = self.base_url + DELETE_SUBMISSION.format(accession_id=accession_id)
+
+        return await self.__request('DELETE', url)
+
+    def session_id(self):
+        """
+        Gets session id from AsyncAuth object.
+        :return: Session id from AsyncAuth object.
+        """
+        return self.auth.session_id
+
+    def get_basic_headers(self):
+        """
+        Creates and returns a dictionary with the session id parameter
+        for the HTTP header request.
+        :return a dictionary with a session id
+        :rtype dict
+        """
+
+        return {
+            SESSION_TOKEN_HEADER: self.session_id()
+        }
+
+    async def __request(self, method, url, headers=None, data_factory=None, **kwargs):
+        request_headers = self.get_basic_headers()
+        if headers:
+            request_headers.update(headers)
+
+        input_response = await self.__send(method, url, request_headers, data_factory, **kwargs)
+        if input_response.status_code == HTTPStatus.UNAUTHORIZED and self.auth.can_refresh_session:
+            expired_session_id = request_headers[SESSION_TOKEN_HEADER]
+            request_headers[SESSION_TOKEN_HEADER] = await self.auth.refresh_session(expired_session_id)
+            input_response = await self.__send(method, url, request_headers, data_factory, **kwargs)
+
+        return ResponseUtils.handle_response(input_response)
+
+    async def __send(self, method, url, headers, data_factory, **kwargs):
+        if data_factory is not None:
+            kwargs['data'] = data_factory()
+
+        async with self.__get_semaphore():
+            async with self.auth.session.request(method, url, headers=headers, **kwargs) as input_response:
+                text = await input_response.text()
+
+        return BufferedResponse(input_response.status, str(input_response.url), text)
+
+    def __get_semaphore(self):
+        # created lazily, so it belongs to the event loop the requests are running in
+        if self.__semaphore is None:
+            self.__semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        return self.__semaphore
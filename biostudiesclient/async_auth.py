@@ -0,0 +1,155 @@
+"""
+biostudiesclient.async_auth
+~~~~~~~~~~~~
+
+This module dealing with authentication for the asyncio based client.
+
+:copyright: (c) 2021 by Karoly Erdos.
+:license: Apache2, see LICENSE for more details.
+"""
+
+import asyncio
+from http import HTTPStatus
+
+try:
+    import aiohttp
+except ImportError as import_error:
+    raise ImportError('The asyncio client requires aiohttp. '
+                      'Please, install it with: pip install biostudies-client[async]') from import_error
+
+from biostudiesclient.auth import AuthResponse
+from biostudiesclient.config import get_username_from_env, get_password_from_env, get_biostudies_base_url_from_env
+from biostudiesclient.response_utils import ResponseUtils, BufferedResponse
+from biostudiesclient.session import SessionConfig
+
+
+class AsyncAuth:
+    """
+    This class dealing with authentication to BioStudies REST API from asyncio code.
+    It is using the provided credentials to login to BioStudies API
+    and gets the session id from its response.
+    It also owns the aiohttp client session with its connection pool,
+    that is shared with the AsyncApi objects created with this AsyncAuth object.
+
+    The client session has to be closed when it is not needed anymore,
+    either by calling the close method or by using this object as an async context manager.
+
+    If auto_refresh is True, then an expired session is refreshed like with biostudiesclient.auth.Auth,
+    the coroutines finding the same expired session share a single login.
+    """
+
+    def __init__(self, base_url=None, session_config=None, auto_refresh=True):
+        self.username = None
+        self.password = None
+        self.session_id = None
+        self.auto_refresh = auto_refresh
+        self.__refresh_lock = None
+        if base_url:
+            self.base_url = base_url
+        else:
+            self.base_url = get_biostudies_base_url_from_env()
+
+        self.login_url = f'{self.base_url}/auth/login'
+        self.session_config = session_config if session_config else SessionConfig()
+        self.__session = None
+
+    @property
+    def session(self):
+        """
+        Returns the aiohttp client session, it is created on first use inside the running event loop.
+        :return: the shared aiohttp client session
+        :rtype aiohttp.ClientSession
+        """
+        if self.__session is None or self.__session.closed:
+            self.__session = self.__create_session()
+
+        return self.__session
+
+    async def login(self, username=None, password=None):
+        """
+        This method tries to send a login request with the configured credentials
+        to the BioStudies REST API.
+        In case the response is 200 OK, then parse the response and gets the session id from it.
+        Otherwise it raises an exception with the error message from the response.
+        :return: Response from BioStudies API with the session id included
+        :rtype biostudiesclient.auth.AuthResponse
+        """
+
+        self.__set_credentials(username, password)
+
+        async with self.session.post(self.login_url, json=self.__login_payload()) as input_response:
+            text = await input_response.text()
+
+        response = ResponseUtils.handle_response(
+            BufferedResponse(input_response.status, str(input_response.url), text))
+
+        auth_response = AuthResponse(status=HTTPStatus(response.status))
+
+        self.session_id = response.json["sessid"]
+        auth_response.session_id = self.session_id
+
+        return auth_response
+
+    @property
+    def can_refresh_session(self):
+        """
+        :return: True if auto_refresh is enabled and the credentials of the last login are known,
+                 so an expired session can be replaced by a new login
+        :rtype bool
+        """
+        return bool(self.auto_refresh and self.username and self.password)
+
+    async def refresh_session(self, expired_session_id):
+        """
+        Logs in again with the credentials of the last login, unless the expired session
+        has already been replaced by another coroutine.
+        :param expired_session_id: the session id rejected by the BioStudies REST API
+        :return: the new session id
+        :rtype str
+        """
+
+        # created lazily, so it belongs to the event loop the requests are running in
+        if self.__refresh_lock is None:
+            self.__refresh_lock = asyncio.Lock()
+
+        async with self.__refresh_lock:
+            if self.session_id == expired_session_id:
+                await self.login(self.username, self.password)
+
+            return self.session_id
+
+    async def close(self):
+        """ Closes the aiohttp client session and its pooled connections. """
+        if self.__session is not None:
+            await self.__session.close()
+            self.__session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    def __create_session(self):
+        config = self.session_config
+        connector = aiohttp.TCPConnector(limit=config.pool_connections * config.pool_maxsize,
+                                         limit_per_host=config.pool_maxsize,
+                                         force_close=not config.keep_alive)
+        timeout = aiohttp.ClientTimeout(sock_connect=config.connect_timeout, sock_read=config.read_timeout)
+
+        return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+    def __set_credentials(self, username, password):
+        self.username = get_username_from_env()
+        self.password = get_password_from_env()
+
+        if username:
+            self.username = username
+        if password:
+            self.password = password
+
+    def __login_payload(self):
+        return {
+            "login": self.username,
+            "password": self.password
+        }
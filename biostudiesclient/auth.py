@@ -8,12 +8,13 @@ This module dealing with authentication
 :license: Apache2, see LICENSE for more details.
 """
 
+import threading
 from dataclasses import dataclass
 from http import HTTPStatus
-import requests
 
 from biostudiesclient.config import get_username_from_env, get_password_from_env, get_biostudies_base_url_from_env
 from biostudiesclient.response_utils import ResponseUtils
+from biostudiesclient.session import PooledSession
 
 
 class Auth:
@@ -21,18 +22,34 @@ class Auth:
     This class dealing with authentication to BioStudies REST API.
     It is using the provided credentials to login to BioStudies API
     and gets the session id from its response.
+    It also owns the connection-pooled HTTP session,
+    that is shared with the Api objects created with this Auth object.
+
+    If auto_refresh is True, then the Api objects created with this Auth object
+    log in again with the credentials of the last login when the session has expired,
+    and replay the request that has been rejected.
+    The threads finding the same expired session share a single login.
+
+    If a biostudiesclient.session_cache.SessionCache is given, then login reuses the session id
+    cached by an earlier login of the same user with the same password, even of another process,
+    instead of logging in again.
+    A cached session id rejected by the server is removed from the cache, even if auto_refresh is False.
     """
 
-    def __init__(self, base_url=None):
+    def __init__(self, base_url=None, session=None, session_config=None, auto_refresh=True, session_cache=None):
         self.username = None
         self.password = None
         self.session_id = None
+        self.auto_refresh = auto_refresh
+        self.session_cache = session_cache
+        self.__refresh_lock = threading.Lock()
         if base_url:
             self.base_url = base_url
         else:
             self.base_url = get_biostudies_base_url_from_env()
 
         self.login_url = f'{self.base_url}/auth/login'
+        self.session = session if session else PooledSession(session_config)
 
     def login(self, username=None, password=None):
         """
@@ -42,13 +59,66 @@ class Auth:
         The method checks the returned status code from BioStudies REST API.
         In case it is 200 OK, then parse the response and gets the session id from it.
         Otherwise it gets the error message from the response.
+        If the session cache has a session id for the user and the password, then it is used
+        without sending a login request.
         :return: Response from BioStudies API with the session id or the error message included
         :rtype biostudiesclient.auth.AuthResponse
         """
 
         self.__set_credentials(username, password)
 
-        response = ResponseUtils.handle_response(requests.post(self.login_url, json=self.__login_payload()))
+        if self.session_cache is None:
+            return self.__login()
+
+        with self.session_cache.lock(self.base_url, self.username):
+            cached_session_id = self.session_cache.get(self.base_url, self.username, self.password)
+            if cached_session_id:
+                self.session_id = cached_session_id
+                return AuthResponse(status=HTTPStatus.OK, session_id=cached_session_id)
+
+            auth_response = self.__login()
+            self.session_cache.put(self.base_url, self.username, self.session_id, self.password)
+
+        return auth_response
+
+    @property
+    def can_refresh_session(self):
+        """
+        :return: True if auto_refresh is enabled and the credentials of the last login are known,
+                 so an expired session can be replaced by a new login
+        :rtype bool
+        """
+        return bool(self.auto_refresh and self.username and self.password)
+
+    def refresh_session(self, expired_session_id):
+        """
+        Logs in again with the credentials of the last login, unless the expired session
+        has already been replaced by another thread.
+        Only one thread logs in at a time, the others wait for it and get its new session id.
+        :param expired_session_id: the session id rejected by the BioStudies REST API
+        :return: the new session id
+        :rtype str
+        """
+
+        with self.__refresh_lock:
+            if self.session_id == expired_session_id:
+                self.invalidate_session(expired_session_id)
+                self.login(self.username, self.password)
+
+            return self.session_id
+
+    def invalidate_session(self, rejected_session_id):
+        """
+        Removes the session id rejected by the BioStudies REST API from the session cache,
+        so the next login does not reuse it. A session id cached by another login in the meantime is kept.
+        :param rejected_session_id: the session id rejected by the BioStudies REST API
+        """
+
+        if self.session_cache is not None:
+            self.session_cache.invalidate(self.base_url, self.username, rejected_session_id)
+
+    def __login(self):
+        response = ResponseUtils.handle_response(self.session.post(self.login_url, json=self.__login_payload()))
 
         auth_response = AuthResponse(status=HTTPStatus(response.status))
 
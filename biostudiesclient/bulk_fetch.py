@@ -0,0 +1,86 @@
+"""
+biostudiesclient.bulk_fetch
+~~~~~~~~~~~~
+
+This module implements fetching the metadata of many submissions concurrently.
+
+:copyright: (c) 2021 by Karoly Erdos.
+:license: Apache2, see LICENSE for more details.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict
+
+from biostudiesclient.concurrency import bounded_map, DEFAULT_MAX_WORKERS
+from biostudiesclient.response_utils import ResponseObject
+
+
+@dataclass
+class SubmissionResult:
+    """
+    A data class for the result of fetching a single submission.
+    It contains either the response or the exception raised while fetching the submission.
+    """
+
+    accession_id: str
+    response: ResponseObject = None
+    error: Exception = None
+
+    @property
+    def succeeded(self):
+        return self.error is None
+
+    @property
+    def json(self):
+        return self.response.json if self.response else None
+
+
+@dataclass
+class SubmissionBatch:
+    """ A data class for the fetched submissions and the errors, both keyed by accession id. """
+
+    submissions: Dict[str, Any] = field(default_factory=dict)
+    errors: Dict[str, Exception] = field(default_factory=dict)
+
+
+class SubmissionFetcher:
+    """
+    This class responsibility to fetch the metadata of many submissions with get_submission,
+    using a bounded pool of max_workers threads.
+    A failing submission does not stop the others, its error is reported in its result.
+    The connection pool of the Api's session should be at least as large as max_workers.
+    """
+
+    def __init__(self, api, max_workers=DEFAULT_MAX_WORKERS):
+        self.api = api
+        self.max_workers = max_workers
+
+    def fetch(self, accession_ids, ordered=True):
+        """
+        Fetches the given submissions concurrently and yields their results as a stream.
+        The accession ids are consumed lazily, so they can come from a generator of any length.
+        :param accession_ids: iterable of accession ids
+        :param ordered: if True the results are yielded in the order of the accession ids,
+                        otherwise as soon as they are completed
+        :return: generator of SubmissionResult objects
+        """
+
+        for outcome in bounded_map(self.api.get_submission, accession_ids, self.max_workers, ordered):
+            yield SubmissionResult(accession_id=outcome.item, response=outcome.result, error=outcome.error)
+
+    def fetch_all(self, accession_ids):
+        """
+        Fetches the given submissions concurrently and collects their JSON documents and errors.
+        :param accession_ids: iterable of accession ids
+        :return: the fetched submissions and the errors keyed by accession id
+        :rtype biostudiesclient.bulk_fetch.SubmissionBatch
+        """
+
+        batch = SubmissionBatch()
+        for result in self.fetch(accession_ids, ordered=False):
+            if result.succeeded:
+                batch.submissions[result.accession_id] = result.json
+            else:
+                batch.errors[result.accession_id] = result.error
+
+        return batch
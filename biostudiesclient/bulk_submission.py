@@ -0,0 +1,166 @@
+"""
+biostudiesclient.bulk_submission
+~~~~~~~~~~~~
+
+This module implements creating many submissions from the rows of a manifest,
+building and serializing the submissions in a pool of processes.
+
+:copyright: (c) 2021 by Karoly Erdos.
+:license: Apache2, see LICENSE for more details.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from itertools import islice
+
+from biostudiesclient.concurrency import bounded_map, DEFAULT_MAX_WORKERS
+from biostudiesclient.response_utils import ResponseObject
+from biostudiesclient.serializer import BioStudySerializer
+
+DEFAULT_CHUNK_SIZE = 16
+
+
+@dataclass
+class BuiltPayload:
+    """
+    A data class for the serialized submission built from a row of the manifest, by the index of the row.
+    It contains either the JSON document of the submission or the exception raised while building it.
+    """
+
+    index: int
+    payload: bytes = None
+    error: Exception = None
+
+
+@dataclass
+class BulkSubmissionResult:
+    """
+    A data class for the outcome of creating the submission of a row of the manifest.
+    It contains either the response or the exception raised while building or sending the submission.
+    """
+
+    index: int
+    response: ResponseObject = None
+    error: Exception = None
+    payload_size: int = 0
+
+    @property
+    def succeeded(self):
+        return self.error is None
+
+    @property
+    def accession_id(self):
+        return (self.response.json or {}).get('accno') if self.response else None
+
+
+class BulkSubmissionBuilder:
+    """
+    This class responsibility to create many submissions from the rows of a manifest, like a spreadsheet.
+
+    The given build function converts a row to a BioStudy or to a metadata dict.
+    The rows are built and serialized to JSON in a pool of processes, in chunks of chunk_size rows,
+    so building the submissions is not limited to a single core.
+    Only the serialized JSON documents are sent back from the processes,
+    and they are posted with create_submission by a pool of post_workers threads.
+
+    The build function and the rows have to be picklable, so the function has to be defined on module level.
+    The rows are consumed lazily, at most 2 chunks per process are built at the same time,
+    and the building waits for the posting, so the manifest can be a generator of any length.
+    """
+
+    def __init__(self, api, build, processes=None, post_workers=DEFAULT_MAX_WORKERS, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.api = api
+        self.build = build
+        self.processes = processes or os.cpu_count() or 1
+        self.post_workers = post_workers
+        self.chunk_size = chunk_size
+
+    def build_payloads(self, rows):
+        """
+        Builds and serializes the submissions of the given rows in the process pool.
+        If a whole chunk fails, for example because a row cannot be pickled or a process has been killed,
+        then every row of the chunk gets the error, and the other chunks are still built.
+        :param rows: iterable of the rows of the manifest
+        :return: generator of BuiltPayload objects, in the order of the rows
+        """
+
+        chunks = _chunks(enumerate(rows), self.chunk_size)
+        build_chunk = partial(_build_chunk, self.build)
+
+        with ProcessPoolExecutor(max_workers=self.processes) as executor:
+            def submit_chunk(chunk):
+                indices = [index for index, _row in chunk]
+                try:
+                    return indices, executor.submit(build_chunk, chunk)
+                except Exception as error:  # pylint: disable=broad-except
+                    # the pool is broken, for example a process has been killed
+                    failed = Future()
+                    failed.set_exception(error)
+                    return indices, failed
+
+            pending = deque(submit_chunk(chunk) for chunk in islice(chunks, 2 * self.processes))
+            while pending:
+                indices, future = pending.popleft()
+                try:
+                    built_payloads = future.result()
+                except Exception as error:  # pylint: disable=broad-except
+                    # the chunk could not be sent to a process or its result could not be sent back
+                    built_payloads = [BuiltPayload(index, error=error) for index in indices]
+                for chunk in islice(chunks, 1):
+                    pending.append(submit_chunk(chunk))
+                yield from built_payloads
+
+    def submit(self, rows):
+        """
+        Builds the submissions of the given rows and creates them with create_submission.
+        A row that cannot be built or submitted does not stop the others.
+        :param rows: iterable of the rows of the manifest
+        :return: generator of BulkSubmissionResult objects, in the order they have been completed
+        """
+
+        for outcome in bounded_map(self.__post, self.build_payloads(rows), self.post_workers, ordered=False):
+            built_payload = outcome.item
+            error = built_payload.error or outcome.error
+            yield BulkSubmissionResult(built_payload.index, response=outcome.result, error=error,
+                                       payload_size=len(built_payload.payload or b''))
+
+    def submit_all(self, rows):
+        """
+        Builds and creates the submissions of the given rows.
+        :param rows: iterable of the rows of the manifest
+        :return: the results in the order of the rows
+        :rtype list
+        """
+
+        return sorted(self.submit(rows), key=lambda result: result.index)
+
+    def __post(self, built_payload):
+        if built_payload.error is not None:
+            return None
+
+        return self.api.create_submission(built_payload.payload)
+
+
+def _chunks(items, chunk_size):
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _build_chunk(build, chunk):
+    serializer = BioStudySerializer()
+    built_payloads = []
+    for index, row in chunk:
+        try:
+            built_payloads.append(BuiltPayload(index, payload=serializer.dumps(build(row)).encode('utf-8')))
+        except Exception as error:  # pylint: disable=broad-except
+            built_payloads.append(BuiltPayload(index, error=error))
+
+    return built_payloads
+
@@ -0,0 +1,393 @@
+"""
+biostudiesclient.bulk_upload
+~~~~~~~~~~~~
+
+This module implements uploading a whole local directory tree into the user's folder.
+
+:copyright: (c) 2021 by Karoly Erdos.
+:license: Apache2, see LICENSE for more details.
+"""
+
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import List
+
+from biostudiesclient.concurrency import bounded_map, DEFAULT_MAX_WORKERS
+from biostudiesclient.upload_journal import file_checksum
+
+
+class UploadStatus(Enum):
+    UPLOADED = 'uploaded'
+    SKIPPED = 'skipped'
+    DELETED = 'deleted'
+    FAILED = 'failed'
+
+
+@dataclass
+class LocalFile:
+    """ A data class for a file of the local directory tree and the user's folder it belongs to. """
+
+    local_path: str
+    remote_folder: str
+    size: int
+    modified_time: float
+
+    @property
+    def name(self):
+        return os.path.basename(self.local_path)
+
+    @property
+    def remote_path(self):
+        return join_remote_path(self.remote_folder, self.name)
+
+
+@dataclass
+class FileUploadResult:
+    """
+    A data class for the result of uploading a single file.
+    If the upload failed, then it contains the error message, too.
+    The result of deleting a remote file during a synchronisation has no local path.
+    """
+
+    local_path: str
+    remote_path: str
+    status: UploadStatus
+    size: int = 0
+    elapsed_seconds: float = 0.0
+    error: str = None
+
+
+@dataclass
+class UploadReport:
+    """ A data class for the per-file results of a directory upload. """
+
+    results: List[FileUploadResult] = field(default_factory=list)
+
+    @property
+    def uploaded(self):
+        return [result for result in self.results if result.status == UploadStatus.UPLOADED]
+
+    @property
+    def skipped(self):
+        return [result for result in self.results if result.status == UploadStatus.SKIPPED]
+
+    @property
+    def deleted(self):
+        return [result for result in self.results if result.status == UploadStatus.DELETED]
+
+    @property
+    def failed(self):
+        return [result for result in self.results if result.status == UploadStatus.FAILED]
+
+    @property
+    def succeeded(self):
+        return not self.failed
+
+
+class DirectoryUploader:
+    """
+    This class responsibility to mirror a local directory tree into the user's folder on the server.
+
+    The folder structure is created first, with one create_user_sub_folder call per leaf folder,
+    because creating a deeper folder structure creates all of its parent folders, too.
+    Then the files are uploaded concurrently by a bounded pool of max_workers threads.
+    The connection pool of the Api's session should be at least as large as max_workers,
+    otherwise the surplus connections are not kept alive.
+
+    If an UploadJournal is given, then the upload is resumable:
+    every uploaded file is recorded in the journal, and a restarted upload skips
+    the files recorded in the journal with the same size and modification time,
+    and the files that are already in the user's folder with the same size according to get_user_files.
+    With verify_checksums the MD5 checksums of the files are recorded in the journal, too,
+    calculated while the files are uploaded, and a restarted upload skips only the files with the same checksum.
+    Without it the files are not read for their checksums at all.
+
+    The sync_directory method uploads only the new and the changed files of the local tree,
+    and optionally deletes the remote files that do not exist locally.
+    """
+
+    def __init__(self, api, max_workers=DEFAULT_MAX_WORKERS, journal=None, verify_checksums=False):
+        self.api = api
+        self.max_workers = max_workers
+        self.journal = journal
+        self.verify_checksums = verify_checksums
+
+    def upload_directory(self, local_directory, remote_folder=None):
+        """
+        Upload all the files of the local directory tree into the user's folder or sub-folder.
+        :param local_directory: the path of the local directory to upload
+        :param remote_folder: the path of the sub folders in the user's folder on the server
+                              where the content of the local directory will be uploaded.
+                              It should be in the format of 'folder1/folder2/folder3'.
+        :return: the per-file results of the upload
+        :rtype biostudiesclient.bulk_upload.UploadReport
+        """
+
+        local_files, leaf_folders = scan_local_directory(local_directory, remote_folder)
+
+        report = UploadReport()
+        folders_with_files = {local_file.remote_folder for local_file in local_files}
+        empty_folders = [folder for folder in leaf_folders if folder not in folders_with_files]
+
+        if self.journal:
+            local_files = self.__skip_uploaded_files(local_files, report)
+
+        self.__upload_files(local_files, empty_folders, report)
+
+        return report
+
+    def sync_directory(self, local_directory, remote_folder=None, delete_remote=False, compare_checksums=False):
+        """
+        Synchronise the user's folder or sub-folder with the local directory tree,
+        uploading only the new and the changed files.
+        The content of every remote folder of the tree is listed only once with get_user_files.
+        A local file is unchanged if the remote file has the same size and,
+        when the uploader has a journal, the local file has the same modification time as when it was uploaded.
+        The server does not provide the modification time or the checksum of the remote files,
+        so without a journal only the sizes are compared.
+        :param local_directory: the path of the local directory to synchronise
+        :param remote_folder: the path of the sub folders in the user's folder on the server
+                              that corresponds to the local directory.
+                              It should be in the format of 'folder1/folder2/folder3'.
+        :param delete_remote: if True, the remote files and folders that do not exist locally are deleted
+        :param compare_checksums: if True, a file with a changed modification time is uploaded only if
+                                  its checksum differs from the one recorded in the journal,
+                                  the checksums are recorded by an uploader with verify_checksums
+        :return: the per-file results of the synchronisation
+        :rtype biostudiesclient.bulk_upload.UploadReport
+        """
+
+        local_files, leaf_folders = scan_local_directory(local_directory, remote_folder)
+        remote_root = (remote_folder or '').strip('/')
+        local_folders = {folder for leaf_folder in leaf_folders for folder in parent_folders(leaf_folder)
+                         if is_in_folder(folder, remote_root)}
+        local_folders.add(remote_root)
+
+        remote_listings = self.__get_remote_listings(local_folders)
+
+        report = UploadReport()
+        changed_files = []
+        for local_file in local_files:
+            remote_entry = remote_listings.get(local_file.remote_folder, {}).get(local_file.name)
+            if remote_entry and self.__is_unchanged(local_file, remote_entry, compare_checksums):
+                report.results.append(self.__skipped_result(local_file))
+            else:
+                changed_files.append(local_file)
+
+        if delete_remote:
+            self.__delete_remote_extras(local_files, local_folders, remote_listings, report)
+
+        missing_folders = [folder for folder in leaf_folders if folder not in remote_listings]
+        self.__upload_files(changed_files, missing_folders, report)
+
+        return report
+
+    def __upload_files(self, local_files, empty_folders, report):
+        created_folders, folder_errors = self.__create_folders(
+            leaf_folders_of([local_file.remote_folder for local_file in local_files] + empty_folders))
+
+        files_to_upload = []
+        for local_file in local_files:
+            if local_file.remote_folder and local_file.remote_folder not in created_folders:
+                report.results.append(self.__failed_result(
+                    local_file, folder_errors.get(local_file.remote_folder, 'The folder could not be created.')))
+            else:
+                files_to_upload.append(local_file)
+
+        for outcome in bounded_map(self.__upload_file, files_to_upload, self.max_workers, ordered=False):
+            if outcome.succeeded:
+                report.results.append(outcome.result)
+            else:
+                report.results.append(self.__failed_result(outcome.item, str(outcome.error)))
+
+    def __skip_uploaded_files(self, local_files, report):
+        not_in_journal = []
+        for local_file in local_files:
+            if self.journal.is_completed(local_file, self.verify_checksums):
+                report.results.append(self.__skipped_result(local_file))
+            else:
+                not_in_journal.append(local_file)
+
+        remote_listings = self.__get_remote_listings({local_file.remote_folder for local_file in not_in_journal})
+
+        pending_files = []
+        for local_file in not_in_journal:
+            remote_entry = remote_listings.get(local_file.remote_folder, {}).get(local_file.name, {})
+            if remote_entry.get('type') == 'FILE' and remote_entry.get('size') == local_file.size:
+                self.journal.record(local_file, self.__checksum(local_file))
+                report.results.append(self.__skipped_result(local_file))
+            else:
+                pending_files.append(local_file)
+
+        return pending_files
+
+    def __is_unchanged(self, local_file, remote_entry, compare_checksums):
+        if remote_entry.get('type') != 'FILE' or remote_entry.get('size') != local_file.size:
+            return False
+        if not self.journal:
+            return True
+
+        journal_entry = self.journal.get(local_file.local_path)
+        if journal_entry is None or journal_entry.remote_path != local_file.remote_path \
+                or journal_entry.size != local_file.size:
+            # the remote file has the same size, but it has not been uploaded by us: record its current state
+            self.journal.record(local_file, self.__checksum(local_file))
+            return True
+        if journal_entry.modified_time == local_file.modified_time:
+            return True
+        if compare_checksums and journal_entry.checksum is not None \
+                and journal_entry.checksum == file_checksum(local_file.local_path):
+            self.journal.record(local_file, journal_entry.checksum)
+            return True
+
+        return False
+
+    def __delete_remote_extras(self, local_files, local_folders, remote_listings, report):
+        local_paths = {local_file.remote_path for local_file in local_files} | local_folders
+        remote_paths_to_delete = [join_remote_path(folder, name)
+                                  for folder, listing in sorted(remote_listings.items())
+                                  for name in sorted(listing)
+                                  if join_remote_path(folder, name) not in local_paths]
+
+        for outcome in bounded_map(self.api.delete_file, remote_paths_to_delete, self.max_workers):
+            report.results.append(FileUploadResult(local_path=None,
+                                                   remote_path=outcome.item,
+                                                   status=UploadStatus.DELETED if outcome.succeeded
+                                                   else UploadStatus.FAILED,
+                                                   error=None if outcome.succeeded else str(outcome.error)))
+
+    def __get_remote_listings(self, remote_folders):
+        remote_listings = {}
+        for outcome in bounded_map(lambda folder: self.api.get_user_files(folder or None),
+                                   sorted(remote_folders), self.max_workers):
+            # a folder that does not exist or cannot be listed is considered missing
+            if outcome.succeeded and isinstance(outcome.result.json, list):
+                remote_listings[outcome.item] = {entry.get('name'): entry for entry in outcome.result.json}
+
+        return remote_listings
+
+    def __create_folders(self, leaf_folders):
+        created_folders = set()
+        folder_errors = {}
+
+        for outcome in bounded_map(self.api.create_user_sub_folder, leaf_folders, self.max_workers):
+            if outcome.succeeded:
+                created_folders.update(parent_folders(outcome.item))
+            else:
+                for folder in parent_folders(outcome.item):
+                    folder_errors.setdefault(folder, str(outcome.error))
+
+        return created_folders, folder_errors
+
+    def __upload_file(self, local_file):
+        start_time = time.monotonic()
+        if self.journal and self.verify_checksums:
+            checksum = self.__upload_with_checksum(local_file)
+            self.journal.record(local_file, checksum)
+        else:
+            self.api.upload_file(local_file.local_path, local_file.remote_folder or None)
+            if self.journal:
+                self.journal.record(local_file)
+
+        return FileUploadResult(local_path=local_file.local_path,
+                                remote_path=local_file.remote_path,
+                                status=UploadStatus.UPLOADED,
+                                size=local_file.size,
+                                elapsed_seconds=time.monotonic() - start_time)
+
+    def __upload_with_checksum(self, local_file):
+        progress_reports = deque(maxlen=1)
+        self.api.upload_file(local_file.local_path, local_file.remote_folder or None,
+                             progress_callback=progress_reports.append, compute_checksum=True)
+
+        checksum = progress_reports[-1].checksum if progress_reports else None
+        # the checksum is calculated while the file is sent, it is read again only if the Api did not report it
+        return checksum if checksum else file_checksum(local_file.local_path)
+
+    def __checksum(self, local_file):
+        return file_checksum(local_file.local_path) if self.verify_checksums else None
+
+    @staticmethod
+    def __skipped_result(local_file):
+        return FileUploadResult(local_path=local_file.local_path,
+                                remote_path=local_file.remote_path,
+                                status=UploadStatus.SKIPPED,
+                                size=local_file.size)
+
+    @staticmethod
+    def __failed_result(local_file, error):
+        return FileUploadResult(local_path=local_file.local_path,
+                                remote_path=local_file.remote_path,
+                                status=UploadStatus.FAILED,
+                                size=local_file.size,
+                                error=error)
+
+
+def scan_local_directory(local_directory, remote_folder=None):
+    """
+    Walks the local directory tree and collects its files and the leaf folders of the matching remote tree.
+    :param local_directory: the path of the local directory
+    :param remote_folder: the remote folder that corresponds to the local directory, None for the user's root folder
+    :return: the list of LocalFile objects and the list of remote leaf folder paths
+    :rtype tuple
+    """
+
+    local_files = []
+    leaf_folders = []
+    remote_folder = (remote_folder or '').strip('/')
+
+    def walk(directory, folder):
+        has_sub_directory = False
+        with os.scandir(directory) as entries:
+            for entry in sorted(entries, key=lambda an_entry: an_entry.name):
+                if entry.is_dir():
+                    has_sub_directory = True
+                    walk(entry.path, join_remote_path(folder, entry.name))
+                elif entry.is_file():
+                    stat = entry.stat()
+                    local_files.append(LocalFile(entry.path, folder, stat.st_size, stat.st_mtime))
+
+        if folder and not has_sub_directory:
+            leaf_folders.append(folder)
+
+    walk(local_directory, remote_folder)
+
+    return local_files, leaf_folders
+
+
+def leaf_folders_of(folders):
+    """
+    :return: the sorted list of the given remote folders that are not parents of any other given folder
+    :rtype list
+    """
+    folders = set(filter(None, folders))
+    parents = set()
+    for folder in folders:
+        parents.update(parent_folders(folder)[:-1])
+
+    return sorted(folders - parents)
+
+
+def is_in_folder(path, folder):
+    """
+    :return: True if the remote path is the given remote folder or it is inside of it
+    :rtype bool
+    """
+    return not folder or path == folder or path.startswith(folder + '/')
+
+
+def join_remote_path(folder, name):
+    return '/'.join(filter(None, [folder, name]))
+
+
+def parent_folders(folder):
+    """
+    :return: the given remote folder path and all of its parent folder paths
+    :rtype list
+    """
+    folder_names = folder.split('/')
+
+    return ['/'.join(folder_names[:index]) for index in range(1, len(folder_names) + 1)]
@@ -0,0 +1,230 @@
+"""
+biostudiesclient.cache
+~~~~~~~~~~~~
+
+This module implements a response cache for the queries sent to the BioStudies REST API.
+
+:copyright: (c) 2021 by Karoly Erdos.
+:license: Apache2, see LICENSE for more details.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Any
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_TTL = 60.0
+
+
+@dataclass
+class CacheEntry:
+    """
+    A data class for a cached response.
+    It contains the parsed JSON of the response and the validators (ETag and Last-Modified headers),
+    that are used to revalidate the entry with a conditional request when it is not fresh anymore.
+    """
+
+    key: str
+    status: int
+    json: Any
+    etag: str = None
+    last_modified: str = None
+    size: int = 0
+    stored_at: float = 0.0
+
+    def is_fresh(self, ttl):
+        return time.time() - self.stored_at < ttl
+
+    @property
+    def can_revalidate(self):
+        return bool(self.etag or self.last_modified)
+
+    def conditional_headers(self):
+        """
+        :return: the headers of a conditional request, that returns 304 Not Modified if the entry is still valid
+        :rtype dict
+        """
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+
+        return headers
+
+
+class ResponseCache:
+    """
+    An LRU cache of responses with an optional on-disk tier.
+
+    An entry younger than ttl seconds is served without any request to the server.
+    An older entry is revalidated with a conditional request (If-None-Match / If-Modified-Since),
+    so an unchanged document costs only a 304 Not Modified response.
+    The in-memory tier keeps at most max_entries entries and at most max_bytes bytes of response bodies,
+    evicting the least recently used entries.
+    If a disk directory is given, then every entry is written to it, too,
+    and an entry evicted from the memory (or stored by another process) is read back from the disk.
+
+    The cached JSON documents are shared by all the callers getting them from the cache,
+    so they should not be modified.
+    The cache should not be shared by clients of different users, as their permissions might differ.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL, max_bytes=None, disk_directory=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.disk_directory = disk_directory
+        self.total_bytes = 0
+        self.__entries = OrderedDict()
+        self.__lock = threading.Lock()
+
+        if disk_directory:
+            os.makedirs(disk_directory, exist_ok=True)
+
+    def __len__(self):
+        return len(self.__entries)
+
+    def get(self, key):
+        """
+        :param key: the key of the entry, usually the URL of the request
+        :return: the cached entry, fresh or stale, or None if there is no entry for the key
+        :rtype biostudiesclient.cache.CacheEntry
+        """
+
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None:
+                self.__entries.move_to_end(key)
+                return entry
+
+        entry = self.__read_from_disk(key)
+        if entry is not None:
+            with self.__lock:
+                self.__store_in_memory(entry)
+
+        return entry
+
+    def put(self, key, status, response_json, etag=None, last_modified=None, size=0):
+        """
+        Stores a response in the cache.
+        :return: the new entry
+        :rtype biostudiesclient.cache.CacheEntry
+        """
+
+        entry = CacheEntry(key=key, status=status, json=response_json, etag=etag, last_modified=last_modified,
+                           size=size, stored_at=time.time())
+        with self.__lock:
+            self.__store_in_memory(entry)
+        self.__write_to_disk(entry)
+
+        return entry
+
+    def touch(self, key):
+        """ Marks the entry fresh again, after the server confirmed that it has not been modified. """
+
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                return
+            entry.stored_at = time.time()
+        self.__write_to_disk(entry)
+
+    def invalidate(self, key):
+        """ Removes the entry of the given key from both tiers of the cache. """
+
+        with self.__lock:
+            entry = self.__entries.pop(key, None)
+            if entry is not None:
+                self.total_bytes -= entry.size
+
+        if self.disk_directory:
+            try:
+                os.remove(self.__disk_path(key))
+            except FileNotFoundError:
+                pass
+
+    def invalidate_prefix(self, prefix):
+        """
+        Removes the entries whose key starts with the given prefix from both tiers of the cache.
+        The keys of the entries on the disk are read from their files, so it reads the whole disk tier.
+        """
+
+        with self.__lock:
+            for key in [key for key in self.__entries if key.startswith(prefix)]:
+                self.total_bytes -= self.__entries.pop(key).size
+
+        for path in self.__disk_paths():
+            try:
+                with open(path, encoding='utf-8') as cache_file:
+                    key = json.load(cache_file).get('key', '')
+                if key.startswith(prefix):
+                    os.remove(path)
+            except (OSError, ValueError, AttributeError):
+                # removed by another process in the meantime or not a cache entry
+                pass
+
+    def clear(self):
+        """ Removes all the entries from both tiers of the cache, including the ones only on the disk. """
+
+        with self.__lock:
+            self.__entries.clear()
+            self.total_bytes = 0
+
+        for path in self.__disk_paths():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def __store_in_memory(self, entry):
+        previous_entry = self.__entries.pop(entry.key, None)
+        if previous_entry is not None:
+            self.total_bytes -= previous_entry.size
+
+        self.__entries[entry.key] = entry
+        self.total_bytes += entry.size
+
+        while len(self.__entries) > self.max_entries or \
+                (self.max_bytes is not None and self.total_bytes > self.max_bytes and len(self.__entries) > 1):
+            _, evicted_entry = self.__entries.popitem(last=False)
+            self.total_bytes -= evicted_entry.size
+
+    def __disk_paths(self):
+        if not self.disk_directory:
+            return []
+
+        # the temporary files are left alone, they are renamed to entries by their writers
+        return [os.path.join(self.disk_directory, file_name) for file_name in os.listdir(self.disk_directory)
+                if file_name.endswith('.json')]
+
+    def __disk_path(self, key):
+        return os.path.join(self.disk_directory, hashlib.sha256(key.encode('utf-8')).hexdigest() + '.json')
+
+    def __read_from_disk(self, key):
+        if not self.disk_directory:
+            return None
+
+        try:
+            with open(self.__disk_path(key), encoding='utf-8') as cache_file:
+                entry = CacheEntry(**json.load(cache_file))
+        except (OSError, ValueError, TypeError):
+            return None
+
+        return entry if entry.key == key else None
+
+    def __write_to_disk(self, entry):
+        if not self.disk_directory:
+            return
+
+        # written to a temporary file and renamed, so a reader never sees a partially written entry
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=self.disk_directory, suffix='.tmp')
+        with os.fdopen(file_descriptor, 'w', encoding='utf-8') as cache_file:
+            json.dump(asdict(entry), cache_file)
+        os.replace(temporary_path, self.__disk_path(entry.key))
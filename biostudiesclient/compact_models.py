@@ -0,0 +1,43 @@
+"""
+biostudiesclient.compact_models
+~~~~~~~~~~~~
+
+This module contains memory efficient variants of the data models in biostudiesclient.models.
+They have the same fields, hashing and equality, but they store their fields in __slots__
+instead of a per-instance __dict__, so they can be used to build submissions with a very large number of files.
+
+Usage:
+
+    from biostudiesclient.compact_models import BioStudyFile, BioStudiesAttribute
+
+:copyright: (c) 2021 by Karoly Erdos.
+:license: Apache2, see LICENSE for more details.
+"""
+
+import dataclasses
+
+from biostudiesclient import models
+
+
+def _slotted(cls):
+    """
+    Creates a copy of the given data class that stores its fields in __slots__.
+    The field defaults are kept by the generated __init__, so they are removed from the class namespace,
+    otherwise they would conflict with the slot descriptors.
+    """
+
+    field_names = tuple(a_field.name for a_field in dataclasses.fields(cls))
+    namespace = {key: value for key, value in cls.__dict__.items()
+                 if key not in field_names and key not in ('__dict__', '__weakref__')}
+    namespace['__slots__'] = field_names
+    namespace['__module__'] = __name__
+
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+
+BioStudiesAttribute = _slotted(models.BioStudiesAttribute)
+BioStudyFile = _slotted(models.BioStudyFile)
+BioStudyLink = _slotted(models.BioStudyLink)
+BioStudySubsection = _slotted(models.BioStudySubsection)
+BioStudySection = _slotted(models.BioStudySection)
+BioStudy = _slotted(models.BioStudy)
@@ -0,0 +1,83 @@
+"""
+biostudiesclient.concurrency
+~~~~~~~~~~~~
+
+This module contains helpers for running many blocking API calls concurrently in a bounded thread pool.
+
+:copyright: (c) 2021 by Karoly Erdos.
+:license: Apache2, see LICENSE for more details.
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass
+from typing import Any
+
+DEFAULT_MAX_WORKERS = 8
+
+
+@dataclass
+class TaskResult:
+    """
+    A data class for the outcome of calling a function on one item.
+    It contains either the result of the call or the exception raised by it.
+    """
+
+    item: Any
+    result: Any = None
+    error: Exception = None
+
+    @property
+    def succeeded(self):
+        return self.error is None
+
+
+def bounded_map(function, items, max_workers=DEFAULT_MAX_WORKERS, ordered=True):
+    """
+    Calls the function with each item of the given iterable in a thread pool and yields the outcomes.
+    The items are consumed lazily: at most 2 * max_workers items are submitted to the pool at the same time,
+    so the iterable can be a generator of any length.
+    An exception raised by the function does not stop the processing of the other items,
+    it is returned in the TaskResult of the item instead.
+
+    :param function: callable with a single argument
+    :param items: iterable of the arguments
+    :param max_workers: the number of threads calling the function concurrently
+    :param ordered: if True the outcomes are yielded in the order of the items,
+                    otherwise in the order they have been completed
+    :return: generator of TaskResult objects
+    """
+
+    max_in_flight = 2 * max_workers
+    items = iter(items)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque()
+
+        def submit_next():
+            for item in items:
+                pending.append(executor.submit(_call, function, item))
+                return True
+            return False
+
+        while len(pending) < max_in_flight and submit_next():
+            pass
+
+        while pending:
+            if ordered:
+                completed = [pending.popleft()]
+            else:
+                completed, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in completed:
+                    pending.remove(future)
+
+            for future in completed:
+                submit_next()
+                yield future.result()
+
+
+def _call(function, item):
+    try:
+        return TaskResult(item, result=function(item))
+    except Exception as error:  # pylint: disable=broad-except
+        return TaskResult(item, error=error)
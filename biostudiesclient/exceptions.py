@@ -2,12 +2,16 @@
 biostudiesclient.exceptions
 ~~~~~~~~~~~~
 
-This module contains a custom exception definition regarding to BioStudies client library.
+This module contains the custom exception definitions regarding to BioStudies client library.
 
 :copyright: (c) 2021 by Karoly Erdos.
 :license: Apache2, see LICENSE for more details.
 """
 
+from http import HTTPStatus
+
+VALIDATION_ERROR_MESSAGE = 'Submission validation errors.'
+
 
 class RestErrorException(Exception):
     """ Custom exception dealing with REST error responses. """
@@ -16,3 +20,20 @@ class RestErrorException(Exception):
         super().__init__(message, status_code)
         self.message = message
         self.status_code = status_code
+
+
+class SubmissionValidationException(RestErrorException):
+    """
+    Custom exception for a submission rejected by the local validation, before it has been sent.
+    It has the same status code as the response of the server for an invalid submission,
+    and it contains the list of the problems found in the submission.
+    """
+
+    def __init__(self, errors):
+        message = ' '.join([VALIDATION_ERROR_MESSAGE] + [str(error) for error in errors])
+        super().__init__(message, HTTPStatus.BAD_REQUEST)
+        self.errors = errors
+
+    def __reduce__(self):
+        # the arguments of the constructor differ from the args of the exception, so they are given to pickle
+        return type(self), (self.errors,)
@@ -0,0 +1,222 @@
+"""
+biostudiesclient.file_table
+~~~~~~~~~~~~
+
+This module implements a columnar table of the files of a BioStudy section.
+It can be used in place of the set of BioStudyFile objects of a section with a very large number of files.
+
+:copyright: (c) 2021 by Karoly Erdos.
+:license: Apache2, see LICENSE for more details.
+"""
+
+import csv
+from collections.abc import Set
+from json.encoder import encode_basestring_ascii, encode_basestring
+
+from biostudiesclient.models import BioStudyFile, BioStudiesAttribute
+
+DEFAULT_FILE_TYPE = 'file'
+MAX_SHARED_VALUES = 65536
+PATH_COLUMN = 'Files'
+TYPE_COLUMN = 'Type'
+
+
+class FileTable(Set):
+    """
+    Stores the files of a section in parallel columns: one for the paths, one for the file types
+    and one for each attribute name, so no Python object is created per file.
+    The repeated values of the file type and attribute columns are stored only once.
+
+    It behaves as a set of BioStudyFile objects keyed by their paths, so it can be assigned to BioStudySection.files,
+    the objects are created only when the table is iterated.
+    A file is not added with add if the table already has a file with the same path, like set.add.
+    The rows appended with append, extend and the from_ builders are not checked,
+    call deduplicate if the input can have the same path more than once.
+    serializer.BioStudySerializer writes it to JSON directly from the columns.
+    """
+
+    def __init__(self, default_file_type=DEFAULT_FILE_TYPE):
+        self.default_file_type = default_file_type
+        self.paths = []
+        self.file_types = []
+        self.attribute_columns = {}
+        self.__values = {}
+        self.__path_index = None
+
+    @classmethod
+    def from_rows(cls, rows, **kwargs):
+        """
+        Builds a table from an iterable of (path, file_type, attributes) tuples.
+        :param rows: iterable of tuples, the file type can be None and the attributes is a dict or None
+        """
+
+        table = cls(**kwargs)
+        table.extend(rows)
+        return table
+
+    @classmethod
+    def from_records(cls, records, path_key='path', type_key='file_type', **kwargs):
+        """
+        Builds a table from an iterable of dicts, every key other than path_key and type_key is an attribute.
+        """
+
+        table = cls(**kwargs)
+        table.extend(_records_to_rows(records, path_key, type_key))
+        return table
+
+    @classmethod
+    def from_csv(cls, csv_file, delimiter=',', path_column=PATH_COLUMN, type_column=TYPE_COLUMN, **kwargs):
+        """
+        Builds a table from a file list with a header row, like the file lists of the BioStudies page-tab format.
+        Every column other than path_column and type_column is an attribute, empty cells are omitted.
+        :param csv_file: path of the file or a text file-like object
+        """
+
+        if isinstance(csv_file, str):
+            with open(csv_file, newline='', encoding='utf-8') as opened_file:
+                return cls.from_csv(opened_file, delimiter, path_column, type_column, **kwargs)
+
+        records = csv.DictReader(csv_file, delimiter=delimiter)
+        return cls.from_records(records, path_column, type_column, **kwargs)
+
+    @classmethod
+    def from_tsv(cls, tsv_file, **kwargs):
+        """ Builds a table from a tab separated file list, see from_csv. """
+        return cls.from_csv(tsv_file, delimiter='\t', **kwargs)
+
+    def append(self, path, file_type=None, attributes=None):
+        """
+        Adds a file to the table.
+        :param path: the path of the file in the user's folder
+        :param file_type: the type of the file, the default file type if None
+        :param attributes: dict of attribute names and string values, None values are omitted
+        """
+
+        row = len(self.paths)
+        self.paths.append(path)
+        self.file_types.append(self.__shared(file_type or self.default_file_type))
+        if attributes:
+            for name, value in attributes.items():
+                column = self.attribute_columns.get(name)
+                if column is None:
+                    column = self.attribute_columns[name] = [None] * row
+                column.append(self.__shared(value))
+        for column in self.attribute_columns.values():
+            if len(column) == row:
+                column.append(None)
+        if self.__path_index is not None:
+            self.__path_index.setdefault(path, row)
+
+    def add(self, bio_study_file):
+        """ Adds a BioStudyFile object to the table, unless a file with the same path is already in it. """
+        if bio_study_file.path in self.__index():
+            return
+        self.append(bio_study_file.path, bio_study_file.file_type,
+                    {attribute.name: attribute.value for attribute in bio_study_file.attributes})
+
+    def extend(self, rows):
+        """ Adds the given (path, file_type, attributes) tuples to the table. """
+        for path, file_type, attributes in rows:
+            self.append(path, file_type, attributes)
+
+    def deduplicate(self, keep_last=False):
+        """
+        Removes the files with the same path, keeping only the first or the last one.
+        :return: the number of removed files
+        """
+
+        rows_by_path = {}
+        for row, path in enumerate(self.paths):
+            if keep_last or path not in rows_by_path:
+                rows_by_path[path] = row
+        if len(rows_by_path) == len(self.paths):
+            return 0
+
+        kept_rows = sorted(rows_by_path.values())
+        removed = len(self.paths) - len(kept_rows)
+        self.paths = [self.paths[row] for row in kept_rows]
+        self.file_types = [self.file_types[row] for row in kept_rows]
+        for name, column in self.attribute_columns.items():
+            self.attribute_columns[name] = [column[row] for row in kept_rows]
+        self.__path_index = None
+
+        return removed
+
+    def get(self, path):
+        """ :return: the BioStudyFile with the given path or None """
+        row = self.__index().get(path)
+        return None if row is None else self.__file_at(row)
+
+    def iter_json(self, ensure_ascii=True):
+        """
+        Encodes the files to JSON, in the same form as models.EnhancedJSONEncoder encodes a BioStudyFile.
+        :return: generator of the JSON objects of the files
+        """
+
+        encode_string = encode_basestring_ascii if ensure_ascii else encode_basestring
+        encoded_values = {}
+
+        def encode(value):
+            encoded = encoded_values.get(value)
+            if encoded is None:
+                encoded = encode_string(value)
+                if len(encoded_values) < MAX_SHARED_VALUES:
+                    encoded_values[value] = encoded
+            return encoded
+
+        attribute_columns = [('{"name":' + encode_string(name) + ',"value":', column)
+                             for name, column in self.attribute_columns.items()]
+        for row, path in enumerate(self.paths):
+            attributes = ','.join(prefix + encode(column[row]) + '}'
+                                  for prefix, column in attribute_columns if column[row] is not None)
+            yield f'{{"path":{encode_string(path)},"file_type":{encode(self.file_types[row])},' \
+                  f'"attributes":[{attributes}]}}'
+
+    def __file_at(self, row):
+        attributes = {BioStudiesAttribute(name, column[row])
+                      for name, column in self.attribute_columns.items() if column[row] is not None}
+        return BioStudyFile(self.paths[row], self.file_types[row], attributes)
+
+    def __index(self):
+        if self.__path_index is None:
+            self.__path_index = {}
+            for row, path in enumerate(self.paths):
+                self.__path_index.setdefault(path, row)
+        return self.__path_index
+
+    def __shared(self, value):
+        # the same file types and attribute values are usually repeated on many rows,
+        # the number of shared values is bounded for columns with unique values, like checksums
+        if len(self.__values) < MAX_SHARED_VALUES:
+            return self.__values.setdefault(value, value)
+        return self.__values.get(value, value)
+
+    @classmethod
+    def _from_iterable(cls, it):
+        # the set operations, like & and |, build their result from an iterable of BioStudyFile objects
+        table = cls()
+        for bio_study_file in it:
+            table.add(bio_study_file)
+        return table
+
+    def __iter__(self):
+        return (self.__file_at(row) for row in range(len(self.paths)))
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __contains__(self, bio_study_file):
+        # a path can be looked up on its own, too
+        path = getattr(bio_study_file, 'path', bio_study_file)
+        row = self.__index().get(path)
+        if row is None:
+            return False
+
+        return path is bio_study_file or self.__file_at(row) == bio_study_file
+
+
+def _records_to_rows(records, path_key, type_key):
+    for record in records:
+        attributes = {name: value for name, value in record.items()
+                      if name not in (path_key, type_key) and value not in (None, '')}
+        yield record[path_key], record.get(type_key), attributes
@@ -0,0 +1,195 @@
+"""
+biostudiesclient.folder_walker
+~~~~~~~~~~~~
+
+This module implements a lazy, concurrent walk of the user's folder tree on the BioStudies server.
+
+:copyright: (c) 2021 by Karoly Erdos.
+:license: Apache2, see LICENSE for more details.
+"""
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+
+from biostudiesclient import submission_parser
+from biostudiesclient.concurrency import DEFAULT_MAX_WORKERS
+
+FILE_TYPE = 'FILE'
+FOLDER_TYPE = 'DIR'
+DEFAULT_QUEUE_SIZE = 1024
+PUT_TIMEOUT = 0.1
+
+
+@dataclass
+class RemoteEntry:
+    """ A data class for a file or folder of the user's folder tree on the server. """
+
+    folder: str
+    name: str
+    size: int = None
+    type: str = None
+
+    @property
+    def path(self):
+        return '/'.join(filter(None, [self.folder, self.name]))
+
+    @property
+    def is_file(self):
+        return self.type == FILE_TYPE
+
+    @property
+    def is_folder(self):
+        return self.type == FOLDER_TYPE
+
+
+@dataclass
+class EntryFilter:
+    """
+    A data class for the conditions an entry has to meet to be yielded by the walk.
+    The pattern is matched against the path of the entry relative to the walked folder with fnmatch,
+    where * matches / too, so '*.tiff' matches the tiff files at any depth.
+    The size limits apply only to files.
+    """
+
+    pattern: str = None
+    min_size: int = None
+    max_size: int = None
+    entry_type: str = None
+
+    def matches(self, entry, relative_path):
+        if self.entry_type and entry.type != self.entry_type:
+            return False
+        if self.pattern and not fnmatchcase(relative_path, self.pattern):
+            return False
+        if entry.is_file and self.min_size is not None and (entry.size or 0) < self.min_size:
+            return False
+        if entry.is_file and self.max_size is not None and (entry.size or 0) > self.max_size:
+            return False
+
+        return True
+
+
+class _FolderDone:
+    """ Marks that the listing of a folder has been completed. """
+
+    def __init__(self, folder, error=None):
+        self.folder = folder
+        self.error = error
+
+
+class FolderWalker:
+    """
+    This class responsibility to walk a folder of the user on the BioStudies server, like os.walk does locally.
+    The entries are yielded lazily, while the listings are read from the server.
+    The sub folders are listed concurrently by a pool of max_workers threads,
+    the listed entries wait in a queue of at most queue_size entries until they are consumed,
+    so the memory used does not depend on the size of the tree.
+
+    If stream is True, then every listing is parsed while it is read from the connection (it requires ijson),
+    otherwise a whole listing is loaded at once. By default the listings are streamed if ijson is installed.
+
+    If the consumer stops the walk early, by closing the generator or by an exception,
+    the folders not listed yet are not requested and closing waits for the listings in progress to stop.
+    """
+
+    def __init__(self, api, max_workers=DEFAULT_MAX_WORKERS, queue_size=DEFAULT_QUEUE_SIZE, stream=None):
+        self.api = api
+        self.max_workers = max_workers
+        self.queue_size = queue_size
+        self.stream = submission_parser.ijson is not None if stream is None else stream
+
+    def walk(self, folder_path=None, recursive=True, pattern=None, min_size=None, max_size=None, entry_type=None,
+             onerror=None):
+        """
+        Walks the given folder of the user and yields its entries in no particular order.
+        :param folder_path: the folder to walk, the user's root folder if None
+        :param recursive: if True, then the sub folders are walked, too
+        :param pattern: fnmatch pattern of the path of the entries relative to the walked folder
+        :param min_size: the minimum size of the files in bytes
+        :param max_size: the maximum size of the files in bytes
+        :param entry_type: FILE_TYPE or FOLDER_TYPE to yield only files or folders
+        :param onerror: optional callable receiving the folder path and the exception if a folder cannot be listed,
+                        then the walk continues. If it is None, then the exception is raised.
+        :return: generator of RemoteEntry objects
+        """
+
+        root_folder = (folder_path or '').strip('/')
+        entry_filter = EntryFilter(pattern, min_size, max_size, entry_type)
+        entries = queue.Queue(self.queue_size)
+        stopped = threading.Event()
+        lock = threading.Lock()
+        pending_folders = [0]
+        listing_futures = set()
+        executor = ThreadPoolExecutor(self.max_workers)
+
+        def put(item):
+            while not stopped.is_set():
+                try:
+                    entries.put(item, timeout=PUT_TIMEOUT)
+                    return
+                except queue.Full:
+                    continue
+
+        def submit(folder):
+            with lock:
+                if stopped.is_set():
+                    return
+                pending_folders[0] += 1
+                future = executor.submit(list_folder, folder)
+                listing_futures.add(future)
+            future.add_done_callback(discard)
+
+        def discard(future):
+            with lock:
+                listing_futures.discard(future)
+
+        def list_folder(folder):
+            if stopped.is_set():
+                return
+
+            error = None
+            listing = None
+            try:
+                listing = self.api.get_user_files(folder or None, stream=self.stream).json
+                for entry_json in listing or []:
+                    if stopped.is_set():
+                        break
+                    entry = RemoteEntry(folder, entry_json.get('name'), entry_json.get('size'), entry_json.get('type'))
+                    if recursive and entry.is_folder:
+                        submit(entry.path)
+                    if entry_filter.matches(entry, entry.path[len(root_folder):].lstrip('/')):
+                        put(entry)
+            except Exception as exception:  # pylint: disable=broad-except
+                error = exception
+            finally:
+                if hasattr(listing, 'close'):
+                    listing.close()
+                put(_FolderDone(folder, error))
+
+        submit(root_folder)
+        try:
+            while True:
+                item = entries.get()
+                if not isinstance(item, _FolderDone):
+                    yield item
+                    continue
+
+                if item.error is not None:
+                    if onerror is None:
+                        raise item.error
+                    onerror(item.folder, item.error)
+                with lock:
+                    pending_folders[0] -= 1
+                    if pending_folders[0] == 0:
+                        return
+        finally:
+            # the folders not listed yet are not requested any more, the listings in progress stop at their next entry
+            with lock:
+                stopped.set()
+                pending_futures = list(listing_futures)
+            for future in pending_futures:
+                future.cancel()
+            executor.shutdown(wait=True)
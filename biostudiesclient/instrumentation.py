@@ -0,0 +1,329 @@
+"""
+biostudiesclient.instrumentation
+~~~~~~~~~~~~
+
+This module implements the instrumentation of the requests sent to the BioStudies REST API:
+request hooks and metrics of the latencies, the transferred bytes, the retries and the errors.
+
+:copyright: (c) 2021 by Karoly Erdos.
+:license: Apache2, see LICENSE for more details.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import timedelta
+from itertools import accumulate
+from typing import Any, Dict
+
+from biostudiesclient.exceptions import RestErrorException
+from biostudiesclient.response_utils import SUCCESSFUL_STATUS_CODES
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+METRIC_PREFIX = 'biostudiesclient'
+TTFB_PHASE = 'ttfb'
+TOTAL_PHASE = 'total'
+HANDLE_PHASE = 'handle'
+
+
+@dataclass
+class RequestEvent:
+    """
+    A data class for a request sent by the Api, passed to the request hooks.
+    Before the request only its operation (the name of the Api method), method, URL and headers are set,
+    a before request hook can add headers to the request, like the headers of a distributed trace.
+    After the request the outcome, the transferred bytes and the latencies are set, too.
+    The latencies are in seconds, ttfb is the time until the headers of the response have been received.
+    The total latency and the retries include all the attempts of the request.
+    """
+
+    operation: str
+    method: str
+    url: str
+    headers: Dict[str, Any] = None
+    started_at: float = 0.0
+    retries: int = 0
+    status_code: int = None
+    error: Exception = None
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    ttfb_seconds: float = None
+    total_seconds: float = None
+
+    @property
+    def error_class(self):
+        """
+        :return: the name of the exception raised by the request, 'http_<status code>' for an error response,
+                 None if the request succeeded
+        :rtype str
+        """
+        if self.error is not None:
+            return type(self.error).__name__
+        if self.status_code is not None and self.status_code not in SUCCESSFUL_STATUS_CODES:
+            return f'http_{int(self.status_code)}'
+
+        return None
+
+
+class Histogram:
+    """ A histogram of observed values with fixed bucket boundaries, like the Prometheus histograms. """
+
+    def __init__(self, bounds=DEFAULT_LATENCY_BUCKETS):
+        self.bounds = tuple(sorted(bounds))
+        self.bucket_counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        """ Counts the value in the first bucket whose bound is greater than or equal to it. """
+        self.bucket_counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class ClientMetrics:
+    """
+    This class responsibility to collect the metrics of the requests of one or more Api objects, by operation:
+    - request_duration_seconds: histogram of the ttfb and total latencies of the requests,
+      and of the time spent handling the responses (the handle phase)
+    - requests_total: the number of requests by status code, or by 'error' if no response has been received
+    - request_bytes_total and response_bytes_total: the bytes of the request and response bodies
+    - retries_total: the number of retried attempts
+    - errors_total: the number of failed requests by error class, see RequestEvent.error_class
+
+    The metrics can be exported with snapshot, in the shape of the OpenTelemetry metric data points
+    (explicit bucket histograms and monotonic sums), or in the Prometheus text format with to_prometheus.
+    """
+
+    def __init__(self, buckets=DEFAULT_LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.__lock = threading.Lock()
+        self.__latencies = {}
+        self.__requests = Counter()
+        self.__request_bytes = Counter()
+        self.__response_bytes = Counter()
+        self.__retries = Counter()
+        self.__errors = Counter()
+
+    def record(self, event):
+        """ Records a finished request. """
+        operation = event.operation
+        with self.__lock:
+            if event.ttfb_seconds is not None:
+                self.__histogram(operation, TTFB_PHASE).observe(event.ttfb_seconds)
+            self.__histogram(operation, TOTAL_PHASE).observe(event.total_seconds)
+            status = 'error' if event.status_code is None else str(int(event.status_code))
+            self.__requests[(operation, status)] += 1
+            self.__request_bytes[operation] += event.bytes_sent
+            self.__response_bytes[operation] += event.bytes_received
+            if event.retries:
+                self.__retries[operation] += event.retries
+            if event.error_class:
+                self.__errors[(operation, event.error_class)] += 1
+
+    def record_handling(self, operation, seconds, error=None):
+        """ Records the handling of a response, and the error raised if the response could not be handled. """
+        with self.__lock:
+            self.__histogram(operation, HANDLE_PHASE).observe(seconds)
+            if error is not None:
+                self.__errors[(operation, type(error).__name__)] += 1
+
+    def snapshot(self):
+        """
+        :return: the current value of the metrics, by the name of the metrics.
+                 Every metric has its type ('histogram' or 'counter'), description and data points.
+                 A data point of a histogram contains its labels, the bounds of its buckets,
+                 the number of values in every bucket (the last one is above the last bound), the sum and the count.
+                 A data point of a counter contains its labels and its value.
+        :rtype dict
+        """
+
+        with self.__lock:
+            latencies = [{'labels': {'operation': operation, 'phase': phase}, 'bounds': list(histogram.bounds),
+                          'bucket_counts': list(histogram.bucket_counts), 'sum': histogram.sum,
+                          'count': histogram.count}
+                         for (operation, phase), histogram in sorted(self.__latencies.items())]
+
+            return {
+                _name('request_duration_seconds'): _metric('histogram', 'Latency of the requests in seconds.',
+                                                           latencies),
+                _name('requests_total'): _metric('counter', 'Number of requests.',
+                                                 _points(self.__requests, ('operation', 'status'))),
+                _name('request_bytes_total'): _metric('counter', 'Bytes of the request bodies.',
+                                                      _points(self.__request_bytes, ('operation',))),
+                _name('response_bytes_total'): _metric('counter', 'Bytes of the response bodies.',
+                                                       _points(self.__response_bytes, ('operation',))),
+                _name('retries_total'): _metric('counter', 'Number of retried attempts.',
+                                                _points(self.__retries, ('operation',))),
+                _name('errors_total'): _metric('counter', 'Number of failed requests.',
+                                               _points(self.__errors, ('operation', 'error_class'))),
+            }
+
+    def to_prometheus(self):
+        """
+        :return: the metrics in the Prometheus text exposition format
+        :rtype str
+        """
+
+        lines = []
+        for name, metric in self.snapshot().items():
+            lines.append(f'# HELP {name} {metric["description"]}')
+            lines.append(f'# TYPE {name} {metric["type"]}')
+            for point in metric['points']:
+                if metric['type'] == 'counter':
+                    lines.append(f'{name}{_labels(point["labels"])} {point["value"]}')
+                    continue
+                cumulative_counts = list(accumulate(point['bucket_counts']))
+                for bound, count in zip(point['bounds'] + ['+Inf'], cumulative_counts):
+                    lines.append(f'{name}_bucket{_labels(point["labels"], le=bound)} {count}')
+                lines.append(f'{name}_sum{_labels(point["labels"])} {point["sum"]}')
+                lines.append(f'{name}_count{_labels(point["labels"])} {point["count"]}')
+
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        """ Removes all the recorded values, for example after they have been exported. """
+        with self.__lock:
+            self.__latencies.clear()
+            for counter in (self.__requests, self.__request_bytes, self.__response_bytes, self.__retries,
+                            self.__errors):
+                counter.clear()
+
+    def __histogram(self, operation, phase):
+        histogram = self.__latencies.get((operation, phase))
+        if histogram is None:
+            histogram = self.__latencies[(operation, phase)] = Histogram(self.buckets)
+
+        return histogram
+
+
+class Instrumentation:
+    """
+    This class responsibility to instrument the requests of an Api object.
+    The before request hooks are called with the RequestEvent before the request is sent,
+    the after request hooks are called with the completed RequestEvent, after the request succeeded or failed.
+    The hooks are called in the thread sending the request, so they should return quickly.
+    The same object can be shared by several Api objects.
+
+    If record_metrics is True, then the requests are recorded in the ClientMetrics of the metrics attribute.
+    An Api object without an Instrumentation object does not measure anything.
+
+    The latencies of the DNS resolution and of the connection are not exposed by the requests library,
+    so only the time to the first byte of the response and the total latency of the requests are measured.
+    """
+
+    def __init__(self, record_metrics=True, buckets=DEFAULT_LATENCY_BUCKETS, before_request=None,
+                 after_request=None):
+        self.metrics = ClientMetrics(buckets) if record_metrics else None
+        self.before_request_hooks = list(before_request or [])
+        self.after_request_hooks = list(after_request or [])
+
+    def add_before_request_hook(self, hook):
+        """ Adds a function called with the RequestEvent before every request is sent. """
+        self.before_request_hooks.append(hook)
+
+    def add_after_request_hook(self, hook):
+        """ Adds a function called with the completed RequestEvent after every request. """
+        self.after_request_hooks.append(hook)
+
+    def request_started(self, operation, method, url, headers=None):
+        """
+        :return: the event of the request, that has to be passed to request_finished
+        :rtype biostudiesclient.instrumentation.RequestEvent
+        """
+
+        event = RequestEvent(operation, method.upper(), url, headers, started_at=time.perf_counter())
+        for hook in self.before_request_hooks:
+            hook(event)
+
+        return event
+
+    def request_finished(self, event, response=None, error=None, streamed=False):
+        """
+        Completes the event of a request with its response or the exception raised while sending it.
+        :param streamed: whether the body of the response is still to be read,
+                         then its size is taken from the Content-Length header
+        """
+
+        event.total_seconds = time.perf_counter() - event.started_at
+        event.error = error
+        if response is not None:
+            event.status_code = response.status_code
+            event.ttfb_seconds = _ttfb_seconds(response)
+            event.bytes_sent = _bytes_sent(response)
+            event.bytes_received = _bytes_received(response, streamed)
+
+        if self.metrics is not None:
+            self.metrics.record(event)
+        for hook in self.after_request_hooks:
+            hook(event)
+
+    def response_handled(self, operation, seconds, error=None):
+        """
+        Records the time spent handling a response.
+        The error responses have been already counted by request_finished,
+        so only the other errors, like an invalid JSON document, are counted as errors.
+        """
+
+        if self.metrics is not None:
+            self.metrics.record_handling(operation, seconds,
+                                         None if isinstance(error, RestErrorException) else error)
+
+
+def _ttfb_seconds(response):
+    elapsed = getattr(response, 'elapsed', None)
+    return elapsed.total_seconds() if isinstance(elapsed, timedelta) else None
+
+
+def _bytes_sent(response):
+    request = getattr(response, 'request', None)
+    return _content_length(getattr(request, 'headers', None))
+
+
+def _bytes_received(response, streamed):
+    if streamed:
+        return _content_length(response.headers)
+
+    content = getattr(response, 'content', None)
+    return len(content) if isinstance(content, bytes) else 0
+
+
+def _content_length(headers):
+    if not isinstance(headers, Mapping):
+        return 0
+
+    try:
+        return int(headers.get('Content-Length') or 0)
+    except ValueError:
+        return 0
+
+
+def _name(name):
+    return f'{METRIC_PREFIX}_{name}'
+
+
+def _metric(metric_type, description, points):
+    return {'type': metric_type, 'description': description, 'points': points}
+
+
+def _points(counter, label_names):
+    points = []
+    for key, value in sorted(counter.items()):
+        label_values = key if isinstance(key, tuple) else (key,)
+        points.append({'labels': dict(zip(label_names, label_values)), 'value': value})
+
+    return points
+
+
+def _labels(labels, **extra_labels):
+    labels = dict(labels, **{name: str(value) for name, value in extra_labels.items()})
+    escaped_labels = (f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+    return '{' + ','.join(escaped_labels) + '}'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
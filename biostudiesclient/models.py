@@ -10,6 +10,7 @@ This module contains the data models for BioStudy entities.
 
 import dataclasses
 import json
+from collections.abc import Set as AbstractSet
 from dataclasses import dataclass, field
 from typing import Set
 
@@ -81,7 +82,7 @@ class EnhancedJSONEncoder(json.JSONEncoder):
         if dataclasses.is_dataclass(o):
             return dataclasses.asdict(o)
 
-        if isinstance(o, set):
+        if isinstance(o, (set, AbstractSet)):
             return list(o)
 
         return super().default(o)
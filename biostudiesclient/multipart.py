@@ -0,0 +1,198 @@
+"""
+biostudiesclient.multipart
+~~~~~~~~~~~~
+
+This module implements a streaming multipart/form-data encoder for file uploads.
+
+:copyright: (c) 2021 by Karoly Erdos.
+:license: Apache2, see LICENSE for more details.
+"""
+
+import hashlib
+import os
+import time
+import uuid
+from dataclasses import dataclass
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+FILES_FIELD_NAME = 'files'
+
+
+@dataclass
+class UploadProgress:
+    """
+    A data class for reporting the progress of a file upload to the progress callback.
+    """
+
+    file_path: str
+    bytes_sent: int
+    total_bytes: int
+    elapsed_seconds: float
+    checksum: str = None
+
+    @property
+    def throughput(self):
+        """
+        :return: the average upload throughput so far in bytes per second
+        :rtype float
+        """
+        if self.elapsed_seconds <= 0:
+            return 0.0
+
+        return self.bytes_sent / self.elapsed_seconds
+
+    @property
+    def done(self):
+        return self.bytes_sent >= self.total_bytes
+
+
+class MultipartFileEncoder:
+    """
+    A read-only file-like object that produces the multipart/form-data body of a file upload on the fly.
+    Only a small header, the file content and a closing boundary are sent,
+    and the file content is read from the disk while the body is being sent,
+    so the memory used does not depend on the size of the file.
+
+    The length of the whole body is known in advance,
+    so the request is sent with a Content-Length header instead of chunked transfer encoding.
+    The progress callback, if given, is called with an UploadProgress object
+    every time at least chunk_size bytes have been sent and once when the whole body has been sent.
+    If compute_checksum is True, the MD5 checksum of the file is calculated while its content is sent,
+    and it is set in the last progress report, so the file does not have to be read again for it.
+    """
+
+    def __init__(self, file_path, field_name=FILES_FIELD_NAME, chunk_size=DEFAULT_CHUNK_SIZE,
+                 progress_callback=None, boundary=None, compute_checksum=False):
+        self.file_path = file_path
+        self.chunk_size = chunk_size
+        self.progress_callback = progress_callback
+        self.boundary = boundary if boundary else uuid.uuid4().hex
+        self.content_type = f'multipart/form-data; boundary={self.boundary}'
+        self.compute_checksum = compute_checksum
+
+        file_name = _escape_header_value(os.path.basename(file_path))
+        self.__head = (f'--{self.boundary}\r\n'
+                       f'Content-Disposition: form-data; name="{field_name}"; filename="{file_name}"\r\n'
+                       f'\r\n').encode('utf-8')
+        self.__tail = f'\r\n--{self.boundary}--\r\n'.encode('utf-8')
+        self.file_size = os.path.getsize(file_path)
+        self.len = len(self.__head) + self.file_size + len(self.__tail)
+
+        self.__file = None
+        self.__position = 0
+        self.__last_reported = 0
+        self.__start_time = None
+        self.__md5 = hashlib.md5() if compute_checksum else None
+
+    def __len__(self):
+        return self.len
+
+    def read(self, size=-1):
+        """
+        Reads the next part of the multipart body.
+        :param size: the maximum number of bytes to return,
+                     if it is not given then at most chunk_size bytes are returned
+        :return: the next part of the body or an empty bytes object at the end of the body
+        :rtype bytes
+        """
+
+        if size is None or size < 0:
+            size = self.chunk_size
+        if self.__start_time is None:
+            self.__start_time = time.monotonic()
+
+        data = b''
+        while len(data) < size and self.__position < self.len:
+            data += self.__read_section(size - len(data))
+
+        self.__report_progress()
+
+        return data
+
+    @property
+    def checksum(self):
+        """
+        :return: the hexadecimal MD5 digest of the file content if compute_checksum is True
+                 and the whole content has been sent, otherwise None
+        :rtype str
+        """
+        if self.__md5 is None or self.__position < len(self.__head) + self.file_size:
+            return None
+
+        return self.__md5.hexdigest()
+
+    def __iter__(self):
+        while True:
+            chunk = self.read(self.chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def reset(self):
+        """ Rewinds the body to its beginning, so the same encoder can be sent again. """
+        self.__position = 0
+        self.__last_reported = 0
+        self.__start_time = None
+        if self.__md5 is not None:
+            self.__md5 = hashlib.md5()
+        if self.__file:
+            self.__file.seek(0)
+
+    def close(self):
+        if self.__file:
+            self.__file.close()
+            self.__file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __read_section(self, size):
+        head_length = len(self.__head)
+        content_end = head_length + self.file_size
+
+        if self.__position < head_length:
+            data = self.__head[self.__position:self.__position + size]
+        elif self.__position < content_end:
+            data = self.__open_file().read(min(size, content_end - self.__position))
+            if not data:
+                raise IOError(f'The file {self.file_path} has been truncated while it was uploaded.')
+            if self.__md5 is not None:
+                self.__md5.update(data)
+        else:
+            offset = self.__position - content_end
+            data = self.__tail[offset:offset + size]
+
+        self.__position += len(data)
+
+        return data
+
+    def __open_file(self):
+        if self.__file is None:
+            self.__file = open(self.file_path, 'rb')
+
+        return self.__file
+
+    def __report_progress(self):
+        if not self.progress_callback:
+            return
+
+        finished = self.__position >= self.len
+        if self.__position - self.__last_reported < self.chunk_size and not finished:
+            return
+        if finished and self.__last_reported == self.len:
+            return
+
+        self.__last_reported = self.__position
+        self.progress_callback(UploadProgress(file_path=self.file_path,
+                                              bytes_sent=self.__position,
+                                              total_bytes=self.len,
+                                              elapsed_seconds=time.monotonic() - self.__start_time,
+                                              checksum=self.checksum))
+
+
+def _escape_header_value(value):
+    # the same escaping that browsers and urllib3 apply to the file name of a form-data part
+    return value.replace('\\', '\\\\').replace('"', '%22').replace('\r', '%0D').replace('\n', '%0A')
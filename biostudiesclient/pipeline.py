@@ -0,0 +1,302 @@
+"""
+biostudiesclient.pipeline
+~~~~~~~~~~~~
+
+This module implements a pipeline that ingests many studies concurrently:
+for every study it creates the user's folder, uploads the study's files into it
+and then sends the submission that references them.
+
+:copyright: (c) 2021 by Karoly Erdos.
+:license: Apache2, see LICENSE for more details.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Dict, List
+
+from biostudiesclient.concurrency import DEFAULT_MAX_WORKERS
+from biostudiesclient.response_utils import ResponseObject
+
+
+class Stage(Enum):
+    """ The stages of the ingestion of a study, in the order they are run. """
+
+    CREATE_FOLDER = 'create_folder'
+    UPLOAD = 'upload'
+    SUBMIT = 'submit'
+
+
+@dataclass
+class StudyJob:
+    """
+    A data class for a study to ingest: the local files to upload into the remote folder
+    and the metadata of the submission to send after all the files have been uploaded.
+    """
+
+    name: str
+    metadata: Dict[str, Any]
+    files: List[str] = field(default_factory=list)
+    remote_folder: str = None
+
+
+@dataclass
+class StudyResult:
+    """
+    A data class for the outcome of the ingestion of a study.
+    If a stage failed, then it contains the stage and the error, and the later stages have not been run.
+    The errors of the failed uploads are keyed by the local file path.
+    """
+
+    job: StudyJob
+    response: ResponseObject = None
+    failed_stage: Stage = None
+    error: Exception = None
+    uploaded_files: List[str] = field(default_factory=list)
+    upload_errors: Dict[str, Exception] = field(default_factory=dict)
+    stage_seconds: Dict[Stage, float] = field(default_factory=dict)
+
+    @property
+    def succeeded(self):
+        return self.error is None
+
+    @property
+    def accession_id(self):
+        return (self.response.json or {}).get('accno') if self.response else None
+
+
+class SubmissionPipeline:
+    """
+    This class responsibility to run the ingestion of many studies at the same time.
+    Every stage has its own bounded pool of worker threads, so the stages of different studies overlap:
+    the files of a study are uploaded while the folder of the next study is created
+    and the submission of a previous study is sent.
+    The files of a study are uploaded concurrently, too.
+
+    At most max_studies_in_flight studies are processed at the same time,
+    the next study is taken from the input only when a study has been completed,
+    so the input can be a generator of any length.
+    The connection pool of the Api's session should be at least as large as the sum of the workers.
+
+    If the consumer stops iterating the results, by closing the generator or by an exception,
+    the tasks not started yet are cancelled, no further stage of the studies in flight is started,
+    and closing waits for the requests in progress to complete.
+    """
+
+    def __init__(self, api, folder_workers=2, upload_workers=DEFAULT_MAX_WORKERS, submit_workers=2,
+                 max_studies_in_flight=None):
+        self.api = api
+        self.folder_workers = folder_workers
+        self.upload_workers = upload_workers
+        self.submit_workers = submit_workers
+        self.max_studies_in_flight = max_studies_in_flight or 2 * (folder_workers + upload_workers + submit_workers)
+
+    def run(self, jobs):
+        """
+        Ingests the given studies and yields their results in the order they have been completed.
+        A failing study does not stop the others.
+        :param jobs: iterable of StudyJob objects
+        :return: generator of StudyResult objects
+        """
+
+        results = queue.Queue()
+        admission = threading.BoundedSemaphore(self.max_studies_in_flight)
+        pools = _StagePools({
+            Stage.CREATE_FOLDER: self.folder_workers,
+            Stage.UPLOAD: self.upload_workers,
+            Stage.SUBMIT: self.submit_workers,
+        })
+        stopped = pools.stopped
+
+        def finish(study):
+            admission.release()
+            results.put(study.result)
+
+        def admit():
+            admitted = 0
+            try:
+                for job in jobs:
+                    while not admission.acquire(timeout=0.1):
+                        if stopped.is_set():
+                            return
+                    if stopped.is_set():
+                        return
+                    _StudyRun(job, self.api, pools, finish).start()
+                    admitted += 1
+                results.put(_AdmissionDone(admitted))
+            except Exception as error:  # pylint: disable=broad-except
+                results.put(_AdmissionDone(admitted, error))
+
+        feeder = threading.Thread(target=admit, name='submission-pipeline-feeder', daemon=True)
+        feeder.start()
+        completed = 0
+        admission_done = None
+        try:
+            while admission_done is None or completed < admission_done.admitted:
+                item = results.get()
+                if isinstance(item, _AdmissionDone):
+                    admission_done = item
+                    continue
+                completed += 1
+                yield item
+            if admission_done.error is not None:
+                raise admission_done.error
+        finally:
+            pools.shutdown()
+
+    def run_all(self, jobs):
+        """
+        Ingests the given studies and collects their results.
+        :param jobs: iterable of StudyJob objects
+        :return: the results in the order they have been completed
+        :rtype list
+        """
+
+        return list(self.run(jobs))
+
+
+class _StagePools:
+    """
+    The pools of worker threads of the stages.
+    After shutdown no task is accepted, the pending tasks are cancelled and the running tasks are waited for.
+    """
+
+    def __init__(self, workers_by_stage):
+        self.pools = {stage: ThreadPoolExecutor(workers) for stage, workers in workers_by_stage.items()}
+        self.stopped = threading.Event()
+        self.__lock = threading.Lock()
+        self.__futures = set()
+
+    def submit(self, stage, function, *args):
+        """
+        Runs the function in the pool of the given stage, unless the pools have been shut down.
+        :return: True if the task has been accepted
+        :rtype bool
+        """
+
+        with self.__lock:
+            if self.stopped.is_set():
+                return False
+            future = self.pools[stage].submit(function, *args)
+            self.__futures.add(future)
+        future.add_done_callback(self.__discard)
+
+        return True
+
+    def shutdown(self):
+        with self.__lock:
+            self.stopped.set()
+            pending_futures = list(self.__futures)
+        # Python 3.7 has no cancel_futures option of shutdown
+        for future in pending_futures:
+            future.cancel()
+        for pool in self.pools.values():
+            pool.shutdown(wait=True)
+
+    def __discard(self, future):
+        with self.__lock:
+            self.__futures.discard(future)
+
+
+class _AdmissionDone:
+    """ Marks that all the studies have been taken from the input. """
+
+    def __init__(self, admitted, error=None):
+        self.admitted = admitted
+        self.error = error
+
+
+class _StudyRun:
+    """ The state of the ingestion of a single study, moving from the pool of a stage to the next one. """
+
+    def __init__(self, job, api, pools, finish):
+        self.job = job
+        self.api = api
+        self.pools = pools
+        self.finish = finish
+        self.result = StudyResult(job)
+        self.lock = threading.Lock()
+        self.remaining_uploads = 0
+        self.stage_start = None
+        self.finished = False
+
+    def start(self):
+        if self.job.remote_folder:
+            self.__schedule(Stage.CREATE_FOLDER, self.__create_folder)
+        else:
+            self.__run_stage(Stage.UPLOAD, self.__start_uploads)
+
+    def __schedule(self, stage, function, *args):
+        self.pools.submit(stage, self.__run_stage, stage, function, *args)
+
+    def __run_stage(self, stage, function, *args):
+        if self.pools.stopped.is_set():
+            return
+        try:
+            function(*args)
+        except Exception as error:  # pylint: disable=broad-except
+            self.__fail(stage, error)
+
+    def __create_folder(self):
+        start_time = time.monotonic()
+        self.api.create_user_sub_folder(self.job.remote_folder)
+        self.result.stage_seconds[Stage.CREATE_FOLDER] = time.monotonic() - start_time
+        self.__start_uploads()
+
+    def __start_uploads(self):
+        if not self.job.files:
+            self.__schedule(Stage.SUBMIT, self.__submit)
+            return
+
+        self.remaining_uploads = len(self.job.files)
+        self.stage_start = time.monotonic()
+        for file_path in self.job.files:
+            self.pools.submit(Stage.UPLOAD, self.__upload_file, file_path)
+
+    def __upload_file(self, file_path):
+        if self.pools.stopped.is_set():
+            return
+        error = None
+        try:
+            self.api.upload_file(file_path, self.job.remote_folder)
+        except Exception as exception:  # pylint: disable=broad-except
+            error = exception
+
+        with self.lock:
+            if error is None:
+                self.result.uploaded_files.append(file_path)
+            else:
+                self.result.upload_errors[file_path] = error
+            self.remaining_uploads -= 1
+            if self.remaining_uploads:
+                return
+
+        self.result.stage_seconds[Stage.UPLOAD] = time.monotonic() - self.stage_start
+        if self.result.upload_errors:
+            first_failed = next(iter(self.result.upload_errors))
+            self.__fail(Stage.UPLOAD, self.result.upload_errors[first_failed])
+        else:
+            self.__schedule(Stage.SUBMIT, self.__submit)
+
+    def __submit(self):
+        start_time = time.monotonic()
+        self.result.response = self.api.create_submission(self.job.metadata)
+        self.result.stage_seconds[Stage.SUBMIT] = time.monotonic() - start_time
+        self.__finish()
+
+    def __fail(self, stage, error):
+        self.result.failed_stage = stage
+        self.result.error = error
+        self.__finish()
+
+    def __finish(self):
+        # a study is finished only once, even if more of its tasks fail while the pipeline is shut down
+        with self.lock:
+            if self.finished:
+                return
+            self.finished = True
+        self.finish(self)
+
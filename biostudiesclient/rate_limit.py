@@ -0,0 +1,267 @@
+"""
+biostudiesclient.rate_limit
+~~~~~~~~~~~~
+
+This module implements client-side rate limiting and adaptive concurrency control
+for the requests sent to the BioStudies REST API.
+
+:copyright: (c) 2021 by Karoly Erdos.
+:license: Apache2, see LICENSE for more details.
+"""
+
+import json
+import threading
+import time
+from http import HTTPStatus
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+
+class TokenBucket:
+    """
+    A token bucket rate limiter that can be shared by the threads of a process.
+    The bucket is refilled continuously with rate tokens per second up to its capacity,
+    and every request takes one token from it, waiting for the refill if the bucket is empty.
+    The capacity is the largest burst of requests allowed after an idle period.
+    """
+
+    def __init__(self, rate, capacity=None):
+        if rate <= 0:
+            raise ValueError('The rate of the token bucket should be positive.')
+
+        self.rate = rate
+        self.capacity = capacity if capacity else max(1.0, rate)
+        self.__tokens = self.capacity
+        self.__updated_at = time.monotonic()
+        self.__lock = threading.Lock()
+
+    def try_acquire(self, tokens=1):
+        """
+        Takes the given number of tokens from the bucket if they are available, without waiting.
+        :return: True if the tokens have been taken
+        :rtype bool
+        :raises ValueError: if the tokens are more than the capacity of the bucket, so they could never be taken
+        """
+        _check_tokens(tokens, self.capacity)
+        return self.__take(tokens) == 0
+
+    def acquire(self, tokens=1, timeout=None):
+        """
+        Takes the given number of tokens from the bucket, waiting for them if necessary.
+        :param tokens: the number of tokens to take
+        :param timeout: the maximum number of seconds to wait, None means waiting as long as needed
+        :return: True if the tokens have been taken, False if the timeout expired
+        :rtype bool
+        :raises ValueError: if the tokens are more than the capacity of the bucket, so they could never be taken
+        """
+        _check_tokens(tokens, self.capacity)
+        return _wait_for_tokens(self.__take, tokens, timeout)
+
+    def __take(self, tokens):
+        with self.__lock:
+            now = time.monotonic()
+            self.__tokens = min(self.capacity, self.__tokens + (now - self.__updated_at) * self.rate)
+            self.__updated_at = now
+
+            if self.__tokens >= tokens:
+                self.__tokens -= tokens
+                return 0
+
+            return (tokens - self.__tokens) / self.rate
+
+
+class FileTokenBucket:
+    """
+    A token bucket rate limiter that can be shared by several processes on the same host.
+    The state of the bucket is stored in the given file and every update is protected by an exclusive file lock,
+    so all the processes using the same file share the same rate.
+    It is only available on POSIX systems.
+    """
+
+    def __init__(self, state_file_path, rate, capacity=None):
+        if fcntl is None:
+            raise OSError('FileTokenBucket requires file locking with fcntl, that is not available.')
+        if rate <= 0:
+            raise ValueError('The rate of the token bucket should be positive.')
+
+        self.state_file_path = state_file_path
+        self.rate = rate
+        self.capacity = capacity if capacity else max(1.0, rate)
+        self.__lock = threading.Lock()
+
+    def try_acquire(self, tokens=1):
+        """
+        Takes the given number of tokens from the shared bucket if they are available, without waiting.
+        :return: True if the tokens have been taken
+        :rtype bool
+        :raises ValueError: if the tokens are more than the capacity of the bucket, so they could never be taken
+        """
+        _check_tokens(tokens, self.capacity)
+        return self.__take(tokens) == 0
+
+    def acquire(self, tokens=1, timeout=None):
+        """
+        Takes the given number of tokens from the shared bucket, waiting for them if necessary.
+        The processes waiting for tokens poll the state file, so they are not served in order.
+        :param tokens: the number of tokens to take
+        :param timeout: the maximum number of seconds to wait, None means waiting as long as needed
+        :return: True if the tokens have been taken, False if the timeout expired
+        :rtype bool
+        :raises ValueError: if the tokens are more than the capacity of the bucket, so they could never be taken
+        """
+        _check_tokens(tokens, self.capacity)
+        return _wait_for_tokens(self.__take, tokens, timeout)
+
+    def __take(self, tokens):
+        with self.__lock, open(self.state_file_path, 'a+') as state_file:
+            fcntl.flock(state_file, fcntl.LOCK_EX)
+            try:
+                state_file.seek(0)
+                content = state_file.read()
+                state = json.loads(content) if content else {}
+
+                now = time.time()
+                available = state.get('tokens', self.capacity)
+                elapsed = max(0.0, now - state.get('updated_at', now))
+                available = min(self.capacity, available + elapsed * self.rate)
+
+                wait_time = 0
+                if available >= tokens:
+                    available -= tokens
+                else:
+                    wait_time = (tokens - available) / self.rate
+
+                state_file.seek(0)
+                state_file.truncate()
+                state_file.write(json.dumps({'tokens': available, 'updated_at': now}))
+                state_file.flush()
+            finally:
+                fcntl.flock(state_file, fcntl.LOCK_UN)
+
+        return wait_time
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Limits the number of concurrent requests and adapts the limit to the load of the server
+    with additive increase and multiplicative decrease (AIMD).
+
+    A request is a sign of overload if it failed with an exception, if its response status is 429 or 5xx,
+    or if its latency is larger than latency_tolerance times the usual latency of the healthy requests
+    of the same operation plus latency_slack seconds (or than latency_threshold seconds, if it is given).
+    The usual latency is tracked separately for every operation, so slow operations do not look like
+    an overload next to fast ones. The requests released with latency_sensitive=False, like the uploads
+    and the streamed downloads, whose latency depends on their size, are not checked for their latency.
+    On overload the limit is multiplied by decrease_factor, at most once per cooldown seconds,
+    so a burst of errors from the requests already in flight does not collapse the limit.
+    After every limit number of healthy requests in a row the limit is increased by one.
+    """
+
+    def __init__(self, initial_limit=8, min_limit=1, max_limit=64, decrease_factor=0.5, cooldown=1.0,
+                 latency_threshold=None, latency_tolerance=2.0, latency_slack=0.05, latency_warmup=20):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+        self.latency_threshold = latency_threshold
+        self.latency_tolerance = latency_tolerance
+        self.latency_slack = latency_slack
+        self.latency_warmup = latency_warmup
+
+        self.limit = max(min_limit, min(initial_limit, max_limit))
+        self.in_flight = 0
+        self.baseline_latencies = {}
+        self.__healthy_samples = {}
+        self.__healthy_in_a_row = 0
+        self.__last_decrease = None
+        self.__condition = threading.Condition()
+
+    def acquire(self):
+        """
+        Waits until the number of requests in flight is below the current limit and reserves a slot.
+        :return: the start time of the request, that has to be passed to release
+        :rtype float
+        """
+        with self.__condition:
+            while self.in_flight >= self.limit:
+                self.__condition.wait()
+            self.in_flight += 1
+
+        return time.monotonic()
+
+    def release(self, start_time, status_code=None, operation=None, latency_sensitive=True):
+        """
+        Releases the slot of a finished request and adapts the limit to its outcome.
+        :param start_time: the value returned by acquire
+        :param status_code: the status code of the response, None if the request failed with an exception
+        :param operation: the name of the operation of the request, the usual latency is tracked by operation
+        :param latency_sensitive: False if the latency of the request is not a sign of the load of the server
+        """
+        latency = time.monotonic() - start_time if latency_sensitive else None
+
+        with self.__condition:
+            self.in_flight -= 1
+
+            if self.__is_overloaded(status_code, operation, latency):
+                self.__decrease()
+            else:
+                self.__record_healthy(operation, latency)
+
+            self.__condition.notify_all()
+
+    def __is_overloaded(self, status_code, operation, latency):
+        if status_code is None or status_code == HTTPStatus.TOO_MANY_REQUESTS or status_code >= 500:
+            return True
+        if latency is None:
+            return False
+        if self.latency_threshold is not None:
+            return latency > self.latency_threshold
+
+        baseline_latency = self.baseline_latencies.get(operation)
+        if baseline_latency is not None and self.__healthy_samples[operation] >= self.latency_warmup:
+            return latency > self.latency_tolerance * baseline_latency + self.latency_slack
+
+        return False
+
+    def __decrease(self):
+        self.__healthy_in_a_row = 0
+        now = time.monotonic()
+        if self.__last_decrease is not None and now - self.__last_decrease < self.cooldown:
+            return
+
+        self.__last_decrease = now
+        self.limit = max(self.min_limit, int(self.limit * self.decrease_factor))
+
+    def __record_healthy(self, operation, latency):
+        if latency is not None:
+            self.__healthy_samples[operation] = self.__healthy_samples.get(operation, 0) + 1
+            baseline_latency = self.baseline_latencies.get(operation)
+            self.baseline_latencies[operation] = latency if baseline_latency is None \
+                else 0.9 * baseline_latency + 0.1 * latency
+
+        self.__healthy_in_a_row += 1
+        if self.__healthy_in_a_row >= self.limit:
+            self.__healthy_in_a_row = 0
+            self.limit = min(self.max_limit, self.limit + 1)
+
+
+def _check_tokens(tokens, capacity):
+    if tokens > capacity:
+        raise ValueError(f'{tokens} tokens can never be taken from a token bucket with a capacity of {capacity}.')
+
+
+def _wait_for_tokens(take, tokens, timeout):
+    deadline = None if timeout is None else time.monotonic() + timeout
+
+    while True:
+        wait_time = take(tokens)
+        if wait_time == 0:
+            return True
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining < wait_time:
+                return False
+        time.sleep(wait_time)
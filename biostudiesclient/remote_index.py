@@ -0,0 +1,219 @@
+"""
+biostudiesclient.remote_index
+~~~~~~~~~~~~
+
+This module implements a persistent local index of the user's file tree on the BioStudies server,
+so the existence and the size of the remote files can be looked up without a request to the server.
+
+:copyright: (c) 2021 by Karoly Erdos.
+:license: Apache2, see LICENSE for more details.
+"""
+
+import sqlite3
+import threading
+import time
+from http import HTTPStatus
+
+from biostudiesclient.concurrency import bounded_map, DEFAULT_MAX_WORKERS
+from biostudiesclient.exceptions import RestErrorException
+from biostudiesclient.folder_walker import RemoteEntry, FILE_TYPE, FOLDER_TYPE
+
+CREATE_TABLES = '''
+CREATE TABLE IF NOT EXISTS remote_entries (
+    path TEXT PRIMARY KEY,
+    folder TEXT NOT NULL,
+    name TEXT NOT NULL,
+    type TEXT,
+    size INTEGER,
+    indexed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS remote_entries_folder ON remote_entries (folder);
+CREATE TABLE IF NOT EXISTS listed_folders (
+    folder TEXT PRIMARY KEY,
+    listed_at REAL NOT NULL
+);
+'''
+
+
+class RemoteIndex:
+    """
+    This class mirrors the user's file tree on the server in a local SQLite database.
+    The entries are keyed by their path relative to the user's root folder, like 'folder1/folder2/file.txt',
+    so looking up a file is a single primary key query.
+
+    The index is built and refreshed from get_user_files listings with the refresh method.
+    An Api created with this index records its own uploads, deletions and created folders in it,
+    so the index stays up to date without listing the folders again.
+    The index can be shared by the threads of a bulk upload.
+    """
+
+    def __init__(self, index_path):
+        self.index_path = index_path
+        self.__lock = threading.Lock()
+        self.__connection = sqlite3.connect(index_path, check_same_thread=False)
+        self.__connection.execute('PRAGMA journal_mode=WAL')
+        self.__connection.execute('PRAGMA synchronous=NORMAL')
+        self.__connection.executescript(CREATE_TABLES)
+        self.__connection.commit()
+
+    def get(self, path):
+        """
+        :param path: the path of the file or folder relative to the user's root folder
+        :return: the indexed entry or None if it is not in the index
+        :rtype biostudiesclient.folder_walker.RemoteEntry
+        """
+
+        with self.__lock:
+            row = self.__connection.execute(
+                'SELECT folder, name, size, type FROM remote_entries WHERE path = ?', (_normalise(path),)).fetchone()
+
+        return RemoteEntry(*row) if row else None
+
+    def exists(self, path):
+        return self.get(path) is not None
+
+    def list_folder(self, folder_path=None):
+        """
+        :param folder_path: the path of the folder relative to the user's root folder, None for the root folder
+        :return: the indexed entries of the folder
+        :rtype list
+        """
+
+        with self.__lock:
+            rows = self.__connection.execute(
+                'SELECT folder, name, size, type FROM remote_entries WHERE folder = ? ORDER BY name',
+                (_normalise(folder_path),)).fetchall()
+
+        return [RemoteEntry(*row) for row in rows]
+
+    def listed_at(self, folder_path=None):
+        """ :return: the time of the last listing of the given folder or None if it has never been listed """
+        with self.__lock:
+            row = self.__connection.execute(
+                'SELECT listed_at FROM listed_folders WHERE folder = ?', (_normalise(folder_path),)).fetchone()
+
+        return row[0] if row else None
+
+    def refresh(self, api, folder_path=None, recursive=True, max_age=None, max_workers=DEFAULT_MAX_WORKERS):
+        """
+        Lists the given folder with get_user_files and replaces its entries in the index.
+        The folders are listed level by level, the folders of a level concurrently.
+        :param api: the biostudiesclient.api.Api to list the folders with
+        :param folder_path: the folder to refresh, the user's root folder if None
+        :param recursive: if True, then the sub folders are refreshed, too
+        :param max_age: if given, then the folders listed less than max_age seconds ago are not listed again,
+                        their indexed sub folders are refreshed only
+        :param max_workers: the maximum number of folders listed at the same time
+        :return: the number of folders listed
+        :rtype int
+        """
+
+        listed_folders = 0
+        folders = [_normalise(folder_path)]
+        while folders:
+            stale_folders = [folder for folder in folders if not self.__is_fresh(folder, max_age)]
+            sub_folders = [entry.path for folder in folders if folder not in stale_folders
+                           for entry in self.list_folder(folder) if entry.is_folder]
+
+            for outcome in bounded_map(lambda folder: api.get_user_files(folder or None), stale_folders, max_workers):
+                if not outcome.succeeded:
+                    if not _is_not_found(outcome.error):
+                        raise outcome.error
+                    # a folder that does not exist any more is removed from the index with its content
+                    self.remove(outcome.item)
+                    continue
+
+                entries = [RemoteEntry(outcome.item, entry.get('name'), entry.get('size'), entry.get('type'))
+                           for entry in outcome.result.json or []]
+                self.__replace_folder(outcome.item, entries)
+                sub_folders.extend(entry.path for entry in entries if entry.is_folder)
+                listed_folders += 1
+
+            folders = sub_folders if recursive else []
+
+        return listed_folders
+
+    def add_file(self, folder_path, name, size):
+        """ Records an uploaded file in the index, together with its folders. """
+        self.add_folder(folder_path)
+        folder = _normalise(folder_path)
+        with self.__lock:
+            self.__connection.execute('INSERT OR REPLACE INTO remote_entries VALUES (?, ?, ?, ?, ?, ?)',
+                                      (_join(folder, name), folder, name, FILE_TYPE, size, time.time()))
+            self.__connection.commit()
+
+    def add_folder(self, folder_path):
+        """ Records a created folder and its parent folders in the index. """
+        rows = []
+        parent = ''
+        for name in filter(None, _normalise(folder_path).split('/')):
+            rows.append((_join(parent, name), parent, name, FOLDER_TYPE, None, time.time()))
+            parent = _join(parent, name)
+
+        with self.__lock:
+            self.__connection.executemany('INSERT OR IGNORE INTO remote_entries VALUES (?, ?, ?, ?, ?, ?)', rows)
+            self.__connection.commit()
+
+    def remove(self, path):
+        """ Removes a deleted file or folder from the index, with the content of the folder. """
+        with self.__lock:
+            self.__delete_tree(_normalise(path))
+            self.__connection.commit()
+
+    def clear(self):
+        with self.__lock:
+            self.__connection.execute('DELETE FROM remote_entries')
+            self.__connection.execute('DELETE FROM listed_folders')
+            self.__connection.commit()
+
+    def close(self):
+        with self.__lock:
+            self.__connection.close()
+
+    def __is_fresh(self, folder, max_age):
+        if max_age is None:
+            return False
+
+        listed_at = self.listed_at(folder)
+        return listed_at is not None and time.time() - listed_at < max_age
+
+    def __replace_folder(self, folder, entries):
+        prefix = folder + '/' if folder else ''
+        listed_names = {entry.name for entry in entries}
+        now = time.time()
+        with self.__lock:
+            removed_names = [name for (name,) in self.__connection.execute(
+                'SELECT name FROM remote_entries WHERE folder = ?', (folder,)) if name not in listed_names]
+            for name in removed_names:
+                self.__delete_tree(prefix + name)
+            self.__connection.executemany(
+                'INSERT OR REPLACE INTO remote_entries VALUES (?, ?, ?, ?, ?, ?)',
+                [(entry.path, folder, entry.name, entry.type, entry.size, now) for entry in entries])
+            self.__connection.execute('INSERT OR REPLACE INTO listed_folders VALUES (?, ?)', (folder, now))
+            self.__connection.commit()
+
+    def __delete_tree(self, path):
+        # the paths in the folder are between 'path/' and 'path0' ('0' follows '/'), a range the primary key can use
+        self.__connection.execute("DELETE FROM remote_entries WHERE path = ? OR (path >= ? || '/' AND path < ? || '0')",
+                                  (path, path, path))
+        self.__connection.execute(
+            "DELETE FROM listed_folders WHERE folder = ? OR (folder >= ? || '/' AND folder < ? || '0')",
+            (path, path, path))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _is_not_found(error):
+    return isinstance(error, RestErrorException) and error.status_code == HTTPStatus.NOT_FOUND
+
+
+def _normalise(path):
+    return (path or '').strip('/')
+
+
+def _join(folder, name):
+    return '/'.join(filter(None, [folder, name]))
@@ -8,6 +8,7 @@ This module dealing with HTTP responses.
 :license: Apache2, see LICENSE for more details.
 """
 
+import json
 from dataclasses import dataclass
 from http import HTTPStatus
 import requests
@@ -16,6 +17,8 @@ from biostudiesclient.exceptions import RestErrorException
 
 TRY_IT_AGAIN_LATER_MESSAGE = "The request to the BioStudies service returned a HTTP Server error." \
                              "Please check the health of the BioStudies service, you may need to resubmit your request"
+SUCCESSFUL_STATUS_CODES = [requests.codes['ok'], requests.codes['created'], requests.codes['accepted'],
+                           requests.codes['no_content']]
 
 
 class ResponseUtils:
@@ -47,9 +50,7 @@ class ResponseUtils:
             error_message = f'This URL {input_response.url} not exists. Please, try to correct the requested URL.'
         elif input_response.status_code == requests.codes['internal_server_error']:
             error_message = TRY_IT_AGAIN_LATER_MESSAGE
-        elif input_response.status_code not in \
-                [requests.codes['ok'], requests.codes['created'], requests.codes['accepted'],
-                 requests.codes['no_content']]:
+        elif input_response.status_code not in SUCCESSFUL_STATUS_CODES:
             error_message = ResponseUtils.__get_error_message(response_json)
             if not error_message:
                 error_message = TRY_IT_AGAIN_LATER_MESSAGE
@@ -67,10 +68,19 @@ class ResponseUtils:
         if len(input_response.text) == 0:
             return ''
 
-        return input_response.json()
+        try:
+            return input_response.json()
+        except ValueError:
+            # error pages of proxies and gateways are usually not JSON documents
+            if input_response.status_code in SUCCESSFUL_STATUS_CODES:
+                raise
+            return ''
 
     @staticmethod
     def __get_error_message(response_json):
+        if not isinstance(response_json, dict):
+            return ''
+
         message = response_json.get("log", {}). get("message", '')
         detailed_messages = response_json.get("log", {}).get("subnodes", '')
         if detailed_messages:
@@ -93,3 +103,44 @@ class ResponseObject:
 
     status = HTTPStatus.OK
     json = {}
+
+
+class StreamedResponse(ResponseObject):
+    """
+    A response whose json is a generator, that parses the body of the HTTP response while it is read
+    from the connection. The connection goes back to the pool when the generator is exhausted
+    or the response is closed, so a response that is not fully iterated should be closed,
+    for example by using it as a context manager.
+    """
+
+    def __init__(self, input_response, items):
+        self.status = input_response.status_code
+        self.json = items
+        self.__input_response = input_response
+
+    def close(self):
+        """ Stops the parsing and releases the connection of the HTTP response. """
+        self.json.close()
+        self.__input_response.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc_info):
+        self.close()
+
+
+@dataclass
+class BufferedResponse:
+    """
+    A data class for wrapping an HTTP response whose body has already been read,
+    for example by an asynchronous HTTP client.
+    It provides the same attributes as a requests response that ResponseUtils relies on.
+    """
+
+    status_code: int
+    url: str
+    text: str = ''
+
+    def json(self):
+        return json.loads(self.text)
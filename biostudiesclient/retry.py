@@ -0,0 +1,148 @@
+"""
+biostudiesclient.retry
+~~~~~~~~~~~~
+
+This module implements the retry policy for the requests sent to the BioStudies REST API.
+
+:copyright: (c) 2021 by Karoly Erdos.
+:license: Apache2, see LICENSE for more details.
+"""
+
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from http import HTTPStatus
+from typing import Tuple
+
+import requests
+
+RETRYABLE_STATUS_CODES = (
+    HTTPStatus.TOO_MANY_REQUESTS,
+    HTTPStatus.BAD_GATEWAY,
+    HTTPStatus.SERVICE_UNAVAILABLE,
+    HTTPStatus.GATEWAY_TIMEOUT
+)
+RETRYABLE_EXCEPTIONS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout
+)
+
+
+@dataclass
+class RetryPolicy:
+    """
+    A data class for configuring how failed requests are retried.
+
+    max_attempts: the maximum number of attempts, including the first one, 1 means no retry
+    backoff_factor: the delay before the first retry in seconds, it doubles with every further retry
+    max_backoff: the upper limit of the exponential backoff delay in seconds
+    jitter: if True, the delay is a random value between 0 and the exponential backoff delay ("full jitter"),
+            so many clients failing at the same time do not retry at the same time
+    respect_retry_after: if True, the delay requested by the server in the Retry-After header is used
+    max_retry_after: the upper limit of the delay requested by the server in seconds
+    retryable_status_codes: the HTTP status codes of the responses that are retried
+    retryable_exceptions: the exceptions raised by the HTTP client that are retried
+    retry_non_idempotent: if True, POST requests are retried, too.
+                          They are not retried by default, because they might have been processed by the server.
+    """
+
+    max_attempts: int = 3
+    backoff_factor: float = 0.5
+    max_backoff: float = 30.0
+    jitter: bool = True
+    respect_retry_after: bool = True
+    max_retry_after: float = 300.0
+    retryable_status_codes: Tuple[int, ...] = RETRYABLE_STATUS_CODES
+    retryable_exceptions: Tuple[type, ...] = RETRYABLE_EXCEPTIONS
+    retry_non_idempotent: bool = False
+
+    def call(self, send, idempotent=True, before_retry=None):
+        """
+        Calls the send function and repeats the call while it fails with a retryable response or exception.
+        :param send: function without parameters, that sends the request and returns its response
+        :param idempotent: whether the request can be repeated safely
+        :param before_retry: optional function called with the number of the next attempt before every retry,
+                             for example to rewind the body of the request
+        :return: the last response, it is the failed response if all the attempts failed
+        :raise the last exception raised by send, if it is not retryable or all the attempts failed
+        """
+
+        attempt = 1
+        while True:
+            try:
+                response = send()
+            except self.retryable_exceptions:
+                if not self.__can_retry(attempt, idempotent):
+                    raise
+                delay = self.backoff(attempt)
+            else:
+                if response.status_code not in self.retryable_status_codes \
+                        or not self.__can_retry(attempt, idempotent):
+                    return response
+                delay = self.delay(attempt, response)
+                response.close()
+
+            time.sleep(delay)
+            attempt += 1
+            if before_retry:
+                before_retry(attempt)
+
+    def backoff(self, attempt):
+        """
+        :param attempt: the number of the failed attempt, starting from 1
+        :return: the exponential backoff delay in seconds before the next attempt
+        :rtype float
+        """
+
+        delay = min(self.max_backoff, self.backoff_factor * (2 ** (attempt - 1)))
+        if self.jitter:
+            delay = random.uniform(0, delay)
+
+        return delay
+
+    def delay(self, attempt, response):
+        """
+        :return: the delay requested by the server in the Retry-After header if there is any,
+                 otherwise the exponential backoff delay
+        :rtype float
+        """
+
+        if self.respect_retry_after:
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if retry_after is not None:
+                return min(retry_after, self.max_retry_after)
+
+        return self.backoff(attempt)
+
+    def __can_retry(self, attempt, idempotent):
+        return attempt < self.max_attempts and (idempotent or self.retry_non_idempotent)
+
+
+NO_RETRY = RetryPolicy(max_attempts=1)
+
+
+def parse_retry_after(value):
+    """
+    Parses the value of a Retry-After header, that is either a number of seconds or an HTTP date.
+    :return: the delay in seconds or None if the value is missing or invalid
+    :rtype float
+    """
+
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
@@ -0,0 +1,183 @@
+"""
+biostudiesclient.serializer
+~~~~~~~~~~~~
+
+This module implements a fast, streaming JSON serializer for the BioStudy data classes.
+
+:copyright: (c) 2021 by Karoly Erdos.
+:license: Apache2, see LICENSE for more details.
+"""
+
+import dataclasses
+from json.encoder import encode_basestring_ascii, encode_basestring
+
+from biostudiesclient.file_table import FileTable
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+DEFAULT_BUFFER_SIZE = 64 * 1024
+
+
+class BioStudySerializer:
+    """
+    Serializes a BioStudy (or any other data class of biostudiesclient.models) to JSON.
+    It produces a JSON document equivalent to the one of json.dumps with models.EnhancedJSONEncoder
+    (with compact separators, so the bytes differ), but it walks the model only once
+    and reads the fields of the data classes directly,
+    without making a deep copy of the whole tree with dataclasses.asdict first.
+
+    The document can be produced as a stream of string chunks,
+    so it can be written to a file or a socket without building the whole document in memory.
+    If orjson is installed, then it is used to encode the data classes, unless use_orjson is False.
+    """
+
+    def __init__(self, use_orjson=True, ensure_ascii=True):
+        self.use_orjson = bool(use_orjson and orjson is not None)
+        self.ensure_ascii = ensure_ascii
+        self.__encode_string = encode_basestring_ascii if ensure_ascii else encode_basestring
+
+    def dumps(self, obj):
+        """
+        :param obj: the data class object to serialize
+        :return: the JSON document
+        :rtype str
+        """
+
+        return ''.join(self.iter_encode(obj))
+
+    def dump(self, obj, output_file, buffer_size=DEFAULT_BUFFER_SIZE):
+        """
+        Writes the JSON document to the given text file-like object,
+        in chunks of about buffer_size characters.
+        :param obj: the data class object to serialize
+        :param output_file: a text file-like object with a write method
+        """
+
+        buffer = []
+        buffered_size = 0
+        for chunk in self.iter_encode(obj):
+            buffer.append(chunk)
+            buffered_size += len(chunk)
+            if buffered_size >= buffer_size:
+                output_file.write(''.join(buffer))
+                buffer = []
+                buffered_size = 0
+
+        if buffer:
+            output_file.write(''.join(buffer))
+
+    def iter_encode(self, obj):
+        """
+        Encodes the given object to JSON incrementally.
+        :param obj: the data class object to serialize
+        :return: generator of the chunks of the JSON document
+        """
+
+        if isinstance(obj, str):
+            yield self.__encode_string(obj)
+        elif obj is None:
+            yield 'null'
+        elif obj is True:
+            yield 'true'
+        elif obj is False:
+            yield 'false'
+        elif isinstance(obj, (int, float)):
+            yield _encode_number(obj)
+        elif dataclasses.is_dataclass(obj):
+            yield from self.__iter_encode_dataclass(obj)
+        elif isinstance(obj, dict):
+            yield from self.__iter_encode_dict(obj)
+        elif isinstance(obj, FileTable):
+            yield from self.__iter_encode_file_table(obj)
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            yield from self.__iter_encode_items(obj)
+        else:
+            raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+    def __iter_encode_dataclass(self, obj):
+        separator = '{'
+        for field_name in _field_names(type(obj)):
+            yield separator + self.__encode_string(field_name) + ':'
+            yield from self.iter_encode(getattr(obj, field_name))
+            separator = ','
+        yield '}' if separator == ',' else '{}'
+
+    def __iter_encode_dict(self, obj):
+        separator = '{'
+        for key, value in obj.items():
+            yield separator + self.__encode_string(str(key)) + ':'
+            yield from self.iter_encode(value)
+            separator = ','
+        yield '}' if separator == ',' else '{}'
+
+    def __iter_encode_items(self, items):
+        separator = '['
+        for item in items:
+            if self.use_orjson and dataclasses.is_dataclass(item):
+                # the items of large collections, like the files of a section, are encoded in one call each
+                yield separator + self.__orjson_encode(item)
+            else:
+                yield separator
+                yield from self.iter_encode(item)
+            separator = ','
+        yield ']' if separator == ',' else '[]'
+
+    def __iter_encode_file_table(self, file_table):
+        separator = '['
+        for encoded_file in file_table.iter_json(self.ensure_ascii):
+            yield separator + encoded_file
+            separator = ','
+        yield ']' if separator == ',' else '[]'
+
+    def __orjson_encode(self, obj):
+        encoded = orjson.dumps(obj, default=_orjson_default, option=orjson.OPT_PASSTHROUGH_DATACLASS).decode('utf-8')
+        if self.ensure_ascii and not encoded.isascii():
+            return ''.join(BioStudySerializer(use_orjson=False).iter_encode(obj))
+
+        return encoded
+
+
+_FIELD_NAMES = {}
+
+
+def _field_names(cls):
+    field_names = _FIELD_NAMES.get(cls)
+    if field_names is None:
+        field_names = tuple(a_field.name for a_field in dataclasses.fields(cls))
+        _FIELD_NAMES[cls] = field_names
+
+    return field_names
+
+
+def _encode_number(number):
+    if isinstance(number, int):
+        return int.__repr__(number)
+    if number != number:
+        return 'NaN'
+    if number in (float('inf'), float('-inf')):
+        return 'Infinity' if number > 0 else '-Infinity'
+
+    return float.__repr__(number)
+
+
+def _orjson_default(obj):
+    if isinstance(obj, (set, frozenset, FileTable)):
+        return list(obj)
+    if dataclasses.is_dataclass(obj):
+        # only the fields, like dataclasses.asdict, orjson itself would encode every instance attribute
+        return {field_name: getattr(obj, field_name) for field_name in _field_names(type(obj))}
+
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def dumps(obj, **kwargs):
+    """ Serializes the given data class object to a JSON string with a BioStudySerializer. """
+    return BioStudySerializer(**kwargs).dumps(obj)
+
+
+def dump(obj, output_file, **kwargs):
+    """ Writes the given data class object as JSON to the text file-like object with a BioStudySerializer. """
+    BioStudySerializer(**kwargs).dump(obj, output_file)
@@ -0,0 +1,75 @@
+"""
+biostudiesclient.session
+~~~~~~~~~~~~
+
+This module contains the connection-pooled HTTP session shared by the API client classes.
+
+:copyright: (c) 2021 by Karoly Erdos.
+:license: Apache2, see LICENSE for more details.
+"""
+
+from dataclasses import dataclass
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+
+
+@dataclass
+class SessionConfig:
+    """
+    A data class for configuring the HTTP transport used by the client.
+
+    pool_connections: the number of per-host connection pools to keep
+    pool_maxsize: the maximum number of connections kept alive per host
+    pool_block: whether to block (instead of opening a throw-away connection) when the pool is exhausted
+    keep_alive: whether to reuse connections between requests
+    connect_timeout: seconds to wait for establishing a connection, None means no limit
+    read_timeout: seconds to wait for the server between bytes of the response, None means no limit
+    """
+
+    pool_connections: int = DEFAULT_POOL_CONNECTIONS
+    pool_maxsize: int = DEFAULT_POOL_MAXSIZE
+    pool_block: bool = False
+    keep_alive: bool = True
+    connect_timeout: float = None
+    read_timeout: float = None
+
+    @property
+    def timeout(self):
+        """
+        Returns the timeout in the format expected by the requests library.
+        :return: a (connect, read) tuple or None if no timeout has been configured
+        """
+        if self.connect_timeout is None and self.read_timeout is None:
+            return None
+
+        return self.connect_timeout, self.read_timeout
+
+
+class PooledSession(requests.Session):
+    """
+    A requests session with a configurable connection pool.
+    Connections to the BioStudies REST API are kept alive and reused between requests,
+    so only the first request to a host pays for the TCP and TLS handshake.
+    The same session can be shared by several Api instances and threads.
+    """
+
+    def __init__(self, config=None):
+        super().__init__()
+        self.config = config if config else SessionConfig()
+
+        adapter = HTTPAdapter(pool_connections=self.config.pool_connections,
+                              pool_maxsize=self.config.pool_maxsize,
+                              pool_block=self.config.pool_block)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+        if not self.config.keep_alive:
+            self.headers['Connection'] = 'close'
+
+    def request(self, method, url, *args, **kwargs):
+        kwargs.setdefault('timeout', self.config.timeout)
+
+        return super().request(method, url, *args, **kwargs)
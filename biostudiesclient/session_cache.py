@@ -0,0 +1,181 @@
+"""
+biostudiesclient.session_cache
+~~~~~~~~~~~~
+
+This module implements a persistent cache of session ids,
+so short-lived processes of the same user can share a session instead of logging in one by one.
+
+:copyright: (c) 2021 by Karoly Erdos.
+:license: Apache2, see LICENSE for more details.
+"""
+
+import hashlib
+import hmac
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+DEFAULT_SESSION_CACHE_DIRECTORY = os.path.join(os.path.expanduser('~'), '.cache', 'biostudiesclient', 'sessions')
+DEFAULT_MAX_AGE = 4 * 60 * 60
+KEY_FILE_NAME = 'key'
+KEY_SIZE = 32
+
+
+@dataclass
+class CachedSession:
+    """ A data class for a session id cached for a user of a BioStudies REST API. """
+
+    base_url: str
+    username: str
+    session_id: str
+    stored_at: float = 0.0
+    password_salt: str = None
+    password_hash: str = None
+
+    def is_fresh(self, max_age):
+        return time.time() - self.stored_at < max_age
+
+    def password_matches(self, password, key):
+        if not self.password_salt or not self.password_hash:
+            return False
+
+        return hmac.compare_digest(self.password_hash, _hash_password(password, self.password_salt, key))
+
+
+class SessionCache:
+    """
+    This class responsibility to store the session ids in a directory shared by the processes of a user,
+    keyed by the URL of the BioStudies REST API and the username.
+    The password is never stored, only a salted HMAC-SHA256 of it, keyed with a random key
+    stored in the directory, so a cached session id is returned only for the password that created it.
+    The HMAC is cheap, so a cache hit costs microseconds instead of a slow key derivation.
+    The trade-off is that anyone who can read the directory can test guessed passwords quickly,
+    but the files are readable by their owner only, and the cached session id itself is exposed to that reader anyway.
+
+    A session id older than max_age seconds is not used anymore.
+    The logins of the processes are serialized with a lock file per key,
+    so when many processes start at the same time, only the first one logs in
+    and the others reuse its session id.
+    """
+
+    def __init__(self, directory=DEFAULT_SESSION_CACHE_DIRECTORY, max_age=DEFAULT_MAX_AGE):
+        self.directory = directory
+        self.max_age = max_age
+
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        self.__key = self.__load_key()
+
+    def get(self, base_url, username, password):
+        """
+        :return: the cached session id of the user or None if there is no fresh session id in the cache
+                 created with the given password
+        :rtype str
+        """
+
+        cached_session = self.__read(base_url, username)
+        if cached_session is None or not cached_session.is_fresh(self.max_age) \
+                or not cached_session.password_matches(password, self.__key):
+            return None
+
+        return cached_session.session_id
+
+    def put(self, base_url, username, session_id, password):
+        """ Stores the session id of the user, with the salted hash of the password it has been created with. """
+        salt = os.urandom(16).hex()
+        cached_session = CachedSession(base_url, username, session_id, stored_at=time.time(), password_salt=salt,
+                                       password_hash=_hash_password(password, salt, self.__key))
+
+        # written to a temporary file and renamed, so a reader never sees a partially written file
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(file_descriptor, 'w', encoding='utf-8') as cache_file:
+            json.dump(asdict(cached_session), cache_file)
+        os.replace(temporary_path, self.__path(base_url, username))
+
+    def invalidate(self, base_url, username, session_id=None):
+        """
+        Removes the cached session id of the user.
+        :param session_id: if given, then the cached session id is removed only if it is the given one,
+                           so a session id refreshed by another process is kept
+        """
+
+        with self.lock(base_url, username):
+            cached_session = self.__read(base_url, username)
+            if session_id is not None and (cached_session is None or cached_session.session_id != session_id):
+                return
+            try:
+                os.remove(self.__path(base_url, username))
+            except FileNotFoundError:
+                pass
+
+    @contextmanager
+    def lock(self, base_url, username):
+        """ Holds the lock of the user's session id, that is shared by all the processes using this directory. """
+        with open(self.__path(base_url, username, '.lock'), 'a+b') as lock_file:
+            _lock_file(lock_file)
+            try:
+                yield
+            finally:
+                _unlock_file(lock_file)
+
+    def __load_key(self):
+        key_path = os.path.join(self.directory, KEY_FILE_NAME)
+        if not os.path.exists(key_path):
+            file_descriptor, temporary_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(file_descriptor, 'wb') as key_file:
+                key_file.write(os.urandom(KEY_SIZE))
+            try:
+                # linking fails if another process has created the key in the meantime, then its key is used
+                os.link(temporary_path, key_path)
+            except FileExistsError:
+                pass
+            finally:
+                os.remove(temporary_path)
+
+        with open(key_path, 'rb') as key_file:
+            return key_file.read()
+
+    def __read(self, base_url, username):
+        try:
+            with open(self.__path(base_url, username), encoding='utf-8') as cache_file:
+                cached_session = CachedSession(**json.load(cache_file))
+        except (OSError, ValueError, TypeError):
+            return None
+
+        if (cached_session.base_url, cached_session.username) != (base_url, username):
+            return None
+
+        return cached_session
+
+    def __path(self, base_url, username, suffix='.json'):
+        key = f'{base_url}\n{username}'
+        return os.path.join(self.directory, hashlib.sha256(key.encode('utf-8')).hexdigest() + suffix)
+
+
+def _hash_password(password, salt, key):
+    message = bytes.fromhex(salt) + (password or '').encode('utf-8')
+    return hmac.new(key, message, hashlib.sha256).hexdigest()
+
+
+def _lock_file(lock_file):
+    if fcntl is not None:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+    else:
+        lock_file.seek(0)
+        msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+
+
+def _unlock_file(lock_file):
+    if fcntl is not None:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+    else:
+        lock_file.seek(0)
+        msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
@@ -0,0 +1,287 @@
+"""
+biostudiesclient.submission_parser
+~~~~~~~~~~~~
+
+This module converts the JSON documents of submissions returned by BioStudies REST API
+to the data classes of biostudiesclient.models, and parses large responses incrementally.
+
+:copyright: (c) 2021 by Karoly Erdos.
+:license: Apache2, see LICENSE for more details.
+"""
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+from biostudiesclient.models import BioStudiesAttribute, BioStudyFile, BioStudyLink, BioStudySubsection, \
+    BioStudySection, BioStudy
+
+ATTACH_TO_ATTRIBUTE = 'AttachTo'
+FILE_ITEM = 'file'
+LINK_ITEM = 'link'
+SECTION_ITEM = 'section'
+SUBMISSION_ITEM = 'submission'
+SECTION_ITEM_PREFIXES = {
+    'section.files.item': FILE_ITEM,
+    'section.links.item': LINK_ITEM,
+    'section.subsections.item': SECTION_ITEM,
+}
+
+
+def parse_submission(submission_json, lazy=True):
+    """
+    Converts the JSON document of a submission, like the json of get_submission's response, to a BioStudy.
+    The AttachTo attribute of the submission is set as the attach_to field of the BioStudy.
+    :param submission_json: the JSON document of the submission as a dict
+    :param lazy: if True, then the section, and the files, links and sub sections of the section
+                 are converted only when they are first accessed
+    :return: the submission
+    :rtype biostudiesclient.models.BioStudy
+    """
+
+    if lazy:
+        return LazyBioStudy(submission_json)
+
+    bio_study = BioStudy()
+    _set_submission_fields(bio_study, submission_json)
+    section_json = submission_json.get('section')
+    bio_study.section = to_section(section_json) if section_json is not None else None
+
+    return bio_study
+
+
+def parse_submission_stream(stream):
+    """
+    Converts the JSON document of a submission to a BioStudy while it is read from the given binary stream,
+    for example the raw body of an HTTP response.
+    Only the JSON of a single file, link or sub section is kept in memory at a time,
+    instead of the JSON of the whole document.
+    It requires ijson, install it with: pip install biostudies-client[stream]
+    :param stream: a binary file-like object with a read method
+    :return: the submission
+    :rtype biostudiesclient.models.BioStudy
+    """
+
+    collections = {FILE_ITEM: set(), LINK_ITEM: set(), SECTION_ITEM: set()}
+    submission_json = {}
+    for item_type, item_json in iter_submission_items(stream):
+        if item_type == SUBMISSION_ITEM:
+            submission_json = item_json
+        else:
+            collections[item_type].add(_CONVERTERS[item_type](item_json))
+
+    bio_study = BioStudy()
+    _set_submission_fields(bio_study, submission_json)
+    section_json = submission_json.get('section')
+    if section_json is not None:
+        bio_study.section = BioStudySection(section_type=section_json.get('type'), accno=section_json.get('accno'),
+                                            attributes=to_attributes(section_json.get('attributes')),
+                                            files=collections[FILE_ITEM], links=collections[LINK_ITEM],
+                                            subsections=collections[SECTION_ITEM])
+
+    return bio_study
+
+
+def to_attributes(attributes_json):
+    """ :return: the set of BioStudiesAttribute objects of the given JSON list of attributes """
+    return {BioStudiesAttribute(attribute.get('name'), attribute.get('value')) for attribute in attributes_json or []}
+
+
+def to_file(file_json):
+    return BioStudyFile(file_json.get('path'), file_json.get('type'), to_attributes(file_json.get('attributes')))
+
+
+def to_link(link_json):
+    return BioStudyLink(link_json.get('url'), to_attributes(link_json.get('attributes')))
+
+
+def to_subsection(subsection_json):
+    return BioStudySubsection(subsection_json.get('type'), to_attributes(subsection_json.get('attributes')))
+
+
+def to_section(section_json):
+    return BioStudySection(section_type=section_json.get('type'), accno=section_json.get('accno'),
+                           attributes=to_attributes(section_json.get('attributes')),
+                           files={to_file(item) for item in _flatten(section_json.get('files'))},
+                           links={to_link(item) for item in _flatten(section_json.get('links'))},
+                           subsections={to_subsection(item) for item in _flatten(section_json.get('subsections'))})
+
+
+class LazyBioStudy(BioStudy):
+    """
+    A BioStudy created from the JSON document of a submission,
+    its section is converted to a LazyBioStudySection only when it is first accessed.
+    It is equal to a BioStudy with the same fields.
+    """
+
+    def __init__(self, submission_json):  # pylint: disable=super-init-not-called
+        _set_submission_fields(self, submission_json)
+        self._section_json = submission_json.get('section')
+        self._section = None
+
+    @property
+    def section(self):
+        if self._section is None and self._section_json is not None:
+            self._section = LazyBioStudySection(self._section_json)
+        return self._section
+
+    @section.setter
+    def section(self, section):
+        self._section_json = None
+        self._section = section
+
+    def __eq__(self, other):
+        return _fields_equal(self, other, BioStudy)
+
+
+class LazyBioStudySection(BioStudySection):
+    """
+    A BioStudySection created from the JSON document of a section,
+    its files, links and sub sections are converted only when they are first accessed.
+    It is equal to a BioStudySection with the same fields.
+    """
+
+    def __init__(self, section_json):  # pylint: disable=super-init-not-called
+        self.section_type = section_json.get('type')
+        self.accno = section_json.get('accno')
+        self.attributes = to_attributes(section_json.get('attributes'))
+        self._section_json = section_json
+        self._files = None
+        self._links = None
+        self._subsections = None
+
+    @property
+    def files(self):
+        if self._files is None:
+            self._files = {to_file(item) for item in _flatten(self._section_json.get('files'))}
+        return self._files
+
+    @files.setter
+    def files(self, files):
+        self._files = files
+
+    @property
+    def links(self):
+        if self._links is None:
+            self._links = {to_link(item) for item in _flatten(self._section_json.get('links'))}
+        return self._links
+
+    @links.setter
+    def links(self, links):
+        self._links = links
+
+    @property
+    def subsections(self):
+        if self._subsections is None:
+            self._subsections = {to_subsection(item) for item in _flatten(self._section_json.get('subsections'))}
+        return self._subsections
+
+    @subsections.setter
+    def subsections(self, subsections):
+        self._subsections = subsections
+
+    def __eq__(self, other):
+        return _fields_equal(self, other, BioStudySection)
+
+
+def _set_submission_fields(bio_study, submission_json):
+    attributes = to_attributes(submission_json.get('attributes'))
+    attach_to = next((attribute for attribute in attributes if attribute.name == ATTACH_TO_ATTRIBUTE), None)
+    if attach_to:
+        attributes.remove(attach_to)
+
+    bio_study.accno = submission_json.get('accno')
+    bio_study.attach_to = attach_to.value if attach_to else None
+    bio_study.attributes = attributes
+
+
+def _flatten(items_json):
+    # files, links and sub sections can be grouped into tables, that are lists in the list
+    for item in items_json or []:
+        if isinstance(item, list):
+            yield from item
+        else:
+            yield item
+
+
+def _fields_equal(lazy_object, other, model_class):
+    if not isinstance(other, model_class):
+        return NotImplemented
+
+    field_names = model_class.__dataclass_fields__
+    return all(getattr(lazy_object, field_name) == getattr(other, field_name) for field_name in field_names)
+
+
+def iter_submission_items(stream):
+    """
+    Parses the JSON document of a submission incrementally, while it is read from the given binary stream.
+    The files, links and sub sections of the submission's section are yielded one by one as soon as they are parsed,
+    so only one of them is kept in memory at a time.
+    The files, links and sub sections grouped into tables are flattened, so they are yielded one by one as well.
+    The files, links and sub sections of the sub sections are not split, they are part of their sub section.
+    It requires ijson, install it with: pip install biostudies-client[stream]
+    :param stream: a binary file-like object with a read method
+    :return: generator of (item type, JSON) tuples, the item type is FILE_ITEM, LINK_ITEM or SECTION_ITEM,
+             the last one is SUBMISSION_ITEM with the rest of the document,
+             its section having empty files, links and subsections lists
+    """
+
+    _require_ijson()
+    item_prefixes = dict(SECTION_ITEM_PREFIXES)
+    for prefix, item_type in SECTION_ITEM_PREFIXES.items():
+        # the items of a table are in a list in the list
+        item_prefixes[prefix + '.item'] = item_type
+    table_prefixes = set(SECTION_ITEM_PREFIXES)
+
+    document_builder = ijson.ObjectBuilder()
+    item_builder = None
+    item_type = None
+    depth = 0
+    for prefix, event, value in ijson.parse(stream, use_float=True):
+        if item_builder is None and event == 'start_map' and prefix in item_prefixes:
+            item_builder = ijson.ObjectBuilder()
+            item_type = item_prefixes[prefix]
+            depth = 0
+
+        if item_builder is None:
+            # the lists of the tables are left out of the rest of the document, like the items in them
+            if not (event in ('start_array', 'end_array') and prefix in table_prefixes):
+                document_builder.event(event, value)
+            continue
+
+        item_builder.event(event, value)
+        if event in ('start_map', 'start_array'):
+            depth += 1
+        elif event in ('end_map', 'end_array'):
+            depth -= 1
+            if depth == 0:
+                yield item_type, item_builder.value
+                item_builder = None
+
+    yield SUBMISSION_ITEM, document_builder.value
+
+
+def iter_user_files(stream):
+    """
+    Parses the JSON list of files and folders returned by get_user_files incrementally.
+    It requires ijson, install it with: pip install biostudies-client[stream]
+    :param stream: a binary file-like object with a read method
+    :return: generator of the JSON objects of the files and folders
+    """
+
+    _require_ijson()
+    return ijson.items(stream, 'item', use_float=True)
+
+
+def _require_ijson():
+    if ijson is None:
+        raise ImportError('Parsing a stream requires ijson. '
+                          'Please, install it with: pip install biostudies-client[stream]')
+
+
+_CONVERTERS = {
+    FILE_ITEM: to_file,
+    LINK_ITEM: to_link,
+    SECTION_ITEM: to_subsection,
+}
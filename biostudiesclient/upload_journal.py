@@ -0,0 +1,137 @@
+"""
+biostudiesclient.upload_journal
+~~~~~~~~~~~~
+
+This module implements a persistent local journal of the completed file uploads,
+so an interrupted bulk upload can be resumed without uploading the same files again.
+
+:copyright: (c) 2021 by Karoly Erdos.
+:license: Apache2, see LICENSE for more details.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+
+CHECKSUM_CHUNK_SIZE = 1024 * 1024
+
+CREATE_TABLE = '''
+CREATE TABLE IF NOT EXISTS uploaded_files (
+    local_path TEXT PRIMARY KEY,
+    remote_path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    modified_time REAL NOT NULL,
+    checksum TEXT,
+    uploaded_at REAL NOT NULL
+)
+'''
+
+
+@dataclass
+class JournalEntry:
+    """ A data class for a completed upload recorded in the journal. """
+
+    local_path: str
+    remote_path: str
+    size: int
+    modified_time: float
+    checksum: str
+    uploaded_at: float
+
+
+class UploadJournal:
+    """
+    This class records the completed uploads in a local SQLite database.
+    The entries are keyed by the absolute local path and contain the size, the modification time
+    and optionally the checksum of the file at the time of the upload,
+    so a file that has been modified since then is not considered completed.
+
+    Every entry is committed as soon as it is recorded, so the journal survives if the process is killed.
+    The journal can be shared by the threads of a bulk upload.
+    """
+
+    def __init__(self, journal_path):
+        self.journal_path = journal_path
+        self.__lock = threading.Lock()
+        self.__connection = sqlite3.connect(journal_path, check_same_thread=False)
+        self.__connection.execute('PRAGMA journal_mode=WAL')
+        self.__connection.execute('PRAGMA synchronous=NORMAL')
+        self.__connection.execute(CREATE_TABLE)
+        self.__connection.commit()
+
+    def get(self, local_path):
+        """
+        :param local_path: the path of the local file
+        :return: the journal entry of the given file or None if it has not been uploaded
+        :rtype biostudiesclient.upload_journal.JournalEntry
+        """
+
+        with self.__lock:
+            row = self.__connection.execute(
+                'SELECT local_path, remote_path, size, modified_time, checksum, uploaded_at '
+                'FROM uploaded_files WHERE local_path = ?', (os.path.abspath(local_path),)).fetchone()
+
+        return JournalEntry(*row) if row else None
+
+    def is_completed(self, local_file, verify_checksum=False):
+        """
+        Checks whether the given local file has already been uploaded in its current state.
+        :param local_file: the biostudiesclient.bulk_upload.LocalFile to check
+        :param verify_checksum: if True, the checksum of the local file is calculated and compared, too,
+                                a file recorded without a checksum is not considered completed then
+        :return: True if the journal contains the file with the same size and modification time
+        :rtype bool
+        """
+
+        entry = self.get(local_file.local_path)
+        if entry is None or entry.remote_path != local_file.remote_path:
+            return False
+        if entry.size != local_file.size or entry.modified_time != local_file.modified_time:
+            return False
+        if verify_checksum and (entry.checksum is None or entry.checksum != file_checksum(local_file.local_path)):
+            return False
+
+        return True
+
+    def record(self, local_file, checksum=None):
+        """
+        Records the given local file as uploaded.
+        :param local_file: the biostudiesclient.bulk_upload.LocalFile that has been uploaded
+        :param checksum: the MD5 checksum of the file, None if it is not known
+        """
+
+        with self.__lock:
+            self.__connection.execute(
+                'INSERT OR REPLACE INTO uploaded_files VALUES (?, ?, ?, ?, ?, ?)',
+                (os.path.abspath(local_file.local_path), local_file.remote_path, local_file.size,
+                 local_file.modified_time, checksum, time.time()))
+            self.__connection.commit()
+
+    def close(self):
+        with self.__lock:
+            self.__connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def file_checksum(file_path, chunk_size=CHECKSUM_CHUNK_SIZE):
+    """
+    Calculates the MD5 checksum of the given file, reading it in chunks.
+    :param file_path: the path of the local file
+    :return: the hexadecimal MD5 digest of the file content
+    :rtype str
+    """
+
+    md5 = hashlib.md5()
+    with open(file_path, 'rb') as a_file:
+        for chunk in iter(lambda: a_file.read(chunk_size), b''):
+            md5.update(chunk)
+
+    return md5.hexdigest()
@@ -0,0 +1,194 @@
+"""
+biostudiesclient.validation
+~~~~~~~~~~~~
+
+This module implements a local validation of the submissions,
+so an invalid submission can be rejected before it is sent to BioStudies REST API.
+
+:copyright: (c) 2021 by Karoly Erdos.
+:license: Apache2, see LICENSE for more details.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from http import HTTPStatus
+
+from biostudiesclient.concurrency import bounded_map, DEFAULT_MAX_WORKERS
+from biostudiesclient.exceptions import RestErrorException, SubmissionValidationException
+from biostudiesclient.submission_parser import _flatten
+
+REQUIRED_ATTRIBUTES = ('Title',)
+DEFAULT_LISTING_TTL = 60
+
+
+@dataclass
+class ValidationError:
+    """ A data class for a problem of a submission and its location, like 'section.files[2].path'. """
+
+    location: str
+    message: str
+
+    def __str__(self):
+        return f'{self.location}: {self.message}'
+
+
+class SubmissionValidator:
+    """
+    This class responsibility to check a submission before it is sent to the server.
+    The submission can be a BioStudy or a metadata dict, with the keys of BioStudies REST API
+    or the field names of the BioStudy data classes.
+
+    It checks that
+    - the submission has a section with a type
+    - the required attributes (by default the Title) are given for the submission or its section
+    - every attribute has a non-empty name and a string value
+    - every file has a path, every link has an URL, every sub section has a type
+    - the paths of the files are unique
+    - if an Api or a RemoteIndex is given, the referenced files exist in the user's folder
+
+    The folder listings used to check the files are cached for listing_ttl seconds,
+    the folders not in the cache are listed concurrently.
+    If a biostudiesclient.remote_index.RemoteIndex is given, the files are looked up in the index instead.
+    """
+
+    def __init__(self, api=None, remote_index=None, required_attributes=REQUIRED_ATTRIBUTES,
+                 listing_ttl=DEFAULT_LISTING_TTL, max_workers=DEFAULT_MAX_WORKERS):
+        self.api = api
+        self.remote_index = remote_index
+        self.required_attributes = required_attributes
+        self.listing_ttl = listing_ttl
+        self.max_workers = max_workers
+        self.__listings = {}
+        self.__lock = threading.Lock()
+
+    def validate(self, submission):
+        """
+        :param submission: a BioStudy or a metadata dict
+        :return: the problems of the submission, empty if it is valid
+        :rtype list
+        """
+
+        errors = []
+        self.__check_attributes(submission, 'attributes', errors)
+
+        section = _get(submission, 'section')
+        if section is None:
+            errors.append(ValidationError('section', 'The submission has no section.'))
+        else:
+            self.__check_section(section, errors)
+
+        defined_attributes = {_get(attribute, 'name') for parent in (submission, section or {})
+                              for attribute in _get(parent, 'attributes') or []}
+        for name in self.required_attributes:
+            if name not in defined_attributes:
+                errors.append(ValidationError('attributes', f'The {name} attribute is required.'))
+
+        return errors
+
+    def check(self, submission):
+        """
+        Validates the submission and raises an exception if it is invalid.
+        :param submission: a BioStudy or a metadata dict
+        :raise biostudiesclient.exceptions.SubmissionValidationException if the submission is invalid
+        """
+
+        errors = self.validate(submission)
+        if errors:
+            raise SubmissionValidationException(errors)
+
+    def clear_cache(self):
+        with self.__lock:
+            self.__listings.clear()
+
+    def __check_section(self, section, errors):
+        if not _get(section, 'type', 'section_type'):
+            errors.append(ValidationError('section.type', 'The section has no type.'))
+        self.__check_attributes(section, 'section.attributes', errors)
+
+        file_paths = {}
+        for index, a_file in enumerate(_flatten(_get(section, 'files'))):
+            location = f'section.files[{index}]'
+            path = _get(a_file, 'path')
+            if not isinstance(path, str) or not path.strip('/'):
+                errors.append(ValidationError(f'{location}.path', 'The file has no path.'))
+            elif path in file_paths:
+                errors.append(ValidationError(f'{location}.path', f'The file {path} is listed more than once.'))
+            else:
+                file_paths[path] = location
+            self.__check_attributes(a_file, f'{location}.attributes', errors)
+
+        for index, link in enumerate(_flatten(_get(section, 'links'))):
+            if not _get(link, 'url'):
+                errors.append(ValidationError(f'section.links[{index}].url', 'The link has no URL.'))
+            self.__check_attributes(link, f'section.links[{index}].attributes', errors)
+
+        for index, subsection in enumerate(_flatten(_get(section, 'subsections'))):
+            if not _get(subsection, 'type', 'sub_section_type'):
+                errors.append(ValidationError(f'section.subsections[{index}].type', 'The sub section has no type.'))
+            self.__check_attributes(subsection, f'section.subsections[{index}].attributes', errors)
+
+        if file_paths and (self.api is not None or self.remote_index is not None):
+            for path in self.__missing_files(file_paths):
+                errors.append(ValidationError(f'{file_paths[path]}.path', f'File not found: {path}.'))
+
+    @staticmethod
+    def __check_attributes(parent, location, errors):
+        for index, attribute in enumerate(_get(parent, 'attributes') or []):
+            name = _get(attribute, 'name')
+            value = _get(attribute, 'value')
+            if not isinstance(name, str) or not name.strip():
+                errors.append(ValidationError(f'{location}[{index}].name', 'The attribute has no name.'))
+            elif not isinstance(value, str):
+                errors.append(ValidationError(f'{location}[{index}].value',
+                                              f'The value of the {name} attribute is not a string.'))
+
+    def __missing_files(self, file_paths):
+        normalised_paths = {path: path.strip('/') for path in file_paths}
+        if self.remote_index is not None:
+            return [path for path, normalised_path in normalised_paths.items()
+                    if not self.remote_index.exists(normalised_path)]
+
+        folders = {normalised_path.rpartition('/')[0] for normalised_path in normalised_paths.values()}
+        listings = self.__get_listings(folders)
+
+        missing_files = []
+        for path, normalised_path in normalised_paths.items():
+            folder, _, name = normalised_path.rpartition('/')
+            if name not in listings.get(folder, ()):
+                missing_files.append(path)
+
+        return missing_files
+
+    def __get_listings(self, folders):
+        now = time.monotonic()
+        listings = {}
+        with self.__lock:
+            for folder in folders:
+                cached = self.__listings.get(folder)
+                if cached and now - cached[0] < self.listing_ttl:
+                    listings[folder] = cached[1]
+
+        folders_to_list = sorted(folder for folder in folders if folder not in listings)
+        for outcome in bounded_map(lambda folder: self.api.get_user_files(folder or None), folders_to_list,
+                                   self.max_workers):
+            if outcome.succeeded:
+                names = frozenset(entry.get('name') for entry in outcome.result.json or [])
+            elif isinstance(outcome.error, RestErrorException) and outcome.error.status_code == HTTPStatus.NOT_FOUND:
+                names = frozenset()
+            else:
+                raise outcome.error
+            listings[outcome.item] = names
+            with self.__lock:
+                self.__listings[outcome.item] = (now, names)
+
+        return listings
+
+
+def _get(obj, *names):
+    for name in names:
+        value = obj.get(name) if isinstance(obj, dict) else getattr(obj, name, None)
+        if value is not None:
+            return value
+
+    return None
@@ -19,6 +19,11 @@ setup(
     url="https://github.com/ebi-ait/biostudies-client",
     packages=find_packages(exclude=['tests', 'tests.*']),
     install_requires=install_requires,
+    extras_require={
+        'async': ['aiohttp'],
+        'fast': ['orjson'],
+        'stream': ['ijson'],
+    },
     include_package_data=True,
     classifiers=[
         "Development Status :: 3 - Alpha",
@@ -7,6 +7,7 @@ from mock import patch, MagicMock
 from biostudiesclient.api import Api
 from biostudiesclient.response_utils import TRY_IT_AGAIN_LATER_MESSAGE
 from biostudiesclient.exceptions import RestErrorException
+from biostudiesclient.session import PooledSession
 from tests.test_utils import TestUtils
 
 
@@ -18,9 +19,10 @@ class TestApi(unittest.TestCase):
         self.auth = MagicMock()
         self.auth.session_id = self.session_id
         self.auth.base_url = "http://example.com"
+        self.auth.session = PooledSession()
         self.api = Api(self.auth)
 
-    @patch('biostudiesclient.api.requests.post')
+    @patch('biostudiesclient.session.PooledSession.post')
     def test_when_request_wrong_url_then_returns_not_found_response(self, mock_post):
         url = 'http://example.com/wrong/path'
         folder_name = "test_folder"
@@ -44,7 +46,7 @@ class TestApi(unittest.TestCase):
         self.assertEqual(f'This URL {url} not exists. Please, try to correct the requested URL.',
                          context.exception.message)
 
-    @patch('biostudiesclient.api.requests.post')
+    @patch('biostudiesclient.session.PooledSession.post')
     def test_when_passing_folder_name_then_folder_created(self, mock_post):
         folder_name = "test_folder"
 
@@ -56,7 +58,7 @@ class TestApi(unittest.TestCase):
         self.assertEqual(response.status, HTTPStatus.OK)
         self.assertFalse(response.json)
 
-    @patch('biostudiesclient.api.requests.post')
+    @patch('biostudiesclient.session.PooledSession.post')
     def test_when_passing_folder_structure_then_folder_structure_created(self, mock_post):
         folder1 = str(uuid.uuid1())
         folder2 = str(uuid.uuid1())
@@ -70,7 +72,7 @@ class TestApi(unittest.TestCase):
         self.assertEqual(response.status, HTTPStatus.OK)
         self.assertFalse(response.json)
 
-    @patch('biostudiesclient.api.requests.post')
+    @patch('biostudiesclient.session.PooledSession.post')
     def test_when_passing_incorrect_session_id_then_response_with_error(self, mock_post):
         mock_post.return_value.status_code = HTTPStatus.INTERNAL_SERVER_ERROR
 
@@ -83,7 +85,36 @@ class TestApi(unittest.TestCase):
         self.assertEqual(HTTPStatus.INTERNAL_SERVER_ERROR, context.exception.status_code)
         self.assertEqual(TRY_IT_AGAIN_LATER_MESSAGE, context.exception.message)
 
-    @patch('biostudiesclient.api.requests.post')
+    @patch('biostudiesclient.session.PooledSession.get')
+    def test_when_session_expired_then_request_replayed_with_refreshed_session(self, mock_get):
+        expired_response = MagicMock(status_code=HTTPStatus.UNAUTHORIZED)
+        ok_response = MagicMock(status_code=HTTPStatus.OK)
+        ok_response.json.return_value = {"accno": "S-BSST1"}
+        ok_response.text = '{"accno": "S-BSST1"}'
+        mock_get.side_effect = [expired_response, ok_response]
+        self.auth.refresh_session.return_value = 'new.session.id'
+
+        response = self.api.get_submission('S-BSST1')
+
+        self.assertEqual({"accno": "S-BSST1"}, response.json)
+        self.auth.refresh_session.assert_called_once_with(self.session_id)
+        self.assertEqual('new.session.id', mock_get.call_args[1]['headers']['X-SESSION-TOKEN'])
+        expired_response.close.assert_called_once()
+
+    @patch('biostudiesclient.session.PooledSession.post')
+    def test_when_session_cannot_be_refreshed_then_unauthorized_error_raised(self, mock_post):
+        mock_post.return_value.status_code = HTTPStatus.UNAUTHORIZED
+        mock_post.return_value.json.return_value = {"log": {"message": "Authentication Required"}}
+        self.auth.can_refresh_session = False
+
+        with self.assertRaises(RestErrorException) as context:
+            self.api.create_submission({"attributes": []})
+
+        self.assertEqual(HTTPStatus.UNAUTHORIZED, context.exception.status_code)
+        self.assertEqual(1, mock_post.call_count)
+        self.auth.refresh_session.assert_not_called()
+
+    @patch('biostudiesclient.session.PooledSession.post')
     def test_when_upload_a_file_then_returns_ok_response(self, mock_post):
         mock_post.return_value.status_code = HTTPStatus.OK
         mock_post.return_value.json.return_value = {}
@@ -95,7 +126,7 @@ class TestApi(unittest.TestCase):
         self.assertEqual(response.status, HTTPStatus.OK)
         self.assertFalse(response.json)
 
-    @patch('biostudiesclient.api.requests.post')
+    @patch('biostudiesclient.session.PooledSession.post')
     def test_when_upload_a_file_to_an_existing_sub_folder_then_returns_ok_response(self, mock_post):
         mock_post.return_value.status_code = HTTPStatus.OK
         mock_post.return_value.json.return_value = {}
@@ -110,7 +141,7 @@ class TestApi(unittest.TestCase):
         self.assertEqual(file_upload_response.status, HTTPStatus.OK)
         self.assertFalse(file_upload_response.json)
 
-    @patch('biostudiesclient.api.requests.post')
+    @patch('biostudiesclient.session.PooledSession.post')
     def test_when_upload_a_file_with_wrong_header_then_returns_error_response(self, mock_post):
         expected_error_message = "Current request is not a multipart request"
         file_path = "tests/resources/test_file.txt"
@@ -129,7 +160,7 @@ class TestApi(unittest.TestCase):
         self.assertEqual(HTTPStatus.BAD_REQUEST, context.exception.status_code)
         self.assertEqual(expected_error_message, context.exception.message)
 
-    @patch('biostudiesclient.api.requests.get')
+    @patch('biostudiesclient.session.PooledSession.get')
     def test_when_request_user_files_then_returns_correct_response(self, mock_get):
         user_files_response = self.__get_user_files_response()
 
@@ -143,7 +174,7 @@ class TestApi(unittest.TestCase):
         self.assertEqual(len(response.json), 4)
         self.assertEqual(response.json, user_files_response)
 
-    @patch('biostudiesclient.api.requests.get')
+    @patch('biostudiesclient.session.PooledSession.get')
     def test_when_request_user_files_from_sub_folder_then_returns_correct_response(self, mock_get):
         user_files_response = self.__get_user_files_response()
         folder1 = str(uuid.uuid1())
@@ -160,7 +191,7 @@ class TestApi(unittest.TestCase):
         self.assertEqual(len(response.json), 4)
         self.assertEqual(response.json, user_files_response)
 
-    @patch('biostudiesclient.api.requests.delete')
+    @patch('biostudiesclient.session.PooledSession.delete')
     def test_when_delete_user_files_then_returns_correct_response(self, mock_delete):
         mock_delete.return_value.status_code = HTTPStatus.OK
         mock_delete.return_value.json.return_value = {}
@@ -176,7 +207,7 @@ class TestApi(unittest.TestCase):
     # when a file is not available for deletion then write a test against it
     # currently they return 200 OK, even if the file not exists
 
-    @patch('biostudiesclient.api.requests.post')
+    @patch('biostudiesclient.session.PooledSession.post')
     def test_when_post_a_submission_then_returns_correct_response(self, mock_post):
         submission_response = self.__get_submission_response_without_file()
         mock_post.return_value.status_code = HTTPStatus.OK
@@ -194,7 +225,22 @@ class TestApi(unittest.TestCase):
         self.assertTrue(response_json)
         self.assertEqual(response_json['accno'], submission_response['accno'])
 
-    @patch('biostudiesclient.api.requests.post')
+    @patch('biostudiesclient.session.PooledSession.post')
+    def test_when_post_a_serialized_submission_then_it_is_sent_as_it_is(self, mock_post):
+        submission_response = self.__get_submission_response_without_file()
+        mock_post.return_value.status_code = HTTPStatus.OK
+        mock_post.return_value.json.return_value = submission_response
+        mock_post.return_value.text = submission_response
+
+        payload = b'{"accno":"S-BSST1","attributes":[]}'
+
+        response = self.api.create_submission(payload)
+
+        self.assertEqual(response.json['accno'], submission_response['accno'])
+        self.assertEqual(payload, mock_post.call_args[1]['data'])
+        self.assertEqual('application/json', mock_post.call_args[1]['headers']['Content-Type'])
+
+    @patch('biostudiesclient.session.PooledSession.post')
     def test_when_post_a_submission_with_not_existing_file_then_returns_error_response(self, mock_post):
         expected_error_message = "Submission validation errors. File not found: raw_reads_1.xlsx."
 
@@ -0,0 +1,154 @@
+import asyncio
+import json
+import unittest
+from http import HTTPStatus
+
+from aiohttp.payload import BufferedReaderPayload
+from mock import MagicMock, AsyncMock, PropertyMock, patch
+
+from biostudiesclient.async_api import AsyncApi
+from biostudiesclient.async_auth import AsyncAuth
+from biostudiesclient.exceptions import RestErrorException
+from biostudiesclient.response_utils import TRY_IT_AGAIN_LATER_MESSAGE
+
+
+def mock_response(status, body=None, url='http://example.com'):
+    response = MagicMock()
+    response.status = status
+    response.url = url
+    response.text = AsyncMock(return_value='' if body is None else json.dumps(body))
+
+    context = MagicMock()
+    context.__aenter__ = AsyncMock(return_value=response)
+    context.__aexit__ = AsyncMock(return_value=False)
+
+    return context
+
+
+class TestAsyncApi(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.session_id = 'test.session.id'
+
+        self.auth = MagicMock()
+        self.auth.session_id = self.session_id
+        self.auth.base_url = "http://example.com"
+        self.api = AsyncApi(self.auth)
+
+    def test_when_request_user_files_then_returns_correct_response(self):
+        user_files_response = [{"name": "raw_reads_1.xlsx", "path": "user", "size": 19110, "type": "FILE"}]
+        self.auth.session.request.return_value = mock_response(HTTPStatus.OK, user_files_response)
+
+        response = asyncio.run(self.api.get_user_files('folder1'))
+
+        self.assertEqual(response.status, HTTPStatus.OK)
+        self.assertEqual(response.json, user_files_response)
+        method, url = self.auth.session.request.call_args[0]
+        self.assertEqual(('GET', 'http://example.com/files/user/folder1'), (method, url))
+        self.assertEqual(self.session_id, self.auth.session.request.call_args[1]['headers']['X-SESSION-TOKEN'])
+
+    def test_when_server_error_then_raises_try_it_again_later_exception(self):
+        self.auth.session.request.return_value = mock_response(HTTPStatus.INTERNAL_SERVER_ERROR)
+
+        with self.assertRaises(RestErrorException) as context:
+            asyncio.run(self.api.get_submission('S-BSST1'))
+
+        self.assertEqual(HTTPStatus.INTERNAL_SERVER_ERROR, context.exception.status_code)
+        self.assertEqual(TRY_IT_AGAIN_LATER_MESSAGE, context.exception.message)
+
+    def test_when_post_a_submission_then_submission_type_header_sent(self):
+        self.auth.session.request.return_value = mock_response(HTTPStatus.OK, {"accno": "S-BSST1"})
+
+        response = asyncio.run(self.api.create_submission({"attributes": []}))
+
+        self.assertEqual("S-BSST1", response.json["accno"])
+        headers = self.auth.session.request.call_args[1]['headers']
+        self.assertEqual('application/json', headers['Submission_Type'])
+        self.assertEqual(self.session_id, headers['X-SESSION-TOKEN'])
+
+    def test_when_session_expired_then_request_replayed_with_refreshed_session(self):
+        self.auth.session.request.side_effect = [mock_response(HTTPStatus.UNAUTHORIZED),
+                                                 mock_response(HTTPStatus.OK, {"accno": "S-BSST1"})]
+        self.auth.refresh_session = AsyncMock(return_value='new.session.id')
+
+        response = asyncio.run(self.api.get_submission('S-BSST1'))
+
+        self.assertEqual("S-BSST1", response.json["accno"])
+        self.auth.refresh_session.assert_awaited_once_with(self.session_id)
+        self.assertEqual('new.session.id', self.auth.session.request.call_args[1]['headers']['X-SESSION-TOKEN'])
+
+    def test_when_uploading_a_file_then_it_is_streamed_from_the_file_object(self):
+        payload_types = []
+
+        def request(*_args, **kwargs):
+            payload_types.extend(type(part) for part, _encoding, _te_encoding in kwargs['data']())
+            return mock_response(HTTPStatus.OK)
+
+        self.auth.session.request.side_effect = request
+
+        asyncio.run(self.api.upload_file('tests/resources/test_file.txt', 'folder1'))
+
+        self.assertEqual([BufferedReaderPayload], payload_types)
+        self.assertEqual('http://example.com/files/user/folder1', self.auth.session.request.call_args[0][1])
+
+    def test_when_many_requests_then_concurrency_is_limited(self):
+        api = AsyncApi(self.auth, max_concurrency=2)
+        in_flight = 0
+        max_in_flight = 0
+
+        async def slow_text():
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return '{}'
+
+        response = mock_response(HTTPStatus.OK)
+        response.__aenter__.return_value.text = slow_text
+        self.auth.session.request.return_value = response
+
+        async def run_requests():
+            return await asyncio.gather(*[api.get_submission(f'S-BSST{index}') for index in range(10)])
+
+        responses = asyncio.run(run_requests())
+
+        self.assertEqual(10, len(responses))
+        self.assertEqual(2, max_in_flight)
+
+
+class TestAsyncAuth(unittest.TestCase):
+
+    def test_given_correct_credentials_can_login(self):
+        auth = AsyncAuth('http://example.com')
+        session = MagicMock()
+        session.post.return_value = mock_response(HTTPStatus.OK, {"sessid": "valid.session.id"})
+
+        with patch.object(AsyncAuth, 'session', new_callable=PropertyMock, return_value=session):
+            response = asyncio.run(auth.login('username', 'password'))
+
+        self.assertEqual(HTTPStatus.OK, response.status)
+        self.assertEqual('valid.session.id', response.session_id)
+        self.assertEqual('valid.session.id', auth.session_id)
+        self.assertEqual({'login': 'username', 'password': 'password'}, session.post.call_args[1]['json'])
+
+    def test_when_many_coroutines_refresh_the_same_session_then_logs_in_once(self):
+        auth = AsyncAuth('http://example.com')
+        auth.username = 'username'
+        auth.password = 'password'
+        auth.session_id = 'expired.session.id'
+        session = MagicMock()
+        session.post.return_value = mock_response(HTTPStatus.OK, {"sessid": "valid.session.id"})
+
+        async def refresh_sessions():
+            return await asyncio.gather(*[auth.refresh_session('expired.session.id') for _ in range(8)])
+
+        with patch.object(AsyncAuth, 'session', new_callable=PropertyMock, return_value=session):
+            session_ids = asyncio.run(refresh_sessions())
+
+        self.assertEqual(['valid.session.id'] * 8, session_ids)
+        self.assertEqual(1, session.post.call_count)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,5 @@
+import threading
+import time
 import unittest
 from http import HTTPStatus
 
@@ -38,7 +40,7 @@ class TestAuth(unittest.TestCase):
             }
         }
 
-    @patch('biostudiesclient.auth.requests.post')
+    @patch('biostudiesclient.session.PooledSession.post')
     def test_given_correct_credentials_can_login(self, mock_post):
         mock_post.return_value.json.return_value = self.valid_auth_response
         mock_post.return_value.text = self.valid_auth_response
@@ -49,7 +51,7 @@ class TestAuth(unittest.TestCase):
         self.assertEqual(response.session_id, self.valid_sessid)
         self.assertEqual(response.status, HTTPStatus.OK)
 
-    @patch('biostudiesclient.auth.requests.post')
+    @patch('biostudiesclient.session.PooledSession.post')
     def test_given_incorrect_credentials_raise_exception(self, mock_post):
         mock_post.return_value.json.return_value = self.invalid_auth_response
         mock_post.return_value.text = self.invalid_auth_response
@@ -61,6 +63,37 @@ class TestAuth(unittest.TestCase):
         self.assertTrue(self.auth_error_message in context.exception.message)
         self.assertEqual(HTTPStatus.UNAUTHORIZED, context.exception.status_code)
 
+    @patch('biostudiesclient.session.PooledSession.post')
+    def test_when_many_threads_refresh_the_same_session_then_logs_in_once(self, mock_post):
+        def login(*_args, **_kwargs):
+            time.sleep(0.05)
+            return mock_post.return_value
+
+        mock_post.side_effect = login
+        mock_post.return_value.json.return_value = self.valid_auth_response
+        mock_post.return_value.text = self.valid_auth_response
+        mock_post.return_value.status_code = HTTPStatus.OK
+        self.auth.session_id = 'expired.session.id'
+        session_ids = []
+
+        threads = [threading.Thread(target=lambda: session_ids.append(self.auth.refresh_session('expired.session.id')))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(1, mock_post.call_count)
+        self.assertEqual([self.valid_sessid] * 8, session_ids)
+        self.assertEqual({'login': 'username', 'password': 'password'}, mock_post.call_args[1]['json'])
+
+    def test_when_auto_refresh_disabled_then_session_cannot_be_refreshed(self):
+        self.assertTrue(self.auth.can_refresh_session)
+
+        self.auth.auto_refresh = False
+
+        self.assertFalse(self.auth.can_refresh_session)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,53 @@
+import time
+import unittest
+from http import HTTPStatus
+
+from mock import MagicMock
+
+from biostudiesclient.bulk_fetch import SubmissionFetcher
+from biostudiesclient.exceptions import RestErrorException
+
+
+class TestSubmissionFetcher(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.api = MagicMock()
+        self.api.get_submission.side_effect = self.get_submission
+
+    @staticmethod
+    def get_submission(accession_id):
+        number = int(accession_id.split('-BSST')[1])
+        time.sleep((10 - number) * 0.002)
+        if number == 4:
+            raise RestErrorException(f'This URL {accession_id} not exists.', HTTPStatus.NOT_FOUND)
+        response = MagicMock()
+        response.json = {"accno": accession_id}
+        return response
+
+    @staticmethod
+    def accession_ids():
+        return [f'S-BSST{number}' for number in range(10)]
+
+    def test_when_ordered_then_results_are_in_input_order(self):
+        results = list(SubmissionFetcher(self.api, max_workers=4).fetch(self.accession_ids()))
+
+        self.assertEqual(self.accession_ids(), [result.accession_id for result in results])
+
+    def test_when_a_submission_fails_then_others_are_still_fetched(self):
+        results = list(SubmissionFetcher(self.api, max_workers=4).fetch(iter(self.accession_ids()), ordered=False))
+
+        self.assertEqual(10, len(results))
+        failed = [result for result in results if not result.succeeded]
+        self.assertEqual(['S-BSST4'], [result.accession_id for result in failed])
+        self.assertEqual(HTTPStatus.NOT_FOUND, failed[0].error.status_code)
+
+    def test_when_fetching_all_then_submissions_and_errors_are_collected(self):
+        batch = SubmissionFetcher(self.api).fetch_all(self.accession_ids())
+
+        self.assertEqual(9, len(batch.submissions))
+        self.assertEqual({"accno": "S-BSST7"}, batch.submissions['S-BSST7'])
+        self.assertEqual(['S-BSST4'], list(batch.errors))
+
+
+if __name__ == '__main__':
+    unittest.main()
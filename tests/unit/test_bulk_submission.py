@@ -0,0 +1,77 @@
+import json
+import threading
+import unittest
+from http import HTTPStatus
+
+from mock import MagicMock
+
+from biostudiesclient.bulk_submission import BulkSubmissionBuilder
+from biostudiesclient.exceptions import RestErrorException
+from biostudiesclient.models import BioStudy, BioStudiesAttribute
+
+
+def build_bio_study(row):
+    if not row['title']:
+        raise ValueError('The title is missing.')
+    return BioStudy(accno=row['accno'], attributes={BioStudiesAttribute('Title', row['title'])})
+
+
+class TestBulkSubmissionBuilder(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.api = MagicMock()
+        self.api.create_submission.side_effect = self.create_submission
+        self.builder = BulkSubmissionBuilder(self.api, build_bio_study, processes=2, post_workers=2, chunk_size=3)
+
+    @staticmethod
+    def create_submission(payload):
+        metadata = json.loads(payload)
+        if metadata['accno'] == 'S-REJECTED':
+            raise RestErrorException('Submission validation error', HTTPStatus.BAD_REQUEST)
+        response = MagicMock()
+        response.json = {'accno': metadata['accno']}
+        return response
+
+    @staticmethod
+    def rows(count):
+        return ({'accno': f'S-BSST{index}', 'title': f'Study {index}'} for index in range(count))
+
+    def test_when_building_payloads_then_serialized_submissions_returned_in_order(self):
+        built_payloads = list(self.builder.build_payloads(self.rows(10)))
+
+        self.assertEqual(list(range(10)), [built_payload.index for built_payload in built_payloads])
+        self.assertIsInstance(built_payloads[0].payload, bytes)
+        self.assertEqual({'accno': 'S-BSST4', 'attach_to': None, 'attributes': [{'name': 'Title', 'value': 'Study 4'}],
+                          'section': None}, json.loads(built_payloads[4].payload))
+
+    def test_when_submitting_then_payloads_posted_with_create_submission(self):
+        results = self.builder.submit_all(self.rows(10))
+
+        self.assertEqual(10, self.api.create_submission.call_count)
+        self.assertEqual([f'S-BSST{index}' for index in range(10)], [result.accession_id for result in results])
+        self.assertTrue(all(result.payload_size > 0 for result in results))
+
+    def test_when_a_row_fails_then_others_still_submitted(self):
+        rows = list(self.rows(3)) + [{'accno': 'S-NOTITLE', 'title': ''}, {'accno': 'S-REJECTED', 'title': 'x'}]
+
+        results = self.builder.submit_all(rows)
+
+        self.assertEqual([True, True, True, False, False], [result.succeeded for result in results])
+        self.assertIsInstance(results[3].error, ValueError)
+        self.assertEqual(HTTPStatus.BAD_REQUEST, results[4].error.status_code)
+        self.assertEqual(4, self.api.create_submission.call_count)
+
+    def test_when_a_chunk_fails_then_its_rows_get_the_error_and_other_chunks_built(self):
+        rows = list(self.rows(7))
+        rows[4]['title'] = threading.Lock()
+
+        built_payloads = list(self.builder.build_payloads(rows))
+
+        self.assertEqual(list(range(7)), [built_payload.index for built_payload in built_payloads])
+        self.assertEqual([False, False, False, True, True, True, False],
+                         [built_payload.error is not None for built_payload in built_payloads])
+        self.assertIsNotNone(built_payloads[6].payload)
+
+
+if __name__ == '__main__':
+    unittest.main()
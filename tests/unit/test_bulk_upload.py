@@ -0,0 +1,143 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from mock import MagicMock
+
+from biostudiesclient.bulk_upload import DirectoryUploader, UploadStatus
+from biostudiesclient.exceptions import RestErrorException
+
+
+class TestDirectoryUploader(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.local_directory = tempfile.mkdtemp()
+        for relative_path in ['top.txt', 'a/a1.txt', 'a/b/b1.txt', 'a/b/b2.txt', 'c/c1.txt']:
+            path = os.path.join(self.local_directory, relative_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w') as a_file:
+                a_file.write(relative_path)
+
+        self.api = MagicMock()
+        self.uploader = DirectoryUploader(self.api, max_workers=4)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.local_directory)
+
+    def test_when_uploading_a_directory_then_each_leaf_folder_created_once(self):
+        self.uploader.upload_directory(self.local_directory, 'dataset')
+
+        created_folders = sorted(call[0][0] for call in self.api.create_user_sub_folder.call_args_list)
+        self.assertEqual(['dataset/a/b', 'dataset/c'], created_folders)
+
+    def test_when_uploading_a_directory_then_all_files_uploaded_into_their_folders(self):
+        report = self.uploader.upload_directory(self.local_directory, 'dataset')
+
+        uploads = sorted((os.path.relpath(call[0][0], self.local_directory), call[0][1])
+                         for call in self.api.upload_file.call_args_list)
+        self.assertEqual([(os.path.join('a', 'a1.txt'), 'dataset/a'),
+                          (os.path.join('a', 'b', 'b1.txt'), 'dataset/a/b'),
+                          (os.path.join('a', 'b', 'b2.txt'), 'dataset/a/b'),
+                          (os.path.join('c', 'c1.txt'), 'dataset/c'),
+                          ('top.txt', 'dataset')], uploads)
+        self.assertTrue(report.succeeded)
+        self.assertEqual(5, len(report.uploaded))
+        self.assertIn('dataset/a/b/b1.txt', [result.remote_path for result in report.results])
+
+    def test_when_uploading_into_root_folder_then_top_level_files_have_no_folder(self):
+        self.uploader.upload_directory(self.local_directory)
+
+        upload_folders = {call[0][1] for call in self.api.upload_file.call_args_list}
+        self.assertIn(None, upload_folders)
+        self.assertNotIn('', upload_folders)
+
+    def test_when_a_file_upload_fails_then_the_others_are_still_uploaded(self):
+        def upload_file(file_path, folder_path=None):
+            if file_path.endswith('b1.txt'):
+                raise RestErrorException('upload failed', 500)
+
+        self.api.upload_file.side_effect = upload_file
+
+        report = self.uploader.upload_directory(self.local_directory)
+
+        self.assertFalse(report.succeeded)
+        self.assertEqual(4, len(report.uploaded))
+        self.assertEqual(['a/b/b1.txt'], [result.remote_path for result in report.failed])
+        self.assertIn('upload failed', report.failed[0].error)
+
+    def test_when_a_folder_cannot_be_created_then_its_files_are_failed_without_upload(self):
+        def create_user_sub_folder(folder_name):
+            if folder_name == 'c':
+                raise RestErrorException('folder failed', 500)
+
+        self.api.create_user_sub_folder.side_effect = create_user_sub_folder
+
+        report = self.uploader.upload_directory(self.local_directory)
+
+        self.assertEqual(['c/c1.txt'], [result.remote_path for result in report.failed])
+        self.assertEqual(UploadStatus.FAILED, report.failed[0].status)
+        self.assertEqual(4, self.api.upload_file.call_count)
+
+
+class TestDirectorySync(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.local_directory = os.path.join(self.directory, 'dataset')
+        for relative_path, content in [('same.txt', 'same'), ('changed.txt', 'changed'),
+                                       ('new.txt', 'new'), ('sub/same.txt', 'same')]:
+            path = os.path.join(self.local_directory, relative_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w') as a_file:
+                a_file.write(content)
+
+        self.remote_listings = {
+            'ds': [self.remote_file('same.txt', 4), self.remote_file('changed.txt', 1),
+                   self.remote_file('removed.txt', 10), {"name": "sub", "size": 4096, "type": "DIR"},
+                   {"name": "removed_folder", "size": 4096, "type": "DIR"}],
+            'ds/sub': [self.remote_file('same.txt', 4)]
+        }
+        self.api = MagicMock()
+        self.api.get_user_files.side_effect = self.get_user_files
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    @staticmethod
+    def remote_file(name, size):
+        return {"name": name, "size": size, "type": "FILE"}
+
+    def get_user_files(self, folder_path=None):
+        if folder_path not in self.remote_listings:
+            raise RestErrorException('not exists', 404)
+        response = MagicMock()
+        response.json = self.remote_listings[folder_path]
+        return response
+
+    def test_when_syncing_then_only_new_and_changed_files_uploaded(self):
+        report = DirectoryUploader(self.api).sync_directory(self.local_directory, 'ds')
+
+        self.assertEqual(['ds/changed.txt', 'ds/new.txt'], sorted(result.remote_path for result in report.uploaded))
+        self.assertEqual(['ds/same.txt', 'ds/sub/same.txt'],
+                         sorted(result.remote_path for result in report.skipped))
+        self.assertEqual(['ds', 'ds/sub'], sorted(call[0][0] for call in self.api.get_user_files.call_args_list))
+        self.api.delete_file.assert_not_called()
+
+    def test_when_syncing_with_delete_then_remote_only_entries_deleted(self):
+        report = DirectoryUploader(self.api).sync_directory(self.local_directory, 'ds', delete_remote=True)
+
+        self.assertEqual(['ds/removed.txt', 'ds/removed_folder'],
+                         sorted(result.remote_path for result in report.deleted))
+        self.assertEqual(2, self.api.delete_file.call_count)
+        self.assertEqual(UploadStatus.DELETED, report.deleted[0].status)
+
+    def test_when_syncing_a_new_tree_then_its_folders_are_created(self):
+        report = DirectoryUploader(self.api).sync_directory(self.local_directory, 'new_ds')
+
+        self.assertEqual(4, len(report.uploaded))
+        self.assertEqual(['new_ds/sub'], [call[0][0] for call in self.api.create_user_sub_folder.call_args_list])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,176 @@
+import shutil
+import tempfile
+import unittest
+from http import HTTPStatus
+
+from mock import patch, MagicMock
+
+from biostudiesclient.api import Api
+from biostudiesclient.cache import ResponseCache
+from biostudiesclient.session import PooledSession
+
+
+def mock_response(status_code, json=None, headers=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = headers if headers else {}
+    response.json.return_value = json
+    response.text = '' if json is None else str(json)
+    response.content = response.text.encode()
+    return response
+
+
+class TestResponseCache(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def test_when_more_entries_than_max_then_least_recently_used_evicted(self):
+        cache = ResponseCache(max_entries=2)
+        cache.put('first', 200, {})
+        cache.put('second', 200, {})
+        cache.get('first')
+
+        cache.put('third', 200, {})
+
+        self.assertIsNotNone(cache.get('first'))
+        self.assertIsNone(cache.get('second'))
+        self.assertEqual(2, len(cache))
+
+    def test_when_more_bytes_than_max_then_entries_evicted(self):
+        cache = ResponseCache(max_bytes=100)
+        cache.put('first', 200, {}, size=60)
+        cache.put('second', 200, {}, size=60)
+
+        self.assertIsNone(cache.get('first'))
+        self.assertEqual(60, cache.total_bytes)
+
+    def test_when_entry_older_than_ttl_then_it_is_stale(self):
+        cache = ResponseCache(ttl=0)
+        entry = cache.put('key', 200, {}, etag='"v1"')
+
+        self.assertFalse(entry.is_fresh(cache.ttl))
+        self.assertEqual({'If-None-Match': '"v1"'}, entry.conditional_headers())
+
+    def test_when_disk_tier_used_then_entries_survive_a_new_cache(self):
+        ResponseCache(disk_directory=self.directory).put('key', 200, {'accno': 'S-BSST1'}, etag='"v1"')
+
+        entry = ResponseCache(disk_directory=self.directory).get('key')
+
+        self.assertEqual({'accno': 'S-BSST1'}, entry.json)
+        self.assertEqual('"v1"', entry.etag)
+
+    def test_when_invalidated_then_entry_removed_from_both_tiers(self):
+        cache = ResponseCache(disk_directory=self.directory)
+        cache.put('key', 200, {})
+
+        cache.invalidate('key')
+
+        self.assertIsNone(cache.get('key'))
+        self.assertIsNone(ResponseCache(disk_directory=self.directory).get('key'))
+
+    def test_when_cleared_then_entries_only_on_disk_removed_too(self):
+        cache = ResponseCache(max_entries=1, disk_directory=self.directory)
+        cache.put('key1', 200, {})
+        cache.put('key2', 200, {})
+
+        cache.clear()
+
+        self.assertEqual(0, len(cache))
+        self.assertIsNone(cache.get('key1'))
+        self.assertIsNone(ResponseCache(disk_directory=self.directory).get('key2'))
+
+    def test_when_prefix_invalidated_then_matching_entries_removed_from_both_tiers(self):
+        cache = ResponseCache(max_entries=1, disk_directory=self.directory)
+        for key in ['folder1/a', 'folder1/b', 'folder10']:
+            cache.put(key, 200, {})
+
+        cache.invalidate_prefix('folder1/')
+
+        self.assertIsNone(cache.get('folder1/a'))
+        self.assertIsNone(cache.get('folder1/b'))
+        self.assertIsNotNone(cache.get('folder10'))
+
+
+class TestApiWithCache(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.auth = MagicMock()
+        self.auth.session_id = 'test.session.id'
+        self.auth.base_url = "http://example.com"
+        self.auth.session = PooledSession()
+        self.submission = {"accno": "S-BSST1", "attributes": []}
+
+    @patch('biostudiesclient.session.PooledSession.get')
+    def test_when_entry_is_fresh_then_no_request_sent(self, mock_get):
+        mock_get.return_value = mock_response(HTTPStatus.OK, self.submission)
+        api = Api(self.auth, cache=ResponseCache(ttl=60))
+
+        api.get_submission('S-BSST1')
+        response = api.get_submission('S-BSST1')
+
+        self.assertEqual(1, mock_get.call_count)
+        self.assertEqual(self.submission, response.json)
+
+    @patch('biostudiesclient.session.PooledSession.get')
+    def test_when_entry_is_stale_then_revalidated_with_conditional_request(self, mock_get):
+        mock_get.side_effect = [mock_response(HTTPStatus.OK, self.submission, {'ETag': '"v1"'}),
+                                mock_response(HTTPStatus.NOT_MODIFIED)]
+        api = Api(self.auth, cache=ResponseCache(ttl=0))
+
+        api.get_submission('S-BSST1')
+        response = api.get_submission('S-BSST1')
+
+        self.assertEqual('"v1"', mock_get.call_args[1]['headers']['If-None-Match'])
+        self.assertEqual(HTTPStatus.OK, response.status)
+        self.assertEqual(self.submission, response.json)
+
+    @patch('biostudiesclient.session.PooledSession.delete')
+    @patch('biostudiesclient.session.PooledSession.get')
+    def test_when_submission_deleted_then_its_entry_invalidated(self, mock_get, mock_delete):
+        mock_get.return_value = mock_response(HTTPStatus.OK, self.submission)
+        mock_delete.return_value = mock_response(HTTPStatus.OK)
+        api = Api(self.auth, cache=ResponseCache())
+
+        api.get_submission('S-BSST1')
+        api.delete_submission('S-BSST1')
+        api.get_submission('S-BSST1')
+
+        self.assertEqual(2, mock_get.call_count)
+
+    @patch('biostudiesclient.session.PooledSession.post')
+    @patch('biostudiesclient.session.PooledSession.get')
+    def test_when_file_uploaded_then_folder_listing_invalidated(self, mock_get, mock_post):
+        mock_get.return_value = mock_response(HTTPStatus.OK, [])
+        mock_post.return_value = mock_response(HTTPStatus.OK)
+        api = Api(self.auth, cache=ResponseCache())
+
+        api.get_user_files('folder1')
+        api.get_user_files()
+        api.upload_file("tests/resources/test_file.txt", 'folder1')
+        api.get_user_files('folder1')
+        api.get_user_files()
+
+        self.assertEqual(3, mock_get.call_count)
+
+    @patch('biostudiesclient.session.PooledSession.delete')
+    @patch('biostudiesclient.session.PooledSession.get')
+    def test_when_folder_deleted_then_listings_of_its_sub_folders_invalidated(self, mock_get, mock_delete):
+        mock_get.return_value = mock_response(HTTPStatus.OK, [])
+        mock_delete.return_value = mock_response(HTTPStatus.OK)
+        api = Api(self.auth, cache=ResponseCache())
+
+        api.get_user_files('folder1/folder2')
+        api.get_user_files('folder10')
+        api.delete_file('folder1')
+        api.get_user_files('folder1/folder2')
+        api.get_user_files('folder10')
+
+        self.assertEqual(3, mock_get.call_count)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import json
+import unittest
+
+from biostudiesclient import models, compact_models
+from biostudiesclient.models import EnhancedJSONEncoder
+from biostudiesclient.serializer import BioStudySerializer
+
+
+def create_bio_study(model_module):
+    section = model_module.BioStudySection(section_type='Study')
+    section.files.add(model_module.BioStudyFile('image.tiff', 'file',
+                                                {model_module.BioStudiesAttribute('Description', 'Raw image')}))
+    section.links.add(model_module.BioStudyLink('https://example.com'))
+
+    return model_module.BioStudy(accno='S-BSST1', attach_to='Test', section=section)
+
+
+class TestCompactModels(unittest.TestCase):
+
+    def test_when_created_then_it_has_no_instance_dict(self):
+        a_file = compact_models.BioStudyFile('image.tiff', 'file')
+
+        self.assertFalse(hasattr(a_file, '__dict__'))
+        with self.assertRaises(AttributeError):
+            a_file.type = 'file'
+
+    def test_when_compared_then_hash_and_equality_same_as_models(self):
+        compact_file = compact_models.BioStudyFile('image.tiff', 'file',
+                                                   {compact_models.BioStudiesAttribute('Description', 'Raw image')})
+        same_file = compact_models.BioStudyFile('image.tiff', 'file',
+                                                {compact_models.BioStudiesAttribute('Description', 'Raw image')})
+
+        self.assertEqual(compact_file, same_file)
+        self.assertEqual(hash(models.BioStudyFile('image.tiff', 'file')), hash(compact_file))
+        self.assertEqual(1, len({compact_file, same_file}))
+
+    def test_when_created_with_defaults_then_collections_are_not_shared(self):
+        first = compact_models.BioStudySection()
+        second = compact_models.BioStudySection()
+
+        first.files.add(compact_models.BioStudyFile('image.tiff'))
+
+        self.assertEqual(set(), second.files)
+
+    def test_when_serialized_then_document_same_as_models(self):
+        expected = json.dumps(create_bio_study(models), cls=EnhancedJSONEncoder)
+
+        self.assertEqual(expected, json.dumps(create_bio_study(compact_models), cls=EnhancedJSONEncoder))
+        for use_orjson in [False, True]:
+            document = BioStudySerializer(use_orjson=use_orjson).dumps(create_bio_study(compact_models))
+            self.assertEqual(json.loads(expected), json.loads(document))
+
+
+if __name__ == '__main__':
+    unittest.main()
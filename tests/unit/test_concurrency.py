@@ -0,0 +1,51 @@
+import threading
+import time
+import unittest
+
+from biostudiesclient.concurrency import bounded_map
+
+
+class TestBoundedMap(unittest.TestCase):
+
+    def test_when_ordered_then_results_are_in_input_order(self):
+        def slow_square(number):
+            time.sleep((10 - number) * 0.001)
+            return number * number
+
+        results = list(bounded_map(slow_square, range(10), max_workers=4))
+
+        self.assertEqual(list(range(10)), [result.item for result in results])
+        self.assertEqual([number * number for number in range(10)], [result.result for result in results])
+
+    def test_when_function_raises_then_error_returned_and_other_items_processed(self):
+        def fail_on_three(number):
+            if number == 3:
+                raise ValueError('three')
+            return number
+
+        results = list(bounded_map(fail_on_three, range(6), max_workers=2, ordered=False))
+
+        self.assertEqual(6, len(results))
+        failed = [result for result in results if not result.succeeded]
+        self.assertEqual([3], [result.item for result in failed])
+        self.assertIsInstance(failed[0].error, ValueError)
+
+    def test_when_items_are_a_generator_then_they_are_consumed_lazily(self):
+        consumed = []
+        lock = threading.Lock()
+
+        def items():
+            for number in range(1000):
+                with lock:
+                    consumed.append(number)
+                yield number
+
+        results = bounded_map(lambda number: number, items(), max_workers=2)
+        next(results)
+
+        self.assertLessEqual(len(consumed), 5)
+        results.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
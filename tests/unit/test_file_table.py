@@ -0,0 +1,97 @@
+import io
+import json
+import unittest
+
+from biostudiesclient.file_table import FileTable
+from biostudiesclient.models import BioStudyFile, BioStudiesAttribute, BioStudySection, EnhancedJSONEncoder
+from biostudiesclient.serializer import BioStudySerializer
+from tests.unit.test_serializer import normalise
+
+FILE_LIST = 'Files\tType\tDescription\tChannel\n' \
+            'plate_1/image_1.tiff\tfile\tRaw image\t1\n' \
+            'plate_1/image_2.tiff\t\tRaw image\t\n' \
+            'plate_1/image_1.tiff\tfile\tDuplicate\t2\n'
+
+
+class TestFileTable(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.file_table = FileTable.from_tsv(io.StringIO(FILE_LIST))
+
+    def test_when_built_from_tsv_then_columns_are_filled(self):
+        self.assertEqual(['plate_1/image_1.tiff', 'plate_1/image_2.tiff', 'plate_1/image_1.tiff'],
+                         self.file_table.paths)
+        self.assertEqual(['file', 'file', 'file'], self.file_table.file_types)
+        self.assertEqual({'Description': ['Raw image', 'Raw image', 'Duplicate'], 'Channel': ['1', None, '2']},
+                         self.file_table.attribute_columns)
+
+    def test_when_iterated_then_it_yields_bio_study_files(self):
+        expected_file = BioStudyFile('plate_1/image_2.tiff', 'file', {BioStudiesAttribute('Description', 'Raw image')})
+
+        self.assertIn(expected_file, list(self.file_table))
+        self.assertIn(expected_file, self.file_table)
+        self.assertIn('plate_1/image_2.tiff', self.file_table)
+        self.assertNotIn('plate_2/image_1.tiff', self.file_table)
+
+    def test_when_deduplicated_then_first_file_with_a_path_is_kept(self):
+        removed = self.file_table.deduplicate()
+
+        self.assertEqual(1, removed)
+        self.assertEqual(2, len(self.file_table))
+        self.assertEqual({BioStudiesAttribute('Description', 'Raw image'), BioStudiesAttribute('Channel', '1')},
+                         self.file_table.get('plate_1/image_1.tiff').attributes)
+
+    def test_when_deduplicated_keeping_last_then_last_file_with_a_path_is_kept(self):
+        self.file_table.deduplicate(keep_last=True)
+
+        self.assertEqual(['plate_1/image_2.tiff', 'plate_1/image_1.tiff'], self.file_table.paths)
+        self.assertEqual('Duplicate', self.file_table.attribute_columns['Description'][1])
+
+    def test_when_attribute_column_added_later_then_earlier_rows_have_no_value(self):
+        file_table = FileTable.from_rows([('a.txt', None, None), ('b.txt', 'file', {'Checksum': 'abc'})])
+        file_table.add(BioStudyFile('c.txt', 'file'))
+
+        self.assertEqual([None, 'abc', None], file_table.attribute_columns['Checksum'])
+
+    def test_when_file_with_the_same_path_added_then_it_is_not_added_again(self):
+        file_table = FileTable.from_rows([('a.txt', None, None)])
+
+        file_table.add(BioStudyFile('a.txt', 'file'))
+        file_table.add(BioStudyFile('a.txt', 'file', {BioStudiesAttribute('Description', 'Other')}))
+        file_table.add(BioStudyFile('b.txt', 'file'))
+        file_table.add(BioStudyFile('b.txt', 'file'))
+
+        self.assertEqual(['a.txt', 'b.txt'], file_table.paths)
+        self.assertEqual(2, len(file_table))
+        self.assertEqual(2, len(list(file_table)))
+
+    def test_when_set_operations_applied_then_results_are_file_tables(self):
+        first = FileTable.from_rows([('a.txt', None, None), ('b.txt', None, {'Checksum': 'abc'})])
+        second = {BioStudyFile('b.txt', 'file', {BioStudiesAttribute('Checksum', 'abc')}),
+                  BioStudyFile('c.txt', 'file')}
+
+        union = first | second
+        intersection = first & second
+        difference = first - second
+
+        self.assertIsInstance(union, FileTable)
+        self.assertEqual(['a.txt', 'b.txt', 'c.txt'], sorted(union.paths))
+        self.assertEqual(['b.txt'], intersection.paths)
+        self.assertEqual('abc', intersection.get('b.txt').attributes.pop().value)
+        self.assertEqual(['a.txt'], difference.paths)
+        self.assertEqual({BioStudyFile('a.txt', 'file')}, set(difference))
+
+    def test_when_serialized_then_document_same_as_set_of_bio_study_files(self):
+        self.file_table.deduplicate()
+        section = BioStudySection(section_type='Study', files=self.file_table)
+        expected_section = BioStudySection(section_type='Study', files=set(self.file_table))
+
+        expected = normalise(json.loads(json.dumps(expected_section, cls=EnhancedJSONEncoder)))
+        for use_orjson in [False, True]:
+            document = BioStudySerializer(use_orjson=use_orjson).dumps(section)
+            self.assertEqual(expected, normalise(json.loads(document)))
+        self.assertEqual(expected, normalise(json.loads(json.dumps(section, cls=EnhancedJSONEncoder))))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import threading
+import time
+import unittest
+from http import HTTPStatus
+
+from mock import MagicMock
+
+from biostudiesclient.exceptions import RestErrorException
+from biostudiesclient.folder_walker import FolderWalker, FILE_TYPE, FOLDER_TYPE
+
+REMOTE_TREE = {
+    '': [('top.txt', 10, FILE_TYPE), ('dataset', 4096, FOLDER_TYPE)],
+    'dataset': [('image_1.tiff', 1000, FILE_TYPE), ('plate', 4096, FOLDER_TYPE), ('broken', 4096, FOLDER_TYPE)],
+    'dataset/plate': [('image_2.tiff', 5000, FILE_TYPE), ('notes.txt', 20, FILE_TYPE)],
+}
+
+
+def get_user_files(folder_path=None, stream=False):
+    folder = folder_path or ''
+    if folder not in REMOTE_TREE:
+        raise RestErrorException(f'This URL {folder} not exists.', HTTPStatus.NOT_FOUND)
+    response = MagicMock()
+    response.json = iter([{"name": name, "path": f'user/{folder}', "size": size, "type": entry_type}
+                          for name, size, entry_type in REMOTE_TREE[folder]])
+    return response
+
+
+class TestFolderWalker(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.api = MagicMock()
+        self.api.get_user_files.side_effect = get_user_files
+        self.walker = FolderWalker(self.api, max_workers=4, queue_size=2)
+        self.errors = []
+
+    def walk(self, **kwargs):
+        return sorted(entry.path for entry in self.walker.walk(onerror=self.on_error, **kwargs))
+
+    def on_error(self, folder, error):
+        self.errors.append((folder, error.status_code))
+
+    def test_when_walking_recursively_then_all_entries_yielded(self):
+        self.assertEqual(['dataset', 'dataset/broken', 'dataset/image_1.tiff', 'dataset/plate',
+                          'dataset/plate/image_2.tiff', 'dataset/plate/notes.txt', 'top.txt'], self.walk())
+        self.assertEqual([('dataset/broken', HTTPStatus.NOT_FOUND)], self.errors)
+
+    def test_when_not_recursive_then_only_the_folder_listed(self):
+        self.assertEqual(['dataset/broken', 'dataset/image_1.tiff', 'dataset/plate'],
+                         self.walk(folder_path='dataset', recursive=False))
+        self.api.get_user_files.assert_called_once()
+
+    def test_when_filtered_then_only_matching_entries_yielded(self):
+        self.assertEqual(['dataset/image_1.tiff', 'dataset/plate/image_2.tiff'], self.walk(pattern='*.tiff'))
+        self.assertEqual(['dataset/plate/image_2.tiff'], self.walk(entry_type=FILE_TYPE, min_size=2000))
+        self.assertEqual(['plate/notes.txt'],
+                         [entry.path[len('dataset/'):] for entry in self.walker.walk(
+                             'dataset', pattern='plate/*', max_size=100, entry_type=FILE_TYPE,
+                             onerror=self.on_error)])
+
+    def test_when_listing_fails_without_onerror_then_error_raised(self):
+        with self.assertRaises(RestErrorException):
+            list(self.walker.walk('dataset'))
+
+    def test_when_consumer_stops_early_then_walk_is_stopped(self):
+        def get_many_folders(folder_path=None, stream=False):
+            response = MagicMock()
+            if folder_path is None:
+                response.json = iter([{"name": f'folder_{index}', "size": 4096, "type": FOLDER_TYPE}
+                                      for index in range(100)])
+            else:
+                time.sleep(0.02)
+                response.json = iter([])
+            return response
+
+        self.api.get_user_files.side_effect = get_many_folders
+        threads_before = threading.active_count()
+        entries = FolderWalker(self.api, max_workers=4).walk()
+        next(entries)
+
+        entries.close()
+        calls_after_close = self.api.get_user_files.call_count
+        time.sleep(0.2)
+
+        self.assertEqual(calls_after_close, self.api.get_user_files.call_count)
+        self.assertLess(calls_after_close, 20)
+        self.assertEqual(threads_before, threading.active_count())
+
+
+if __name__ == '__main__':
+    unittest.main()
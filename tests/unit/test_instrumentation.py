@@ -0,0 +1,127 @@
+import unittest
+from datetime import timedelta
+from http import HTTPStatus
+
+import requests
+from mock import patch, MagicMock
+
+from biostudiesclient.api import Api
+from biostudiesclient.exceptions import RestErrorException
+from biostudiesclient.instrumentation import Instrumentation, Histogram, ClientMetrics, RequestEvent
+from biostudiesclient.retry import RetryPolicy
+from biostudiesclient.session import PooledSession
+
+
+def mock_response(status_code, content=b'', elapsed=0.02, request_size=0):
+    response = MagicMock()
+    response.status_code = status_code
+    response.content = content
+    response.text = content.decode('utf-8')
+    response.json.side_effect = lambda: requests.models.complexjson.loads(content)
+    response.elapsed = timedelta(seconds=elapsed)
+    response.request.headers = {'Content-Length': str(request_size)}
+
+    return response
+
+
+def points(metrics, name):
+    return metrics.snapshot()[f'biostudiesclient_{name}']['points']
+
+
+class TestHistogram(unittest.TestCase):
+
+    def test_when_values_observed_then_counted_in_the_bucket_of_the_smallest_bound_not_less_than_them(self):
+        histogram = Histogram((0.1, 1.0))
+
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.observe(value)
+
+        self.assertEqual([2, 1, 1], histogram.bucket_counts)
+        self.assertEqual(4, histogram.count)
+        self.assertAlmostEqual(2.65, histogram.sum)
+
+
+class TestClientMetrics(unittest.TestCase):
+
+    def test_when_exported_to_prometheus_then_histograms_are_cumulative(self):
+        metrics = ClientMetrics(buckets=(0.1, 1.0))
+        metrics.record(RequestEvent('get_submission', 'GET', 'http://example.com', status_code=200,
+                                    bytes_received=10, ttfb_seconds=0.05, total_seconds=0.5))
+
+        text = metrics.to_prometheus()
+
+        self.assertIn('# TYPE biostudiesclient_request_duration_seconds histogram', text)
+        self.assertIn('biostudiesclient_request_duration_seconds_bucket{operation="get_submission",phase="total",'
+                      'le="0.1"} 0', text)
+        self.assertIn('biostudiesclient_request_duration_seconds_bucket{operation="get_submission",phase="total",'
+                      'le="+Inf"} 1', text)
+        self.assertIn('biostudiesclient_request_duration_seconds_count{operation="get_submission",phase="ttfb"} 1',
+                      text)
+        self.assertIn('biostudiesclient_requests_total{operation="get_submission",status="200"} 1', text)
+        self.assertIn('biostudiesclient_response_bytes_total{operation="get_submission"} 10', text)
+
+
+class TestApiInstrumentation(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.auth = MagicMock()
+        self.auth.session_id = 'test.session.id'
+        self.auth.base_url = "http://example.com"
+        self.auth.session = PooledSession()
+        self.instrumentation = Instrumentation()
+        self.api = Api(self.auth, retry_policy=RetryPolicy(backoff_factor=0), instrumentation=self.instrumentation)
+
+    @patch('biostudiesclient.session.PooledSession.get')
+    def test_when_request_succeeded_then_latencies_and_bytes_recorded(self, mock_get):
+        mock_get.return_value = mock_response(HTTPStatus.OK, b'{"accno": "S-BSST1"}', elapsed=0.02)
+        events = []
+        self.instrumentation.add_before_request_hook(lambda event: event.headers.update({'traceparent': 'trace-id'}))
+        self.instrumentation.add_after_request_hook(events.append)
+
+        self.api.get_submission('S-BSST1')
+
+        self.assertEqual('trace-id', mock_get.call_args[1]['headers']['traceparent'])
+        self.assertEqual(1, len(events))
+        self.assertEqual(('get_submission', 'GET', HTTPStatus.OK, 20, 0.02),
+                         (events[0].operation, events[0].method, events[0].status_code, events[0].bytes_received,
+                          events[0].ttfb_seconds))
+        self.assertEqual([{'labels': {'operation': 'get_submission', 'status': '200'}, 'value': 1}],
+                         points(self.instrumentation.metrics, 'requests_total'))
+        latencies = {point['labels']['phase']: point['count']
+                     for point in points(self.instrumentation.metrics, 'request_duration_seconds')}
+        self.assertEqual({'handle': 1, 'total': 1, 'ttfb': 1}, latencies)
+        self.assertEqual([], points(self.instrumentation.metrics, 'errors_total'))
+
+    @patch('biostudiesclient.session.PooledSession.post')
+    def test_when_request_retried_then_retries_and_request_bytes_recorded(self, mock_post):
+        mock_post.side_effect = [mock_response(HTTPStatus.SERVICE_UNAVAILABLE),
+                                 mock_response(HTTPStatus.OK, b'{}', request_size=100)]
+        self.api.retry_policy.retry_non_idempotent = True
+
+        self.api.create_submission({"attributes": []})
+
+        self.assertEqual([{'labels': {'operation': 'create_submission'}, 'value': 1}],
+                         points(self.instrumentation.metrics, 'retries_total'))
+        self.assertEqual([{'labels': {'operation': 'create_submission'}, 'value': 100}],
+                         points(self.instrumentation.metrics, 'request_bytes_total'))
+
+    @patch('biostudiesclient.session.PooledSession.delete')
+    def test_when_request_failed_then_error_classes_counted_once(self, mock_delete):
+        mock_delete.side_effect = [mock_response(HTTPStatus.INTERNAL_SERVER_ERROR),
+                                   requests.exceptions.InvalidURL('Invalid URL')]
+
+        with self.assertRaises(RestErrorException):
+            self.api.delete_submission('S-BSST1')
+        with self.assertRaises(requests.exceptions.InvalidURL):
+            self.api.delete_submission('S-BSST1')
+
+        self.assertEqual([{'labels': {'operation': 'delete_submission', 'error_class': 'InvalidURL'}, 'value': 1},
+                          {'labels': {'operation': 'delete_submission', 'error_class': 'http_500'}, 'value': 1}],
+                         points(self.instrumentation.metrics, 'errors_total'))
+        self.assertEqual([{'labels': {'operation': 'delete_submission', 'status': '500'}, 'value': 1},
+                          {'labels': {'operation': 'delete_submission', 'status': 'error'}, 'value': 1}],
+                         points(self.instrumentation.metrics, 'requests_total'))
+
+
+if __name__ == '__main__':
+    unittest.main()
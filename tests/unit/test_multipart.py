@@ -0,0 +1,103 @@
+import hashlib
+import os
+import tempfile
+import unittest
+from http import HTTPStatus
+
+from mock import patch, MagicMock
+
+from biostudiesclient.api import Api
+from biostudiesclient.multipart import MultipartFileEncoder
+from biostudiesclient.session import PooledSession
+
+
+class TestMultipartFileEncoder(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.file_content = os.urandom(10000)
+        a_file = tempfile.NamedTemporaryFile(suffix='.bin', delete=False)
+        a_file.write(self.file_content)
+        a_file.close()
+        self.file_path = a_file.name
+        self.file_name = os.path.basename(self.file_path)
+
+    def tearDown(self) -> None:
+        os.remove(self.file_path)
+
+    def test_when_reading_in_small_chunks_then_body_is_a_valid_multipart_body(self):
+        expected_body = b''.join([
+            b'--boundary\r\n',
+            f'Content-Disposition: form-data; name="files"; filename="{self.file_name}"\r\n\r\n'.encode(),
+            self.file_content,
+            b'\r\n--boundary--\r\n'
+        ])
+
+        with MultipartFileEncoder(self.file_path, chunk_size=333, boundary='boundary') as encoder:
+            body = b''.join(encoder)
+
+            self.assertEqual(expected_body, body)
+            self.assertEqual(len(expected_body), len(encoder))
+            self.assertEqual('multipart/form-data; boundary=boundary', encoder.content_type)
+
+    def test_when_reading_then_no_chunk_is_larger_than_the_requested_size(self):
+        with MultipartFileEncoder(self.file_path, chunk_size=4096) as encoder:
+            chunk_sizes = [len(chunk) for chunk in encoder]
+
+        self.assertTrue(all(size <= 4096 for size in chunk_sizes))
+        self.assertEqual(len(encoder), sum(chunk_sizes))
+
+    def test_when_checksum_computed_then_it_is_the_md5_of_the_file_after_the_whole_body_is_read(self):
+        progress_reports = []
+
+        with MultipartFileEncoder(self.file_path, chunk_size=4096, progress_callback=progress_reports.append,
+                                  compute_checksum=True) as encoder:
+            encoder.read(4096)
+            self.assertIsNone(encoder.checksum)
+            encoder.reset()
+            b''.join(encoder)
+
+        self.assertEqual(hashlib.md5(self.file_content).hexdigest(), encoder.checksum)
+        self.assertEqual(encoder.checksum, progress_reports[-1].checksum)
+        self.assertIsNone(progress_reports[0].checksum)
+
+    def test_when_progress_callback_given_then_reports_progress_per_chunk(self):
+        progress_reports = []
+
+        with MultipartFileEncoder(self.file_path, chunk_size=4096, progress_callback=progress_reports.append) \
+                as encoder:
+            while encoder.read(1024):
+                pass
+
+        bytes_sent = [progress.bytes_sent for progress in progress_reports]
+        self.assertEqual(sorted(bytes_sent), bytes_sent)
+        self.assertEqual(len(encoder) // 4096 + 1, len(progress_reports))
+        self.assertTrue(progress_reports[-1].done)
+        self.assertEqual(len(encoder), progress_reports[-1].total_bytes)
+
+    def test_when_reset_then_body_can_be_read_again(self):
+        with MultipartFileEncoder(self.file_path) as encoder:
+            first_body = b''.join(encoder)
+            encoder.reset()
+            second_body = b''.join(encoder)
+
+        self.assertEqual(first_body, second_body)
+
+    @patch('biostudiesclient.session.PooledSession.post')
+    def test_when_upload_a_file_then_body_is_streamed_with_multipart_content_type(self, mock_post):
+        mock_post.return_value.status_code = HTTPStatus.OK
+        mock_post.return_value.json.return_value = {}
+        auth = MagicMock()
+        auth.base_url = "http://example.com"
+        auth.session = PooledSession()
+
+        Api(auth).upload_file(self.file_path, 'folder1')
+
+        body = mock_post.call_args[1]['data']
+        headers = mock_post.call_args[1]['headers']
+        self.assertIsInstance(body, MultipartFileEncoder)
+        self.assertEqual(body.content_type, headers['Content-Type'])
+        self.assertEqual('http://example.com/files/user/folder1', mock_post.call_args[0][0])
+
+
+if __name__ == '__main__':
+    unittest.main()
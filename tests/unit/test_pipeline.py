@@ -0,0 +1,117 @@
+import threading
+import time
+import unittest
+from http import HTTPStatus
+
+from mock import MagicMock
+
+from biostudiesclient.exceptions import RestErrorException
+from biostudiesclient.pipeline import SubmissionPipeline, StudyJob, Stage
+
+
+class TestSubmissionPipeline(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.lock = threading.Lock()
+        self.events = []
+        self.api = MagicMock()
+        self.api.create_user_sub_folder.side_effect = lambda folder: self.record('folder', folder)
+        self.api.upload_file.side_effect = self.upload_file
+        self.api.create_submission.side_effect = self.create_submission
+
+    def record(self, event, name):
+        time.sleep(0.005)
+        with self.lock:
+            self.events.append((event, name))
+
+    def upload_file(self, file_path, folder_path=None):
+        if file_path == 'broken.txt':
+            raise RestErrorException('Upload failed', HTTPStatus.BAD_REQUEST)
+        self.record('upload', file_path)
+
+    def create_submission(self, metadata):
+        self.record('submit', metadata['accno'])
+        response = MagicMock()
+        response.json = {'accno': metadata['accno']}
+        return response
+
+    @staticmethod
+    def jobs(count, files_per_study=3):
+        for index in range(count):
+            yield StudyJob(f'study_{index}', {'accno': f'S-BSST{index}'},
+                           [f'study_{index}/file_{number}.txt' for number in range(files_per_study)],
+                           f'study_{index}')
+
+    def test_when_all_stages_succeed_then_every_study_submitted(self):
+        results = SubmissionPipeline(self.api, upload_workers=4).run_all(self.jobs(5))
+
+        self.assertEqual(5, len(results))
+        self.assertTrue(all(result.succeeded for result in results))
+        self.assertEqual({f'S-BSST{index}' for index in range(5)}, {result.accession_id for result in results})
+        self.assertEqual(3, len(results[0].uploaded_files))
+        self.assertIn(Stage.UPLOAD, results[0].stage_seconds)
+
+    def test_when_studies_run_then_their_stages_overlap(self):
+        SubmissionPipeline(self.api, upload_workers=4).run_all(self.jobs(6))
+
+        first_submit = self.events.index(next(event for event in self.events if event[0] == 'submit'))
+        self.assertTrue(any(event[0] == 'upload' for event in self.events[first_submit:]))
+
+    def test_when_an_upload_fails_then_study_not_submitted(self):
+        job = StudyJob('broken', {'accno': 'S-BROKEN'}, ['ok.txt', 'broken.txt'], 'broken')
+
+        results = SubmissionPipeline(self.api).run_all([job] + list(self.jobs(2)))
+
+        failed = [result for result in results if not result.succeeded]
+        self.assertEqual(1, len(failed))
+        self.assertEqual(Stage.UPLOAD, failed[0].failed_stage)
+        self.assertEqual(['ok.txt'], failed[0].uploaded_files)
+        self.assertEqual(['broken.txt'], list(failed[0].upload_errors))
+        self.assertNotIn(('submit', 'S-BROKEN'), self.events)
+
+    def test_when_folder_creation_fails_then_files_not_uploaded(self):
+        self.api.create_user_sub_folder.side_effect = RestErrorException('Forbidden', HTTPStatus.FORBIDDEN)
+
+        results = SubmissionPipeline(self.api).run_all(self.jobs(2))
+
+        self.assertEqual([Stage.CREATE_FOLDER, Stage.CREATE_FOLDER], [result.failed_stage for result in results])
+        self.api.upload_file.assert_not_called()
+
+    def test_when_many_studies_then_studies_in_flight_are_bounded(self):
+        taken = []
+
+        def jobs():
+            for job in self.jobs(20, files_per_study=1):
+                taken.append(job.name)
+                yield job
+
+        pipeline = SubmissionPipeline(self.api, folder_workers=1, upload_workers=1, submit_workers=1,
+                                      max_studies_in_flight=2)
+        results = pipeline.run(jobs())
+        next(results)
+
+        self.assertLessEqual(len(taken), 4)
+        results.close()
+
+    def test_when_consumer_stops_early_then_no_more_requests_sent(self):
+        def slow_upload(file_path, folder_path=None):
+            time.sleep(0.01)
+            self.record('upload', file_path)
+
+        self.api.upload_file.side_effect = slow_upload
+        threads_before = threading.active_count()
+        results = SubmissionPipeline(self.api, upload_workers=2).run(self.jobs(10, files_per_study=5))
+        next(results)
+
+        results.close()
+        calls_after_close = len(self.api.method_calls)
+        time.sleep(0.1)
+
+        self.assertEqual(calls_after_close, len(self.api.method_calls))
+        self.assertLess(self.api.create_submission.call_count, 10)
+        # only the daemon thread taking the studies from the input may still be alive, until it notices the stop
+        self.assertLessEqual(threading.active_count(), threads_before + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
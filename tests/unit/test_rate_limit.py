@@ -0,0 +1,186 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from http import HTTPStatus
+
+from mock import patch, MagicMock
+
+from biostudiesclient.api import Api
+from biostudiesclient.rate_limit import TokenBucket, FileTokenBucket, AdaptiveConcurrencyLimiter
+from biostudiesclient.session import PooledSession
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def test_when_bucket_is_full_then_burst_up_to_capacity_allowed(self):
+        bucket = TokenBucket(rate=1, capacity=3)
+
+        self.assertEqual([True, True, True, False], [bucket.try_acquire() for _ in range(4)])
+
+    def test_when_bucket_is_empty_then_acquire_waits_for_refill(self):
+        bucket = TokenBucket(rate=50, capacity=1)
+        bucket.acquire()
+
+        start_time = time.monotonic()
+        self.assertTrue(bucket.acquire())
+
+        self.assertGreaterEqual(time.monotonic() - start_time, 0.015)
+
+    def test_when_timeout_is_shorter_than_refill_then_acquire_fails(self):
+        bucket = TokenBucket(rate=0.1, capacity=1)
+        bucket.acquire()
+
+        self.assertFalse(bucket.acquire(timeout=0.01))
+
+    def test_when_shared_by_threads_then_rate_is_respected(self):
+        bucket = TokenBucket(rate=100, capacity=1)
+        threads = [threading.Thread(target=lambda: [bucket.acquire() for _ in range(5)]) for _ in range(4)]
+
+        start_time = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertGreaterEqual(time.monotonic() - start_time, 19 / 100)
+
+    def test_when_tokens_exceed_capacity_then_acquire_raises(self):
+        bucket = TokenBucket(rate=10, capacity=2)
+
+        with self.assertRaises(ValueError):
+            bucket.acquire(3)
+        with self.assertRaises(ValueError):
+            bucket.try_acquire(3)
+
+
+class TestFileTokenBucket(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.state_file_path = os.path.join(self.directory, 'bucket.json')
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def test_when_buckets_share_a_state_file_then_they_share_the_tokens(self):
+        first_bucket = FileTokenBucket(self.state_file_path, rate=0.1, capacity=2)
+        second_bucket = FileTokenBucket(self.state_file_path, rate=0.1, capacity=2)
+
+        self.assertTrue(first_bucket.try_acquire())
+        self.assertTrue(second_bucket.try_acquire())
+        self.assertFalse(first_bucket.try_acquire())
+        self.assertFalse(second_bucket.try_acquire())
+
+    def test_when_tokens_exceed_capacity_then_acquire_raises(self):
+        bucket = FileTokenBucket(self.state_file_path, rate=10, capacity=2)
+
+        with self.assertRaises(ValueError):
+            bucket.acquire(3)
+        with self.assertRaises(ValueError):
+            bucket.try_acquire(3)
+        self.assertFalse(os.path.exists(self.state_file_path))
+
+
+class TestAdaptiveConcurrencyLimiter(unittest.TestCase):
+
+    def test_when_server_overloaded_then_limit_decreased_once_per_cooldown(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=16, cooldown=60)
+
+        for _ in range(5):
+            limiter.release(limiter.acquire(), HTTPStatus.SERVICE_UNAVAILABLE)
+
+        self.assertEqual(8, limiter.limit)
+
+    def test_when_requests_are_healthy_then_limit_increased_up_to_max(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=4)
+
+        for _ in range(100):
+            limiter.release(limiter.acquire(), HTTPStatus.OK)
+
+        self.assertEqual(4, limiter.limit)
+
+    def test_when_request_failed_with_exception_then_limit_decreased(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=4, min_limit=3)
+
+        limiter.release(limiter.acquire(), None)
+
+        self.assertEqual(3, limiter.limit)
+
+    def test_when_latency_above_threshold_then_limit_decreased(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=10, latency_threshold=0.5)
+
+        limiter.release(time.monotonic() - 1, HTTPStatus.OK)
+
+        self.assertEqual(5, limiter.limit)
+
+    def test_when_slow_uploads_mixed_with_fast_queries_then_limit_not_decreased(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=8, max_limit=8, latency_warmup=5)
+
+        for _ in range(20):
+            limiter.release(limiter.acquire() - 0.01, HTTPStatus.OK, 'get_submission')
+            limiter.release(limiter.acquire() - 5, HTTPStatus.OK, 'delete_submission')
+            limiter.release(limiter.acquire() - 30, HTTPStatus.OK, 'upload_file', latency_sensitive=False)
+
+        self.assertEqual(8, limiter.limit)
+        self.assertNotIn('upload_file', limiter.baseline_latencies)
+
+    def test_when_operation_slower_than_its_own_baseline_then_limit_decreased(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=8, max_limit=8, latency_warmup=5)
+        for _ in range(10):
+            limiter.release(limiter.acquire() - 0.01, HTTPStatus.OK, 'get_submission')
+            limiter.release(limiter.acquire() - 5, HTTPStatus.OK, 'delete_submission')
+
+        limiter.release(limiter.acquire() - 1, HTTPStatus.OK, 'get_submission')
+
+        self.assertEqual(4, limiter.limit)
+
+    def test_when_limit_reached_then_acquire_waits_for_release(self):
+        limiter = AdaptiveConcurrencyLimiter(initial_limit=1)
+        start_time = limiter.acquire()
+        acquired = threading.Event()
+
+        thread = threading.Thread(target=lambda: (limiter.acquire(), acquired.set()))
+        thread.start()
+
+        self.assertFalse(acquired.wait(0.05))
+        limiter.release(start_time, HTTPStatus.OK)
+        self.assertTrue(acquired.wait(1))
+        thread.join()
+
+    @patch('biostudiesclient.session.PooledSession.get')
+    def test_when_api_has_limiters_then_every_request_uses_them(self, mock_get):
+        mock_get.return_value.status_code = HTTPStatus.OK
+        mock_get.return_value.text = ''
+        auth = MagicMock()
+        auth.base_url = "http://example.com"
+        auth.session = PooledSession()
+        rate_limiter = MagicMock()
+        concurrency_limiter = MagicMock()
+        concurrency_limiter.acquire.return_value = 42.0
+
+        Api(auth, rate_limiter=rate_limiter, concurrency_limiter=concurrency_limiter).get_user_files()
+
+        rate_limiter.acquire.assert_called_once_with()
+        concurrency_limiter.release.assert_called_once_with(42.0, HTTPStatus.OK, 'get_user_files', True)
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+    @patch('biostudiesclient.session.PooledSession.post')
+    def test_when_api_uploads_a_file_then_its_latency_is_not_checked(self, mock_post):
+        mock_post.return_value.status_code = HTTPStatus.OK
+        mock_post.return_value.text = ''
+        auth = MagicMock()
+        auth.base_url = "http://example.com"
+        auth.session = PooledSession()
+        concurrency_limiter = MagicMock()
+        concurrency_limiter.acquire.return_value = 42.0
+
+        with tempfile.NamedTemporaryFile() as a_file:
+            Api(auth, concurrency_limiter=concurrency_limiter).upload_file(a_file.name)
+
+        concurrency_limiter.release.assert_called_once_with(42.0, HTTPStatus.OK, 'upload_file', False)
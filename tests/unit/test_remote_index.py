@@ -0,0 +1,142 @@
+import os
+import shutil
+import tempfile
+import unittest
+from http import HTTPStatus
+
+from mock import patch, MagicMock
+
+from biostudiesclient.api import Api
+from biostudiesclient.exceptions import RestErrorException
+from biostudiesclient.folder_walker import FILE_TYPE, FOLDER_TYPE
+from biostudiesclient.remote_index import RemoteIndex
+from biostudiesclient.session import PooledSession
+
+
+class TestRemoteIndex(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.index = RemoteIndex(os.path.join(self.directory, 'index.sqlite'))
+        self.remote_tree = {
+            '': [('top.txt', 10, FILE_TYPE), ('dataset', 4096, FOLDER_TYPE)],
+            'dataset': [('image_1.tiff', 1000, FILE_TYPE), ('plate', 4096, FOLDER_TYPE)],
+            'dataset/plate': [('image_2.tiff', 5000, FILE_TYPE)],
+        }
+        self.api = MagicMock()
+        self.api.get_user_files.side_effect = self.get_user_files
+
+    def tearDown(self) -> None:
+        self.index.close()
+        shutil.rmtree(self.directory)
+
+    def get_user_files(self, folder_path=None):
+        folder = folder_path or ''
+        if folder not in self.remote_tree:
+            raise RestErrorException(f'This URL {folder} not exists.', HTTPStatus.NOT_FOUND)
+        response = MagicMock()
+        response.json = [{"name": name, "size": size, "type": entry_type}
+                         for name, size, entry_type in self.remote_tree[folder]]
+        return response
+
+    def test_when_refreshed_then_whole_tree_indexed(self):
+        listed_folders = self.index.refresh(self.api)
+
+        self.assertEqual(3, listed_folders)
+        self.assertEqual(5000, self.index.get('dataset/plate/image_2.tiff').size)
+        self.assertTrue(self.index.get('/dataset/plate/').is_folder)
+        self.assertEqual(['image_1.tiff', 'plate'], [entry.name for entry in self.index.list_folder('dataset')])
+        self.assertFalse(self.index.exists('dataset/missing.txt'))
+
+    def test_when_index_reopened_then_entries_persisted(self):
+        self.index.refresh(self.api)
+        self.index.close()
+
+        self.index = RemoteIndex(os.path.join(self.directory, 'index.sqlite'))
+
+        self.assertTrue(self.index.exists('top.txt'))
+
+    def test_when_refreshed_again_then_removed_entries_deleted(self):
+        self.index.refresh(self.api)
+        self.remote_tree[''] = [('top.txt', 20, FILE_TYPE)]
+        del self.remote_tree['dataset']
+
+        self.index.refresh(self.api)
+
+        self.assertEqual(20, self.index.get('top.txt').size)
+        self.assertFalse(self.index.exists('dataset/plate/image_2.tiff'))
+
+    def test_when_folder_removed_then_folders_with_the_same_prefix_kept(self):
+        for folder in ['data', 'data/sub', 'data-1', 'data0', 'database']:
+            self.index.add_file(folder, 'file.txt', 1)
+
+        self.index.remove('data')
+
+        self.assertEqual(['data-1', 'data0', 'database'],
+                         [entry.path for entry in self.index.list_folder() if entry.is_folder])
+        self.assertFalse(self.index.exists('data/sub/file.txt'))
+        self.assertIsNone(self.index.listed_at('dataset/plate'))
+
+    def test_when_refreshed_with_max_age_then_fresh_folders_not_listed(self):
+        self.index.refresh(self.api)
+
+        self.assertEqual(0, self.index.refresh(self.api, max_age=60))
+        self.assertEqual(3, self.api.get_user_files.call_count)
+
+    def test_when_folder_cannot_be_listed_then_error_raised(self):
+        self.api.get_user_files.side_effect = RestErrorException('Server error', HTTPStatus.INTERNAL_SERVER_ERROR)
+
+        with self.assertRaises(RestErrorException):
+            self.index.refresh(self.api)
+
+    def test_when_file_added_then_its_folders_added_too(self):
+        self.index.add_file('folder1/folder2', 'file.txt', 42)
+
+        self.assertEqual(42, self.index.get('folder1/folder2/file.txt').size)
+        self.assertTrue(self.index.get('folder1').is_folder)
+
+    def test_when_folder_removed_then_its_content_removed(self):
+        self.index.refresh(self.api)
+
+        self.index.remove('dataset')
+
+        self.assertEqual(['top.txt'], [entry.path for entry in self.index.list_folder()])
+        self.assertFalse(self.index.exists('dataset/plate/image_2.tiff'))
+
+
+class TestApiWithRemoteIndex(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.index = RemoteIndex(os.path.join(self.directory, 'index.sqlite'))
+        self.auth = MagicMock()
+        self.auth.session_id = 'test.session.id'
+        self.auth.base_url = "http://example.com"
+        self.auth.session = PooledSession()
+        self.api = Api(self.auth, remote_index=self.index)
+
+    def tearDown(self) -> None:
+        self.index.close()
+        shutil.rmtree(self.directory)
+
+    @patch('biostudiesclient.session.PooledSession.delete')
+    @patch('biostudiesclient.session.PooledSession.post')
+    def test_when_files_modified_through_api_then_index_updated(self, mock_post, mock_delete):
+        for mock_request in [mock_post, mock_delete]:
+            mock_request.return_value.status_code = HTTPStatus.OK
+            mock_request.return_value.text = ''
+
+        self.api.create_user_sub_folder('folder1/folder2')
+        self.api.upload_file('tests/resources/test_file.txt', 'folder1')
+
+        self.assertTrue(self.index.get('folder1/folder2').is_folder)
+        self.assertEqual(os.path.getsize('tests/resources/test_file.txt'),
+                         self.index.get('folder1/test_file.txt').size)
+
+        self.api.delete_file('folder1/test_file.txt')
+
+        self.assertFalse(self.index.exists('folder1/test_file.txt'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,7 +7,7 @@ from assertpy import assert_that
 from requests import Response
 
 from biostudiesclient.exceptions import RestErrorException
-from biostudiesclient.response_utils import ResponseUtils
+from biostudiesclient.response_utils import ResponseUtils, TRY_IT_AGAIN_LATER_MESSAGE
 
 
 class TestResponseUtils(unittest.TestCase):
@@ -61,6 +61,17 @@ class TestResponseUtils(unittest.TestCase):
             .starts_with("('A detailed") \
             .is_equal_to("('A detailed error message', <HTTPStatus.BAD_REQUEST: 400>)")
 
+    def test_when_processing_gateway_error_page_returns_try_it_again_later_message(self):
+        input_response = Mock(spec=Response)
+        input_response.status_code = HTTPStatus.BAD_GATEWAY
+        input_response.text = '<html><body><h1>502 Bad Gateway</h1></body></html>'
+        input_response.json.side_effect = ValueError('Expecting value')
+
+        assert_that(self.response_utils.handle_response)\
+            .raises(RestErrorException)\
+            .when_called_with(input_response)\
+            .is_equal_to(f"('{TRY_IT_AGAIN_LATER_MESSAGE}', <HTTPStatus.BAD_GATEWAY: 502>)")
+
     def correct_response_text_with_session_id(self):
         return {
             "sessid": self.valid_session_id,
@@ -0,0 +1,132 @@
+import unittest
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from http import HTTPStatus
+
+import requests
+from mock import patch, MagicMock
+
+from biostudiesclient.api import Api
+from biostudiesclient.exceptions import RestErrorException
+from biostudiesclient.retry import RetryPolicy, parse_retry_after
+from biostudiesclient.session import PooledSession
+
+
+def mock_response(status_code, headers=None, json=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.headers = headers if headers else {}
+    response.json.return_value = json if json is not None else {}
+    response.text = '' if json is None else str(json)
+    return response
+
+
+@patch('biostudiesclient.retry.time.sleep')
+class TestRetryPolicy(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.auth = MagicMock()
+        self.auth.session_id = 'test.session.id'
+        self.auth.base_url = "http://example.com"
+        self.auth.session = PooledSession()
+
+    @patch('biostudiesclient.session.PooledSession.get')
+    def test_when_get_fails_with_service_unavailable_then_it_is_retried(self, mock_get, mock_sleep):
+        mock_get.side_effect = [mock_response(HTTPStatus.SERVICE_UNAVAILABLE),
+                                mock_response(HTTPStatus.OK, json={"accno": "S-BSST1"})]
+
+        response = Api(self.auth).get_submission('S-BSST1')
+
+        self.assertEqual(HTTPStatus.OK, response.status)
+        self.assertEqual(2, mock_get.call_count)
+        self.assertEqual(1, mock_sleep.call_count)
+
+    @patch('biostudiesclient.session.PooledSession.get')
+    def test_when_all_attempts_fail_then_last_error_raised(self, mock_get, mock_sleep):
+        mock_get.return_value = mock_response(HTTPStatus.BAD_GATEWAY)
+
+        with self.assertRaises(RestErrorException) as context:
+            Api(self.auth, retry_policy=RetryPolicy(max_attempts=4)).get_user_files()
+
+        self.assertEqual(HTTPStatus.BAD_GATEWAY, context.exception.status_code)
+        self.assertEqual(4, mock_get.call_count)
+        self.assertEqual(3, mock_sleep.call_count)
+
+    @patch('biostudiesclient.session.PooledSession.post')
+    def test_when_post_fails_then_it_is_not_retried_by_default(self, mock_post, mock_sleep):
+        mock_post.return_value = mock_response(HTTPStatus.SERVICE_UNAVAILABLE)
+
+        with self.assertRaises(RestErrorException):
+            Api(self.auth).create_submission({})
+
+        self.assertEqual(1, mock_post.call_count)
+        mock_sleep.assert_not_called()
+
+    @patch('biostudiesclient.session.PooledSession.post')
+    def test_when_post_retry_enabled_then_upload_is_retried_with_rewound_body(self, mock_post, mock_sleep):
+        bodies = []
+
+        def post(url, **kwargs):
+            bodies.append(b''.join(kwargs['data']))
+            if len(bodies) == 1:
+                return mock_response(HTTPStatus.GATEWAY_TIMEOUT)
+            return mock_response(HTTPStatus.OK)
+
+        mock_post.side_effect = post
+
+        Api(self.auth, retry_policy=RetryPolicy(retry_non_idempotent=True)).upload_file(
+            "tests/resources/test_file.txt")
+
+        self.assertEqual(2, len(bodies))
+        self.assertEqual(bodies[0], bodies[1])
+
+    @patch('biostudiesclient.session.PooledSession.get')
+    def test_when_retry_after_header_sent_then_requested_delay_used(self, mock_get, mock_sleep):
+        mock_get.side_effect = [mock_response(HTTPStatus.TOO_MANY_REQUESTS, headers={'Retry-After': '7'}),
+                                mock_response(HTTPStatus.OK)]
+
+        Api(self.auth).get_user_files()
+
+        mock_sleep.assert_called_once_with(7.0)
+
+    @patch('biostudiesclient.session.PooledSession.delete')
+    def test_when_connection_error_then_it_is_retried(self, mock_delete, mock_sleep):
+        mock_delete.side_effect = [requests.exceptions.ConnectionError('connection reset'),
+                                   mock_response(HTTPStatus.OK)]
+
+        response = Api(self.auth).delete_submission('S-BSST1')
+
+        self.assertEqual(HTTPStatus.OK, response.status)
+        self.assertEqual(2, mock_delete.call_count)
+
+    @patch('biostudiesclient.session.PooledSession.delete')
+    def test_when_connection_error_persists_then_it_is_raised(self, mock_delete, mock_sleep):
+        mock_delete.side_effect = requests.exceptions.ConnectionError('connection refused')
+
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            Api(self.auth, retry_policy=RetryPolicy(max_attempts=2)).delete_file('test_file.txt')
+
+        self.assertEqual(2, mock_delete.call_count)
+
+    def test_when_no_jitter_then_backoff_is_exponential_and_capped(self, mock_sleep):
+        policy = RetryPolicy(backoff_factor=1, max_backoff=5, jitter=False)
+
+        self.assertEqual([1, 2, 4, 5, 5], [policy.backoff(attempt) for attempt in range(1, 6)])
+
+    def test_when_jitter_then_backoff_is_not_larger_than_exponential_delay(self, mock_sleep):
+        policy = RetryPolicy(backoff_factor=1, max_backoff=5)
+
+        for attempt in range(1, 6):
+            self.assertTrue(0 <= policy.backoff(attempt) <= min(5, 2 ** (attempt - 1)))
+
+    def test_when_retry_after_is_an_http_date_then_it_is_parsed(self, mock_sleep):
+        retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+
+        delay = parse_retry_after(format_datetime(retry_at, usegmt=True))
+
+        self.assertTrue(25 < delay <= 30)
+        self.assertIsNone(parse_retry_after('not a date'))
+
+
+if __name__ == '__main__':
+    unittest.main()
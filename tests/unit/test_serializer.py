@@ -0,0 +1,69 @@
+import io
+import json
+import unittest
+
+from biostudiesclient.models import EnhancedJSONEncoder, BioStudiesAttribute, BioStudyFile
+from biostudiesclient.serializer import BioStudySerializer, orjson
+from tests.test_utils import TestUtils
+
+
+def normalise(document):
+    if isinstance(document, dict):
+        return {key: normalise(value) for key, value in document.items()}
+    if isinstance(document, list):
+        return sorted((normalise(item) for item in document), key=lambda item: json.dumps(item, sort_keys=True))
+
+    return document
+
+
+class TestBioStudySerializer(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.bio_study = TestUtils.create_bio_study_without_file()
+        self.bio_study.section.files.add(
+            TestUtils.create_bio_study_file("test_file.txt", "BAM",
+                                            {TestUtils.create_attribute("Description", "Raw Data File")}))
+        self.expected = normalise(json.loads(json.dumps(self.bio_study, cls=EnhancedJSONEncoder)))
+
+    def test_when_serializing_then_document_equals_enhanced_json_encoder_output(self):
+        document = BioStudySerializer(use_orjson=False).dumps(self.bio_study)
+
+        self.assertEqual(self.expected, normalise(json.loads(document)))
+
+    @unittest.skipIf(orjson is None, 'orjson is not installed')
+    def test_when_serializing_with_orjson_then_document_is_the_same(self):
+        for ensure_ascii in [True, False]:
+            document = BioStudySerializer(ensure_ascii=ensure_ascii).dumps(self.bio_study)
+
+            self.assertEqual(self.expected, normalise(json.loads(document)))
+
+    def test_when_dumping_to_a_file_then_it_is_written_in_chunks(self):
+        output_file = io.StringIO()
+        serializer = BioStudySerializer(use_orjson=False)
+
+        serializer.dump(self.bio_study, output_file, buffer_size=16)
+
+        self.assertEqual(serializer.dumps(self.bio_study), output_file.getvalue())
+
+    def test_when_value_is_not_ascii_then_it_is_escaped_like_json(self):
+        a_file = BioStudyFile('données/α.txt', 'file', {BioStudiesAttribute('Description', 'naïve "quoted"')})
+
+        for use_orjson in [False, True]:
+            document = BioStudySerializer(use_orjson=use_orjson).dumps(a_file)
+
+            self.assertEqual(json.dumps(json.loads(document), separators=(',', ':')), document)
+            self.assertEqual('données/α.txt', json.loads(document)['path'])
+
+    def test_when_empty_collections_and_none_then_encoded_like_json(self):
+        document = BioStudySerializer(use_orjson=False).dumps({'files': set(), 'links': [], 'accno': None,
+                                                                'flag': True, 'size': 1.5, 'extra': {}})
+
+        self.assertEqual('{"files":[],"links":[],"accno":null,"flag":true,"size":1.5,"extra":{}}', document)
+
+    def test_when_object_is_not_serializable_then_raises_type_error(self):
+        with self.assertRaises(TypeError):
+            BioStudySerializer(use_orjson=False).dumps({'value': object()})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+
+from mock import patch
+
+from biostudiesclient.api import Api
+from biostudiesclient.auth import Auth
+from biostudiesclient.session import PooledSession, SessionConfig
+
+
+class TestPooledSession(unittest.TestCase):
+
+    def test_when_no_timeout_configured_then_timeout_is_none(self):
+        self.assertIsNone(SessionConfig().timeout)
+
+    def test_when_timeouts_configured_then_timeout_is_connect_read_tuple(self):
+        config = SessionConfig(connect_timeout=3.05, read_timeout=60)
+
+        self.assertEqual((3.05, 60), config.timeout)
+
+    def test_when_pool_configured_then_adapters_use_the_configured_pool(self):
+        session = PooledSession(SessionConfig(pool_connections=2, pool_maxsize=32, pool_block=True))
+
+        for prefix in ['http://', 'https://']:
+            adapter = session.adapters[prefix]
+            self.assertEqual(2, adapter._pool_connections)
+            self.assertEqual(32, adapter._pool_maxsize)
+            self.assertTrue(adapter._pool_block)
+
+    def test_when_keep_alive_disabled_then_connection_close_header_sent(self):
+        session = PooledSession(SessionConfig(keep_alive=False))
+
+        self.assertEqual('close', session.headers['Connection'])
+
+    @patch('requests.Session.request')
+    def test_when_request_without_timeout_then_configured_timeout_used(self, mock_request):
+        session = PooledSession(SessionConfig(connect_timeout=5, read_timeout=30))
+
+        session.get('http://example.com')
+
+        self.assertEqual((5, 30), mock_request.call_args[1]['timeout'])
+
+    def test_when_api_created_from_auth_then_session_is_shared(self):
+        auth = Auth('http://example.com')
+
+        first_api = Api(auth)
+        second_api = Api(auth)
+
+        self.assertIs(auth.session, first_api.session)
+        self.assertIs(first_api.session, second_api.session)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from http import HTTPStatus
+
+from mock import patch
+
+from biostudiesclient.api import Api
+from biostudiesclient.auth import Auth
+from biostudiesclient.exceptions import RestErrorException
+from biostudiesclient.session_cache import SessionCache
+
+BASE_URL = 'http://example.com'
+
+
+class TestSessionCache(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = SessionCache(self.directory.name)
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_when_session_stored_then_returned_for_the_same_url_and_user_only(self):
+        self.cache.put(BASE_URL, 'user1', 'session.id.1', 'password')
+
+        self.assertEqual('session.id.1', self.cache.get(BASE_URL, 'user1', 'password'))
+        self.assertIsNone(self.cache.get(BASE_URL, 'user2', 'password'))
+        self.assertIsNone(self.cache.get('http://other.example.com', 'user1', 'password'))
+        self.assertEqual('session.id.1', SessionCache(self.directory.name).get(BASE_URL, 'user1', 'password'))
+
+    def test_when_session_stored_then_returned_for_the_same_password_only(self):
+        self.cache.put(BASE_URL, 'user1', 'session.id.1', 'secret-1')
+
+        self.assertIsNone(self.cache.get(BASE_URL, 'user1', 'wrong password'))
+        self.assertIsNone(self.cache.get(BASE_URL, 'user1', None))
+        for cache_file_name in os.listdir(self.directory.name):
+            with open(os.path.join(self.directory.name, cache_file_name), 'rb') as cache_file:
+                self.assertNotIn(b'secret-1', cache_file.read())
+
+    def test_when_session_too_old_then_not_returned(self):
+        cache = SessionCache(self.directory.name, max_age=0.05)
+        cache.put(BASE_URL, 'user1', 'session.id.1', 'password')
+
+        time.sleep(0.1)
+
+        self.assertIsNone(cache.get(BASE_URL, 'user1', 'password'))
+
+    def test_when_invalidated_with_an_other_session_id_then_cached_session_kept(self):
+        self.cache.put(BASE_URL, 'user1', 'session.id.2', 'password')
+
+        self.cache.invalidate(BASE_URL, 'user1', 'session.id.1')
+        self.assertEqual('session.id.2', self.cache.get(BASE_URL, 'user1', 'password'))
+
+        self.cache.invalidate(BASE_URL, 'user1', 'session.id.2')
+        self.assertIsNone(self.cache.get(BASE_URL, 'user1', 'password'))
+
+
+class TestAuthWithSessionCache(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = SessionCache(self.directory.name)
+        self.session_ids = iter(f'session.id.{index}' for index in range(1, 100))
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def login_response(self, mock_post):
+        def login(*_args, **_kwargs):
+            time.sleep(0.01)
+            response = mock_post.return_value
+            response.json.return_value = {"sessid": next(self.session_ids)}
+            return response
+
+        mock_post.side_effect = login
+        mock_post.return_value.text = '{}'
+        mock_post.return_value.status_code = HTTPStatus.OK
+
+    @patch('biostudiesclient.session.PooledSession.post')
+    def test_when_many_auth_objects_login_then_only_the_first_one_sends_login_request(self, mock_post):
+        self.login_response(mock_post)
+        session_ids = []
+
+        def login():
+            auth = Auth(BASE_URL, session_cache=self.cache)
+            session_ids.append(auth.login('username', 'password').session_id)
+
+        threads = [threading.Thread(target=login) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(1, mock_post.call_count)
+        self.assertEqual(['session.id.1'] * 8, session_ids)
+
+    @patch('biostudiesclient.session.PooledSession.post')
+    def test_when_cached_session_rejected_then_logs_in_again_and_caches_new_session(self, mock_post):
+        self.login_response(mock_post)
+        self.cache.put(BASE_URL, 'username', 'expired.session.id', 'password')
+        auth = Auth(BASE_URL, session_cache=self.cache)
+
+        self.assertEqual('expired.session.id', auth.login('username', 'password').session_id)
+        mock_post.assert_not_called()
+
+        self.assertEqual('session.id.1', auth.refresh_session('expired.session.id'))
+        self.assertEqual(1, mock_post.call_count)
+        self.assertEqual('session.id.1', self.cache.get(BASE_URL, 'username', 'password'))
+
+    @patch('biostudiesclient.session.PooledSession.post')
+    def test_when_password_is_wrong_then_cached_session_not_used(self, mock_post):
+        self.cache.put(BASE_URL, 'username', 'cached.session.id', 'password')
+        mock_post.return_value.status_code = HTTPStatus.UNAUTHORIZED
+        mock_post.return_value.text = '{"status": "FAIL", "log": {"level": "ERROR", "message": "Invalid credentials"}}'
+        mock_post.return_value.json.return_value = {"status": "FAIL"}
+        auth = Auth(BASE_URL, session_cache=self.cache)
+
+        with self.assertRaises(RestErrorException):
+            auth.login('username', 'wrong password')
+
+        mock_post.assert_called_once()
+        self.assertIsNone(auth.session_id)
+        self.assertEqual('cached.session.id', self.cache.get(BASE_URL, 'username', 'password'))
+
+    @patch('biostudiesclient.session.PooledSession.get')
+    def test_when_cached_session_rejected_without_auto_refresh_then_it_is_removed_from_cache(self, mock_get):
+        mock_get.return_value.status_code = HTTPStatus.UNAUTHORIZED
+        mock_get.return_value.text = '{"status": "FAIL", "log": {"level": "ERROR", "message": "Unauthorized"}}'
+        self.cache.put(BASE_URL, 'username', 'revoked.session.id', 'password')
+        auth = Auth(BASE_URL, auto_refresh=False, session_cache=self.cache)
+        auth.login('username', 'password')
+
+        with self.assertRaises(RestErrorException):
+            Api(auth).get_submission('S-BSST1')
+
+        mock_get.assert_called_once()
+        self.assertIsNone(self.cache.get(BASE_URL, 'username', 'password'))
+
+    def test_when_cache_directory_reopened_then_same_key_used(self):
+        self.cache.put(BASE_URL, 'username', 'cached.session.id', 'password')
+
+        with open(os.path.join(self.directory.name, 'key'), 'rb') as key_file:
+            self.assertEqual(32, len(key_file.read()))
+        self.assertEqual('cached.session.id', SessionCache(self.directory.name).get(BASE_URL, 'username', 'password'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,207 @@
+import io
+import json
+import unittest
+from http import HTTPStatus
+
+from mock import patch, MagicMock
+
+from biostudiesclient.api import Api
+from biostudiesclient.exceptions import RestErrorException
+from biostudiesclient.models import BioStudiesAttribute, BioStudyFile, BioStudyLink, BioStudySubsection
+from biostudiesclient.session import PooledSession
+from biostudiesclient.submission_parser import parse_submission, parse_submission_stream, LazyBioStudySection, \
+    iter_submission_items, FILE_ITEM, LINK_ITEM, SECTION_ITEM, SUBMISSION_ITEM
+
+SUBMISSION = {
+    "accno": "S-BSST1",
+    "attributes": [{"name": "Title", "value": "Test study"}, {"name": "AttachTo", "value": "Phoenix"}],
+    "section": {
+        "accno": "Project",
+        "type": "Study",
+        "attributes": [{"name": "Title", "value": "Cells of the adult human heart"}],
+        "files": [
+            {"path": "test_file.txt", "attributes": [{"name": "Description", "value": "Raw Data File"}],
+             "type": "file"},
+            [{"path": "table/file_1.txt", "attributes": [], "type": "file"},
+             {"path": "table/file_2.txt", "type": "file"}]
+        ],
+        "links": [{"url": "SAMEA7249626", "attributes": [{"name": "Type", "value": "BioSample"}]}],
+        "subsections": [
+            {"type": "Author", "attributes": [{"name": "Name", "value": "John Doe"}],
+             "files": [{"path": "author.txt", "type": "file"}]}
+        ]
+    },
+    "type": "submission"
+}
+
+
+class TestSubmissionParser(unittest.TestCase):
+
+    def test_when_parsing_eagerly_then_all_fields_converted(self):
+        bio_study = parse_submission(SUBMISSION, lazy=False)
+
+        self.assertEqual('S-BSST1', bio_study.accno)
+        self.assertEqual('Phoenix', bio_study.attach_to)
+        self.assertEqual({BioStudiesAttribute('Title', 'Test study')}, bio_study.attributes)
+        self.assertEqual('Study', bio_study.section.section_type)
+        self.assertEqual({'test_file.txt', 'table/file_1.txt', 'table/file_2.txt'},
+                         {a_file.path for a_file in bio_study.section.files})
+        self.assertIn(BioStudyFile('test_file.txt', 'file', {BioStudiesAttribute('Description', 'Raw Data File')}),
+                      bio_study.section.files)
+        self.assertEqual({BioStudyLink('SAMEA7249626', {BioStudiesAttribute('Type', 'BioSample')})},
+                         bio_study.section.links)
+        self.assertEqual({BioStudySubsection('Author', {BioStudiesAttribute('Name', 'John Doe')})},
+                         bio_study.section.subsections)
+
+    def test_when_parsing_lazily_then_collections_converted_on_first_access(self):
+        bio_study = parse_submission(SUBMISSION)
+
+        self.assertIsNone(bio_study._section)
+        section = bio_study.section
+        self.assertIsInstance(section, LazyBioStudySection)
+        self.assertIsNone(section._files)
+        self.assertEqual(3, len(section.files))
+        self.assertIs(section.files, bio_study.section.files)
+
+    def test_when_lazy_collections_are_assigned_then_assigned_values_returned(self):
+        bio_study = parse_submission(SUBMISSION)
+
+        bio_study.section.files = set()
+        self.assertEqual(set(), bio_study.section.files)
+
+        bio_study.section = None
+        self.assertIsNone(bio_study.section)
+
+    def test_when_parsing_lazily_then_equal_to_eagerly_parsed(self):
+        self.assertEqual(parse_submission(SUBMISSION, lazy=False), parse_submission(SUBMISSION))
+        self.assertEqual(parse_submission(SUBMISSION), parse_submission(SUBMISSION, lazy=False))
+
+    def test_when_parsing_a_stream_then_equal_to_eagerly_parsed(self):
+        stream = io.BytesIO(json.dumps(SUBMISSION).encode())
+
+        self.assertEqual(parse_submission(SUBMISSION, lazy=False), parse_submission_stream(stream))
+
+    def test_when_iterating_a_stream_then_section_items_yielded_one_by_one(self):
+        items = list(iter_submission_items(io.BytesIO(json.dumps(SUBMISSION).encode())))
+
+        self.assertEqual([FILE_ITEM, FILE_ITEM, FILE_ITEM, LINK_ITEM, SECTION_ITEM, SUBMISSION_ITEM],
+                         [item_type for item_type, _ in items])
+        self.assertEqual('table/file_2.txt', items[2][1]['path'])
+        self.assertEqual([{"path": "author.txt", "type": "file"}], items[4][1]['files'])
+        rest = items[-1][1]
+        self.assertEqual([], rest['section']['files'])
+        self.assertEqual('Cells of the adult human heart', rest['section']['attributes'][0]['value'])
+
+
+def mock_streamed_response(status_code, document):
+    response = MagicMock()
+    response.status_code = status_code
+    response.raw = io.BytesIO(json.dumps(document).encode())
+    response.text = json.dumps(document)
+    response.json.return_value = document
+    return response
+
+
+class TestApiGetBioStudy(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.auth = MagicMock()
+        self.auth.session_id = 'test.session.id'
+        self.auth.base_url = "http://example.com"
+        self.auth.session = PooledSession()
+        self.api = Api(self.auth)
+
+    @patch('biostudiesclient.session.PooledSession.get')
+    def test_when_streaming_then_body_parsed_from_raw_response(self, mock_get):
+        response = mock_streamed_response(HTTPStatus.OK, SUBMISSION)
+        mock_get.return_value = response
+
+        bio_study = self.api.get_bio_study('S-BSST1', stream=True)
+
+        self.assertTrue(mock_get.call_args[1]['stream'])
+        self.assertEqual(parse_submission(SUBMISSION), bio_study)
+        response.close.assert_called_once()
+
+    @patch('biostudiesclient.session.PooledSession.get')
+    def test_when_streaming_an_error_response_then_raises_rest_error(self, mock_get):
+        response = MagicMock()
+        response.status_code = HTTPStatus.NOT_FOUND
+        response.text = ''
+        mock_get.return_value = response
+
+        with self.assertRaises(RestErrorException) as context:
+            self.api.get_bio_study('S-BSST1', stream=True)
+
+        self.assertEqual(HTTPStatus.NOT_FOUND, context.exception.status_code)
+
+
+class TestApiStreamedResponses(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.auth = MagicMock()
+        self.auth.session_id = 'test.session.id'
+        self.auth.base_url = "http://example.com"
+        self.auth.session = PooledSession()
+        self.api = Api(self.auth)
+
+    @patch('biostudiesclient.session.PooledSession.get')
+    def test_when_streaming_user_files_then_entries_yielded_and_response_closed(self, mock_get):
+        user_files = [{"name": "file1.txt", "path": "user/folder1", "size": 10, "type": "FILE"},
+                      {"name": "folder2", "path": "user/folder1", "size": 0, "type": "DIR"}]
+        response = mock_streamed_response(HTTPStatus.OK, user_files)
+        mock_get.return_value = response
+
+        streamed_response = self.api.get_user_files('folder1', stream=True)
+
+        self.assertEqual(HTTPStatus.OK, streamed_response.status)
+        response.close.assert_not_called()
+        self.assertEqual(user_files, list(streamed_response.json))
+        response.close.assert_called_once()
+
+    @patch('biostudiesclient.session.PooledSession.get')
+    def test_when_streaming_submission_then_items_yielded(self, mock_get):
+        mock_get.return_value = mock_streamed_response(HTTPStatus.OK, SUBMISSION)
+
+        items = list(self.api.get_submission('S-BSST1', stream=True).json)
+
+        self.assertEqual(SUBMISSION_ITEM, items[-1][0])
+        self.assertEqual('S-BSST1', items[-1][1]['accno'])
+        self.assertEqual(5, len(items) - 1)
+
+    @patch('biostudiesclient.session.PooledSession.get')
+    def test_when_streamed_response_not_consumed_then_closing_it_releases_connection(self, mock_get):
+        response = mock_streamed_response(HTTPStatus.OK, SUBMISSION)
+        mock_get.return_value = response
+
+        with self.api.get_submission('S-BSST1', stream=True) as streamed_response:
+            response.close.assert_not_called()
+
+        response.close.assert_called()
+        self.assertEqual([], list(streamed_response.json))
+
+    @patch('biostudiesclient.session.PooledSession.get')
+    def test_when_streamed_response_partly_consumed_then_closing_it_releases_connection(self, mock_get):
+        response = mock_streamed_response(HTTPStatus.OK, SUBMISSION)
+        mock_get.return_value = response
+        streamed_response = self.api.get_submission('S-BSST1', stream=True)
+
+        self.assertEqual(FILE_ITEM, next(streamed_response.json)[0])
+        streamed_response.close()
+
+        response.close.assert_called()
+        self.assertEqual([], list(streamed_response.json))
+
+    @patch('biostudiesclient.session.PooledSession.get')
+    def test_when_streaming_an_error_response_then_raises_before_iteration(self, mock_get):
+        response = mock_streamed_response(HTTPStatus.FORBIDDEN, {"log": {"message": "Access denied"}})
+        mock_get.return_value = response
+
+        with self.assertRaises(RestErrorException) as context:
+            self.api.get_user_files(stream=True)
+
+        self.assertEqual('Access denied', context.exception.message)
+        response.close.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from mock import MagicMock, patch
+
+from biostudiesclient.bulk_upload import DirectoryUploader, LocalFile
+from biostudiesclient.exceptions import RestErrorException
+from biostudiesclient.multipart import UploadProgress
+from biostudiesclient.upload_journal import UploadJournal, file_checksum
+
+
+class TestUploadJournal(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.journal = UploadJournal(os.path.join(self.directory, 'journal.sqlite'))
+        self.file_path = os.path.join(self.directory, 'data', 'file.txt')
+        os.makedirs(os.path.dirname(self.file_path))
+        with open(self.file_path, 'w') as a_file:
+            a_file.write('some content')
+
+    def tearDown(self) -> None:
+        self.journal.close()
+        shutil.rmtree(self.directory)
+
+    def local_file(self, remote_folder='data'):
+        stat = os.stat(self.file_path)
+        return LocalFile(self.file_path, remote_folder, stat.st_size, stat.st_mtime)
+
+    def test_when_file_recorded_then_it_is_completed(self):
+        self.journal.record(self.local_file(), file_checksum(self.file_path))
+
+        self.assertTrue(self.journal.is_completed(self.local_file(), verify_checksum=True))
+        self.assertEqual(file_checksum(self.file_path), self.journal.get(self.file_path).checksum)
+
+    def test_when_file_recorded_without_checksum_then_it_cannot_be_verified(self):
+        self.journal.record(self.local_file())
+
+        self.assertIsNone(self.journal.get(self.file_path).checksum)
+        self.assertTrue(self.journal.is_completed(self.local_file()))
+        self.assertFalse(self.journal.is_completed(self.local_file(), verify_checksum=True))
+
+    def test_when_file_modified_after_upload_then_it_is_not_completed(self):
+        self.journal.record(self.local_file())
+
+        with open(self.file_path, 'a') as a_file:
+            a_file.write(' and some more')
+
+        self.assertFalse(self.journal.is_completed(self.local_file()))
+
+    def test_when_file_recorded_for_another_folder_then_it_is_not_completed(self):
+        self.journal.record(self.local_file('data'))
+
+        self.assertFalse(self.journal.is_completed(self.local_file('other')))
+
+    def test_when_journal_reopened_then_entries_are_kept(self):
+        self.journal.record(self.local_file())
+        self.journal.close()
+
+        self.journal = UploadJournal(os.path.join(self.directory, 'journal.sqlite'))
+
+        self.assertTrue(self.journal.is_completed(self.local_file()))
+
+
+class TestResumableDirectoryUpload(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.local_directory = os.path.join(self.directory, 'dataset')
+        for name in ['first.txt', 'second.txt', 'third.txt']:
+            os.makedirs(self.local_directory, exist_ok=True)
+            with open(os.path.join(self.local_directory, name), 'w') as a_file:
+                a_file.write(name)
+
+        self.journal = UploadJournal(os.path.join(self.directory, 'journal.sqlite'))
+        self.api = MagicMock()
+        self.api.get_user_files.return_value.json = []
+
+    def tearDown(self) -> None:
+        self.journal.close()
+        shutil.rmtree(self.directory)
+
+    def test_when_upload_interrupted_then_restart_uploads_only_the_remaining_files(self):
+        def fail_on_third(file_path, folder_path=None):
+            if file_path.endswith('third.txt'):
+                raise RestErrorException('connection lost', 500)
+
+        self.api.upload_file.side_effect = fail_on_third
+        first_report = DirectoryUploader(self.api, journal=self.journal).upload_directory(self.local_directory, 'ds')
+        self.assertEqual(1, len(first_report.failed))
+
+        self.api.upload_file.reset_mock(side_effect=True)
+        second_report = DirectoryUploader(self.api, journal=self.journal).upload_directory(self.local_directory, 'ds')
+
+        self.assertTrue(second_report.succeeded)
+        self.assertEqual(2, len(second_report.skipped))
+        self.assertEqual(['ds/third.txt'], [result.remote_path for result in second_report.uploaded])
+
+    def test_when_file_already_in_user_folder_then_it_is_skipped_and_recorded(self):
+        self.api.get_user_files.return_value.json = [
+            {"name": "first.txt", "path": "user/ds", "size": len('first.txt'), "type": "FILE"},
+            {"name": "second.txt", "path": "user/ds", "size": 1, "type": "FILE"}
+        ]
+
+        report = DirectoryUploader(self.api, journal=self.journal).upload_directory(self.local_directory, 'ds')
+
+        self.api.get_user_files.assert_called_once_with('ds')
+        self.assertEqual(['ds/first.txt'], [result.remote_path for result in report.skipped])
+        self.assertEqual(2, len(report.uploaded))
+        self.assertIsNotNone(self.journal.get(os.path.join(self.local_directory, 'first.txt')))
+
+    def test_when_syncing_a_touched_file_then_checksum_decides_whether_it_is_uploaded(self):
+        self.api.get_user_files.return_value.json = [
+            {"name": name, "path": "user/ds", "size": len(name), "type": "FILE"}
+            for name in ['first.txt', 'second.txt', 'third.txt']
+        ]
+        DirectoryUploader(self.api, journal=self.journal, verify_checksums=True).upload_directory(
+            self.local_directory, 'ds')
+        for name in ['first.txt', 'second.txt']:
+            path = os.path.join(self.local_directory, name)
+            os.utime(path, (1000, 1000))
+        with open(os.path.join(self.local_directory, 'second.txt'), 'w') as a_file:
+            a_file.write('SECOND.txt')
+
+        uploader = DirectoryUploader(self.api, journal=self.journal)
+        with_checksums = uploader.sync_directory(self.local_directory, 'ds', compare_checksums=True)
+
+        self.assertEqual(['ds/second.txt'], [result.remote_path for result in with_checksums.uploaded])
+        self.assertEqual(2, len(with_checksums.skipped))
+
+    @patch('biostudiesclient.bulk_upload.file_checksum')
+    def test_when_checksums_not_verified_then_files_are_not_read_for_them(self, mock_checksum):
+        self.api.get_user_files.return_value.json = [
+            {"name": "first.txt", "path": "user/ds", "size": len('first.txt'), "type": "FILE"}
+        ]
+
+        report = DirectoryUploader(self.api, journal=self.journal).upload_directory(self.local_directory, 'ds')
+
+        self.assertEqual(2, len(report.uploaded))
+        mock_checksum.assert_not_called()
+        self.api.upload_file.assert_any_call(os.path.join(self.local_directory, 'second.txt'), 'ds')
+
+    def test_when_checksums_verified_then_checksum_reported_by_the_upload_is_recorded(self):
+        def upload_file(file_path, folder_path=None, progress_callback=None, compute_checksum=False):
+            progress_callback(UploadProgress(file_path, 9, 9, 0.1, checksum=f'md5 of {os.path.basename(file_path)}'))
+
+        self.api.upload_file.side_effect = upload_file
+
+        DirectoryUploader(self.api, journal=self.journal, verify_checksums=True).upload_directory(
+            self.local_directory, 'ds')
+
+        self.assertEqual('md5 of first.txt', self.journal.get(os.path.join(self.local_directory, 'first.txt')).checksum)
+
+
+if __name__ == '__main__':
+    unittest.main()
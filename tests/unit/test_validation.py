@@ -0,0 +1,125 @@
+import pickle
+import unittest
+from http import HTTPStatus
+
+from mock import patch, MagicMock
+
+from biostudiesclient.api import Api
+from biostudiesclient.exceptions import RestErrorException, SubmissionValidationException
+from biostudiesclient.session import PooledSession
+from biostudiesclient.validation import SubmissionValidator, ValidationError
+from tests.test_utils import TestUtils
+
+
+def submission(files=None):
+    return {
+        "attributes": [{"name": "Title", "value": "Test study"}],
+        "section": {
+            "type": "Study",
+            "attributes": [{"name": "Organism", "value": "Homo sapiens (human)"}],
+            "files": files or [],
+            "links": [{"url": "SAMEA7249626", "attributes": [{"name": "Type", "value": "BioSample"}]}],
+            "subsections": [{"type": "Author", "attributes": [{"name": "Name", "value": "John Doe"}]}]
+        }
+    }
+
+
+class TestSubmissionValidator(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.api = MagicMock()
+        self.api.get_user_files.side_effect = self.get_user_files
+        self.validator = SubmissionValidator(self.api)
+
+    @staticmethod
+    def get_user_files(folder_path=None):
+        if folder_path == 'missing':
+            raise RestErrorException('This URL missing not exists.', HTTPStatus.NOT_FOUND)
+        response = MagicMock()
+        response.json = [{"name": "file1.txt", "type": "FILE"}, {"name": "folder1", "type": "DIR"}]
+        return response
+
+    def messages(self, metadata):
+        return [str(error) for error in self.validator.validate(metadata)]
+
+    def test_when_submission_valid_then_no_errors(self):
+        self.assertEqual([], self.messages(submission([{"path": "file1.txt", "type": "file"},
+                                                       [{"path": "/folder1/file1.txt"}]])))
+
+    def test_when_bio_study_and_its_json_valid_then_no_errors(self):
+        bio_study = TestUtils.create_bio_study_without_file()
+        bio_study.section.subsections.clear()
+
+        self.assertEqual([], SubmissionValidator().validate(bio_study))
+        self.assertEqual([], SubmissionValidator().validate(TestUtils.create_json_payload_from_bio_study(bio_study)))
+
+    def test_when_required_fields_missing_then_errors_reported(self):
+        metadata = submission([{"type": "file"}])
+        metadata['attributes'] = [{"name": "", "value": "x"}, {"name": "Description", "value": None}]
+        metadata['section']['type'] = None
+        metadata['section']['links'].append({"attributes": []})
+        metadata['section']['subsections'][0]['type'] = ''
+
+        self.assertEqual(['attributes[0].name: The attribute has no name.',
+                          'attributes[1].value: The value of the Description attribute is not a string.',
+                          'section.type: The section has no type.',
+                          'section.files[0].path: The file has no path.',
+                          'section.links[1].url: The link has no URL.',
+                          'section.subsections[0].type: The sub section has no type.',
+                          'attributes: The Title attribute is required.'], self.messages(metadata))
+
+    def test_when_referenced_files_missing_then_errors_reported(self):
+        metadata = submission([{"path": "file1.txt"}, {"path": "file2.txt"}, {"path": "missing/file1.txt"},
+                               {"path": "file1.txt"}])
+
+        self.assertEqual(['section.files[3].path: The file file1.txt is listed more than once.',
+                          'section.files[1].path: File not found: file2.txt.',
+                          'section.files[2].path: File not found: missing/file1.txt.'], self.messages(metadata))
+
+    def test_when_validated_again_then_cached_listings_used(self):
+        metadata = submission([{"path": "file1.txt"}, {"path": "folder1/file1.txt"}])
+
+        self.validator.validate(metadata)
+        self.validator.validate(metadata)
+
+        self.assertEqual(2, self.api.get_user_files.call_count)
+
+    def test_when_remote_index_given_then_files_looked_up_in_it(self):
+        remote_index = MagicMock()
+        remote_index.exists.side_effect = lambda path: path == 'folder1/file1.txt'
+
+        errors = SubmissionValidator(remote_index=remote_index).validate(
+            submission([{"path": "folder1/file1.txt"}, {"path": "file2.txt"}]))
+
+        self.assertEqual(['section.files[1].path: File not found: file2.txt.'], [str(error) for error in errors])
+
+    def test_when_validation_exception_pickled_then_errors_kept(self):
+        exception = SubmissionValidationException([ValidationError('section.files[0].path', 'The file has no path.')])
+
+        unpickled = pickle.loads(pickle.dumps(exception))
+
+        self.assertEqual(exception.errors, unpickled.errors)
+        self.assertEqual(exception.message, unpickled.message)
+        self.assertEqual(HTTPStatus.BAD_REQUEST, unpickled.status_code)
+
+
+class TestApiWithValidator(unittest.TestCase):
+
+    @patch('biostudiesclient.session.PooledSession.post')
+    def test_when_submission_invalid_then_it_is_not_sent(self, mock_post):
+        auth = MagicMock()
+        auth.base_url = "http://example.com"
+        auth.session = PooledSession()
+        api = Api(auth, validator=SubmissionValidator())
+
+        with self.assertRaises(SubmissionValidationException) as context:
+            api.create_submission({"attributes": [], "section": {"type": "Study"}})
+
+        self.assertEqual(HTTPStatus.BAD_REQUEST, context.exception.status_code)
+        self.assertEqual('Submission validation errors. attributes: The Title attribute is required.',
+                         context.exception.message)
+        mock_post.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()